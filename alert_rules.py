@@ -0,0 +1,107 @@
+import re
+
+TEMPERATURE_PATTERN = re.compile(r'(\d+[,.]\d+)')
+
+
+class ObjectCountRule:
+    """ Regra do modo 'object': alerta quando a contagem de objetos atende à quantidade por
+    'sensitivity' segundos, no máximo uma vez a cada 'rearm_time' segundos.
+
+    'now' é o relógio de quem chama: time.time() no worker ao vivo, o tempo do vídeo na
+    análise offline. Assim as duas produzem os mesmos alertas para a mesma sequência de quadros.
+    """
+
+    def __init__(self, quantity, exact_number, sensitivity, rearm_time, class_names):
+        self.quantity = quantity
+        self.exact_number = exact_number
+        self.sensitivity = sensitivity
+        self.rearm_time = rearm_time
+        self.class_names = class_names
+        self.last_alert_time = None
+        self.condition_start_time = 0
+        self.is_condition_active = False
+
+    def update(self, detections, now):
+        """ Avalia as detecções do quadro; devolve a mensagem de alerta ou None """
+        detection_count = len(detections)
+        if self.exact_number:
+            quantity_condition_met = detection_count == self.quantity
+        else:
+            quantity_condition_met = detection_count >= self.quantity
+
+        if not quantity_condition_met:
+            self.is_condition_active = False
+            self.condition_start_time = 0
+            return None
+
+        if not self.is_condition_active:
+            self.is_condition_active = True
+            self.condition_start_time = now
+
+        rearmed = self.last_alert_time is None or (now - self.last_alert_time) > self.rearm_time
+        if (now - self.condition_start_time) >= self.sensitivity and rearmed:
+            self.last_alert_time = now
+            object_names = [self.class_names.get(int(d[5]), "Objeto") for d in detections]
+            return f"{detection_count} objeto(s) detectado(s): {', '.join(object_names)}"
+        return None
+
+
+class DwellRule:
+    """ Regra de permanência do modo 'object' (com rastreamento): alerta uma vez por objeto
+    rastreado que continua na cena (ou na ROI) por 'dwell_time' segundos. Recebe as trilhas
+    confirmadas do IoUTracker; 'now' segue a mesma convenção de ObjectCountRule. """
+
+    def __init__(self, dwell_time, class_names):
+        self.dwell_time = dwell_time
+        self.class_names = class_names
+        self.alerted = set()  # ids das trilhas que já geraram alerta
+
+    def update(self, tracks, now):
+        self.alerted &= {track.track_id for track in tracks}
+        due = [track for track in tracks
+               if track.track_id not in self.alerted and now - track.first_seen >= self.dwell_time]
+        if not due:
+            return None
+        self.alerted.update(track.track_id for track in due)
+        objects = [f"{self.class_names.get(track.cls, 'Objeto')} #{track.track_id}" for track in due]
+        return f"Permanência acima de {self.dwell_time:g} s: {', '.join(objects)}"
+
+
+def parse_temperature(text):
+    """ Primeiro número com casa decimal do texto lido pelo OCR, ou None """
+    match = TEMPERATURE_PATTERN.search(text)
+    if not match:
+        return None
+    try:
+        return float(match.group(1).replace(',', '.'))
+    except ValueError:
+        return None
+
+
+class TemperatureRule:
+    """ Regra do modo 'temperature': alerta quando a primeira temperatura lida atinge 'limite'.
+    Com a temperatura ainda acima do limite, repete o alerta a cada 'rearm_time' segundos
+    (0 = só volta a alertar depois de cair abaixo do limite). """
+
+    def __init__(self, limite, rearm_time):
+        self.limite = limite
+        self.rearm_time = rearm_time
+        self.alerta_ativo = False
+        self.ultimo_alerta_ts = 0
+
+    def update(self, textos, now):
+        """ 'textos' são os textos reconhecidos na ROI; devolve a mensagem de alerta ou None """
+        for texto in textos:
+            temp = parse_temperature(texto)
+            if temp is None:
+                continue
+            if temp < self.limite:
+                self.alerta_ativo = False
+                return None
+            if not self.alerta_ativo or (self.rearm_time > 0 and (now - self.ultimo_alerta_ts) >= self.rearm_time):
+                self.ultimo_alerta_ts = now
+                self.alerta_ativo = True
+                return f"ALERTA DE TEMPERATURA: {temp:.1f}°C"
+            return None
+        self.alerta_ativo = False
+        return None
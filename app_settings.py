@@ -0,0 +1,88 @@
+import copy
+import json
+import os
+
+SETTINGS_FILE = 'app_settings.json'
+
+# Configurações globais da aplicação (não pertencem a uma câmera específica).
+# O arquivo 'app_settings.json' é opcional: qualquer chave ausente usa o valor padrão abaixo.
+DEFAULT_SETTINGS = {
+    "inference_server": {
+        "enabled": False,
+        "host": "127.0.0.1",
+        "allow_remote": False,  # permite escutar em um host que não seja local (ex.: 0.0.0.0)
+        "port": 6001,
+        "model": "yolo12n.pt",
+        "backend": "torch",
+        "int8": False,
+        "device": "cpu",
+        "max_batch": 8,
+        "max_wait_ms": 15,
+        "ocr": False,  # as câmeras de temperatura usam o EasyOCR do servidor em vez de um por processo
+        "ocr_gpu": False,
+    },
+    "event_store": {
+        "path": "events.db",
+        "batch_size": 500,
+        "flush_interval_ms": 500,
+    },
+    "event_log": {
+        "capacity": 5000,
+        "flush_interval_ms": 250,
+        "page_size": 200,
+    },
+    "watchdog": {
+        "heartbeat_interval": 2.0,  # segundos entre heartbeats de cada worker
+        "heartbeat_timeout": 15.0,  # sem heartbeat por esse tempo: processo travado
+        "stall_timeout": 60.0,  # decodificador bloqueado por esse tempo (acima do timeout do FFmpeg)
+        "reconnect_max_backoff": 30.0,  # espera máxima entre tentativas de reconexão no worker
+        "restart_max_backoff": 60.0,  # espera máxima antes de reiniciar um worker travado
+    },
+    "video_wall": {
+        "max_fps": 15,  # ritmo máximo de um quadrinho grande do mosaico
+        "total_fps": 60,  # quadros/s somando todos os quadrinhos: limita a CPU com muitas câmeras
+    },
+    "clips": {
+        "enabled": False,  # grava um clipe em torno de cada alerta (caminho anexado ao alerta)
+        "directory": "clips",
+        "pre_seconds": 5.0,
+        "post_seconds": 5.0,
+        "fps": 5.0,  # quadros/s guardados no buffer pré-evento
+        "max_buffer_mb": 32,  # memória máxima do buffer (JPEG) por câmera
+        "jpeg_quality": 80,
+    },
+    "worker_pool": {
+        # Workers em espera (modelo carregado) por combinação de modelo: câmeras iniciam mais rápido,
+        # mas cada um é um processo a mais com o modelo na memória. 0 (padrão) desativa.
+        "size": 0,
+    },
+    "stats": {
+        "interval": 10.0,  # segundos entre mensagens 'stats' de cada worker (0 desativa)
+        "path": "worker_stats.jsonl",  # arquivo rotativo para planejamento de capacidade ("" desativa)
+        "max_bytes": 10 * 1024 * 1024,
+        "backup_count": 5,
+    },
+}
+
+
+def _merge(defaults, overrides):
+    merged = copy.deepcopy(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_settings(path=SETTINGS_FILE):
+    """ Carrega as configurações globais, completando com os valores padrão """
+    if not os.path.exists(path):
+        return copy.deepcopy(DEFAULT_SETTINGS)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+    except json.JSONDecodeError:
+        print(f"Aviso: '{path}' está corrompido. Usando configurações padrão.")
+        return copy.deepcopy(DEFAULT_SETTINGS)
+    return _merge(DEFAULT_SETTINGS, overrides)
@@ -0,0 +1,36 @@
+import cv2
+import pytest
+
+from conftest import ROI
+
+
+@pytest.mark.benchmark(group="capture")
+def bench_video_capture_read(benchmark, video_path):
+    cap = cv2.VideoCapture(video_path)
+
+    def read():
+        ret, image = cap.read()
+        if not ret:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Fim do arquivo: volta ao início.
+            ret, image = cap.read()
+        return image
+
+    image = benchmark(read)
+    cap.release()
+    assert image is not None
+
+
+@pytest.mark.benchmark(group="preprocess")
+def bench_roi_slice(benchmark, frame):
+    """ Recorte da ROI do modo 'object' (cópia contígua, como chega ao modelo) """
+    y1, y2, x1, x2 = ROI
+    crop = benchmark(lambda: frame[y1:y2, x1:x2].copy())
+    assert crop.shape[:2] == (y2 - y1, x2 - x1)
+
+
+@pytest.mark.benchmark(group="preprocess")
+def bench_roi_gray(benchmark, frame):
+    """ Recorte + cvtColor da ROI, o pré-processamento do OCR em read_roi_texts """
+    y1, y2, x1, x2 = ROI
+    gray = benchmark(cv2.cvtColor, frame[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+    assert gray.ndim == 2
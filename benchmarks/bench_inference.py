@@ -0,0 +1,56 @@
+import cv2
+import pytest
+
+from conftest import ROI, render_reading
+from digit_recognizer import DigitRecognizer, TemperatureReader
+
+IMGSZ_VALUES = (320, 480, 640)
+
+
+@pytest.fixture(scope="module", params=IMGSZ_VALUES, ids=lambda imgsz: f"imgsz{imgsz}")
+def yolo(request):
+    pytest.importorskip("ultralytics")
+    from model_backends import load_model
+
+    imgsz = request.param
+    model = load_model("yolo12n.pt", request.config.getoption("bench_backend"), imgsz=imgsz)
+    return model, imgsz, request.config.getoption("bench_device")
+
+
+@pytest.mark.benchmark(group="inference", warmup=True, warmup_iterations=3, min_rounds=10)
+def bench_yolo(benchmark, yolo, frame):
+    from detector_worker import DETECTION_CONF
+
+    model, imgsz, device = yolo
+    results = benchmark(model, frame, conf=DETECTION_CONF, imgsz=imgsz, verbose=False, device=device)
+    assert len(results) == 1
+
+
+@pytest.fixture(scope="module")
+def ocr_reader():
+    easyocr = pytest.importorskip("easyocr")
+    return easyocr.Reader(['en'], gpu=False, verbose=False)
+
+
+@pytest.mark.benchmark(group="ocr", warmup=True, warmup_iterations=1, min_rounds=5)
+def bench_easyocr_roi(benchmark, ocr_reader, temperature_frame):
+    from detector_worker import easyocr_texts, read_roi_texts
+
+    texts = benchmark(read_roi_texts, easyocr_texts(ocr_reader), temperature_frame, ROI)
+    assert texts
+
+
+def _roi_gray(frame):
+    y1, y2, x1, x2 = ROI
+    return cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+
+
+@pytest.mark.benchmark(group="ocr")
+def bench_digit_recognizer(benchmark, temperature_frame):
+    """ Caminho rápido do modo temperatura (meta: < 5 ms por leitura em CPU) """
+    recognizer = DigitRecognizer().calibrate([(_roi_gray(render_reading(text)), text)
+                                              for text in ("012,3", "456,7", "89,0")])
+    reader = TemperatureReader(recognizer)
+    gray = _roi_gray(temperature_frame)
+    texts = benchmark(reader, gray)
+    assert texts == ["23.5"] and reader.fallback_reads == 0
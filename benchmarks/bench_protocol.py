@@ -0,0 +1,76 @@
+import io
+import json
+import sys
+import time
+
+import pytest
+
+from worker_protocol import (MSG_DETECTION, MSG_HEARTBEAT, DetectionChannel, MessageDecoder, encode_detections,
+                             send_message, write_frame)
+
+DETECTIONS = [[100.0 + 10 * i, 50.0, 180.0 + 10 * i, 200.0, 0.9, 0.0] for i in range(10)]
+ROI = (200, 320, 500, 780)
+
+
+@pytest.fixture
+def null_stdout(monkeypatch):
+    """ stdout binário descartável: mede a serialização, não o pipe """
+    monkeypatch.setattr(sys, 'stdout', io.TextIOWrapper(io.BytesIO()))
+
+
+@pytest.mark.benchmark(group="protocol")
+def bench_encode_detections(benchmark):
+    payload = benchmark(encode_detections, DETECTIONS, ROI, (500, 200), 1234, time.monotonic())
+    assert payload
+
+
+@pytest.mark.benchmark(group="protocol")
+def bench_send_detection_data(benchmark, null_stdout):
+    """ Caminho completo de send_detection_data, sem limite de taxa nem deduplicação """
+    channel = DetectionChannel(max_rate=0, subscribed=True, keepalive=0)
+    benchmark(channel.send, DETECTIONS, ROI, (500, 200), 1234, time.monotonic())
+
+
+@pytest.mark.benchmark(group="protocol")
+def bench_send_alert(benchmark, null_stdout):
+    alert = {"type": "alert", "camera": "cam", "timestamp": "2024-01-01 00:00:00",
+             "message": "1 objeto(s) detectado(s): pessoa", "frame_seq": 1234, "capture_ts": time.monotonic()}
+    benchmark(send_message, alert)
+
+
+def _worker_output(frames=2000):
+    """ stdout típico de um worker: detecções, heartbeats e linhas de log intercaladas """
+    out = io.BytesIO()
+    stdout = sys.stdout
+    sys.stdout = io.TextIOWrapper(out)
+    try:
+        for i in range(frames):
+            write_frame(MSG_DETECTION, encode_detections(DETECTIONS, ROI, (500, 200), i, 1000.0 + i / 15))
+            if i % 30 == 0:
+                write_frame(MSG_HEARTBEAT, json.dumps({"type": "heartbeat", "camera": "cam",
+                                                       "state": "streaming"}).encode('utf-8'))
+                print(f"[cam] quadro {i} processado", flush=True)
+    finally:
+        sys.stdout.flush()
+        sys.stdout.detach()  # Sem fechar o BytesIO junto com o wrapper.
+        sys.stdout = stdout
+    return out.getvalue()
+
+
+@pytest.mark.benchmark(group="protocol")
+def bench_stream_reader(benchmark):
+    """ Vazão do decodificador do controlador, alimentado em blocos de 64 KB como em read_messages """
+    data = _worker_output()
+    chunks = [data[i:i + 65536] for i in range(0, len(data), 65536)]
+
+    def parse():
+        decoder = MessageDecoder("cam")
+        count = 0
+        for chunk in chunks:
+            count += len(decoder.feed(chunk))
+        return count
+
+    count = benchmark(parse)
+    assert count > 2000
+    if benchmark.stats:
+        benchmark.extra_info["mb_per_s"] = round(len(data) / benchmark.stats.stats.median / 1e6, 1)
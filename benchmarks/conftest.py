@@ -0,0 +1,76 @@
+""" Micro-benchmarks dos trechos quentes do detector_worker, um por etapa.
+
+Os baselines ficam em benchmarks/baselines, de qualquer diretório em que o pytest for chamado:
+
+    python -m pytest benchmarks                                    # só mede
+    python -m pytest benchmarks --benchmark-save=baseline          # grava um novo baseline
+    python -m pytest benchmarks --benchmark-compare=0001 --benchmark-compare-fail=median:20%
+
+O último comando compara com o baseline 0001 da máquina (sem número, com o mais recente) e
+falha se a mediana de qualquer etapa piorar mais de 20%. Os baselines são por máquina (pasta
+por sistema/Python/arquitetura). Grave um na máquina de produção antes de usar a comparação como
+critério de deploy.
+
+O baseline 0001 do repositório foi gravado sem ultralytics/easyocr instalados e cobre só a
+captura, o recorte da ROI, o leitor de dígitos e o protocolo worker→controlador: bench_yolo e
+bench_easyocr_roi não têm com o que ser comparados (o pytest-benchmark apenas os mede, sem
+falhar). Para proteger a inferência e o OCR, grave o baseline numa máquina com os dois pacotes.
+
+YOLO e EasyOCR são pulados quando ultralytics/easyocr não estão instalados; os pesos precisam
+já estar baixados para rodar sem rede.
+"""
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from loadtest import generate_synthetic_video
+
+FRAME_SIZE = (1280, 720)
+# ROI no formato do cameras_config.json: (y1, y2, x1, x2).
+ROI = (200, 320, 500, 780)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Roda antes do pytest-benchmark abrir o armazenamento: 'file://baselines' do pytest.ini vale
+    # relativo a esta pasta, e não ao diretório atual.
+    storage = config.getoption("benchmark_storage", None)
+    if storage and storage.startswith("file://") and not os.path.isabs(storage[len("file://"):]):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), storage[len("file://"):])
+        config.option.benchmark_storage = "file://" + os.path.normpath(path)
+
+
+def pytest_addoption(parser):
+    parser.addoption("--bench_device", default='cpu', help="Dispositivo da inferência YOLO (cpu, cuda:0...)")
+    parser.addoption("--bench_backend", default='torch', help="Backend do YOLO (ver model_backends.BACKENDS)")
+
+
+@pytest.fixture(scope="session")
+def video_path(tmp_path_factory):
+    path = os.path.join(tmp_path_factory.mktemp("video"), "synthetic.avi")
+    return generate_synthetic_video(path, *FRAME_SIZE, fps=15, seconds=4)
+
+
+@pytest.fixture(scope="session")
+def frame(video_path):
+    cap = cv2.VideoCapture(video_path)
+    ret, image = cap.read()
+    cap.release()
+    assert ret, "O vídeo sintético não pôde ser lido."
+    return image
+
+
+def render_reading(text):
+    """ Quadro com 'text' desenhado dentro da ROI, como um display de temperatura """
+    width, height = FRAME_SIZE
+    image = np.full((height, width, 3), 30, dtype=np.uint8)
+    y1, y2, x1, x2 = ROI
+    cv2.putText(image, text, (x1 + 20, y2 - 30), cv2.FONT_HERSHEY_SIMPLEX, 2.5, (255, 255, 255), 6)
+    return image
+
+
+@pytest.fixture(scope="session")
+def temperature_frame():
+    return render_reading("23,5")
@@ -0,0 +1,148 @@
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+
+class ClipRecorder:
+    """ Buffer circular dos últimos segundos da câmera e gravação de clipes dos alertas.
+
+    push() é chamado pela thread de captura a cada quadro e só guarda a referência. Uma thread
+    própria amostra os quadros a 'fps', comprime em JPEG e mantém os últimos 'pre_seconds'
+    segundos, limitados a 'max_buffer_mb' de memória (os mais antigos saem primeiro).
+    trigger() devolve na hora o caminho do clipe; ele é gravado por uma terceira thread quando os
+    'post_seconds' seguintes chegam, então o laço de detecção nunca espera pelo codificador.
+    Os instantes são os de time.monotonic(), os mesmos de LatestFrameCapture.frame_ts.
+    """
+
+    def __init__(self, cam_name, directory, pre_seconds=5.0, post_seconds=5.0, fps=5.0, max_buffer_mb=32,
+                 quality=80):
+        self.cam_name = cam_name
+        self.directory = directory
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.fps = fps
+        self.max_bytes = int(max_buffer_mb * 1024 * 1024)
+        self.quality = quality
+        self._buffer = deque()  # (capture_ts, jpeg)
+        self._buffer_bytes = 0
+        self._pending = []  # [início, fim, caminho] dos clipes aguardando os quadros pós-evento
+        self._lock = threading.Lock()
+        self._latest = None
+        self._new_frame = threading.Event()
+        self._stop_signal = threading.Event()
+        self._writes = queue.Queue()
+        self._encoder = threading.Thread(target=self._encode_loop, daemon=True)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.clips_written = 0
+        self.frames_evicted = 0  # quadros descartados antes do tempo por falta de memória
+
+    def start(self):
+        self._encoder.start()
+        self._writer.start()
+        return self
+
+    def push(self, frame, capture_ts):
+        # Cada cap.read() devolve um array novo, então guardar a referência dispensa a cópia.
+        self._latest = (frame, capture_ts)
+        self._new_frame.set()
+
+    def trigger(self, event_ts=None):
+        """ Agenda o clipe em torno de 'event_ts' e devolve o caminho em que ele será gravado """
+        event_ts = time.monotonic() if event_ts is None else event_ts
+        now = datetime.now()
+        safe_name = re.sub(r'[^\w.-]+', '_', self.cam_name)
+        filename = f"{safe_name}_{now:%Y%m%d_%H%M%S}_{now.microsecond // 1000:03d}.avi"
+        path = os.path.abspath(os.path.join(self.directory, filename))
+        with self._lock:
+            self._pending.append([event_ts - self.pre_seconds, event_ts + self.post_seconds, path])
+        return path
+
+    def _append(self, capture_ts, jpeg):
+        with self._lock:
+            self._buffer.append((capture_ts, jpeg))
+            self._buffer_bytes += len(jpeg)
+            # Quadros ainda necessários a um clipe pendente ficam, desde que caibam na memória.
+            keep_from = min([capture_ts - self.pre_seconds] + [start for start, _, _ in self._pending])
+            while len(self._buffer) > 1 and (self._buffer[0][0] < keep_from or self._buffer_bytes > self.max_bytes):
+                if self._buffer[0][0] >= keep_from:
+                    self.frames_evicted += 1
+                _, old = self._buffer.popleft()
+                self._buffer_bytes -= len(old)
+
+    def _flush_pending(self, last_ts, force=False):
+        with self._lock:
+            ready = [clip for clip in self._pending if force or clip[1] <= last_ts]
+            self._pending = [clip for clip in self._pending if clip not in ready]
+            for start, end, path in ready:
+                self._writes.put((path, [item for item in self._buffer if start <= item[0] <= end]))
+
+    def _encode_loop(self):
+        last_ts = 0.0
+        while not self._stop_signal.is_set():
+            self._new_frame.wait(timeout=0.5)
+            self._new_frame.clear()
+            latest = self._latest
+            if latest is not None and latest[1] - last_ts >= 1.0 / self.fps:
+                frame, last_ts = latest
+                ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                if ok:
+                    self._append(last_ts, jpeg.tobytes())
+            # Sem quadros novos (câmera caída), o clipe sai com o que houver depois do prazo.
+            self._flush_pending(max(last_ts, time.monotonic() - self.post_seconds))
+        self._flush_pending(last_ts, force=True)
+        self._writes.put(None)
+
+    def _write_loop(self):
+        while True:
+            item = self._writes.get()
+            if item is None:
+                break
+            path, frames = item
+            try:
+                self._write_clip(path, frames)
+            except (OSError, cv2.error) as e:
+                print(f"[{self.cam_name}] Falha ao gravar o clipe '{path}': {e}", flush=True)
+
+    def _write_clip(self, path, frames):
+        if not frames:
+            print(f"[{self.cam_name}] Clipe '{path}' sem quadros no buffer; nada gravado.", flush=True)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        duration = frames[-1][0] - frames[0][0]
+        fps = (len(frames) - 1) / duration if len(frames) > 1 and duration > 0 else self.fps
+        writer = None
+        try:
+            for _, jpeg in frames:
+                image = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+                if writer is None:
+                    size = (image.shape[1], image.shape[0])
+                    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, size)
+                    if not writer.isOpened():
+                        raise OSError("não foi possível abrir o arquivo de vídeo")
+                if (image.shape[1], image.shape[0]) != size:
+                    image = cv2.resize(image, size)  # resolução mudou após uma reconexão
+                writer.write(image)
+        finally:
+            if writer is not None:
+                writer.release()
+        self.clips_written += 1
+
+    def summary(self):
+        with self._lock:
+            seconds = self._buffer[-1][0] - self._buffer[0][0] if len(self._buffer) > 1 else 0.0
+            return {"buffer_mb": round(self._buffer_bytes / (1024 * 1024), 1), "buffer_seconds": round(seconds, 1),
+                    "pending": len(self._pending), "clips": self.clips_written, "evicted": self.frames_evicted}
+
+    def stop(self, timeout=10.0):
+        """ Grava os clipes pendentes com os quadros que já estão no buffer e encerra as threads """
+        self._stop_signal.set()
+        self._new_frame.set()
+        self._encoder.join(timeout=2)
+        self._writer.join(timeout=timeout)
@@ -1,45 +1,166 @@
+import time
+
+PROCESS_START = time.monotonic()  # Antes das demais importações: base do relatório de inicialização.
+
 import cv2
-import json
-import torch
 import threading
-import time
 import argparse
+import importlib.util
+import json
 import sys
-from datetime import datetime
-import numpy as np
-import re
-import requests
+from alert_rules import TemperatureRule
+from clip_recorder import ClipRecorder
+from digit_recognizer import DigitRecognizer, TemperatureReader
+from inference_server import InferenceClient
+from frame_capture import LatestFrameCapture, PacedVideoFile
+from frame_bus import FramePublisher
+from motion_gate import MotionGate
+from object_tracker import IoUTracker
+from ocr_cache import OcrCache
+from roi_zones import build_zones, crop_roi, detect_zones, zones_bounds
+from model_backends import BACKENDS, load_model
+from worker_protocol import ControlChannel, DetectionChannel, Heartbeat, send_message, timestamp
+from worker_stats import StartupTimer, WorkerStats, format_startup
+
+# Dependências pesadas (torch, ultralytics, easyocr) são importadas só pelo modo que as usa:
+# um worker de temperatura não carrega o YOLO e um de objetos não carrega o EasyOCR.
+YOLO_AVAILABLE = importlib.util.find_spec('ultralytics') is not None
+OCR_AVAILABLE = importlib.util.find_spec('easyocr') is not None
+
+startup = StartupTimer(PROCESS_START)
+startup.mark('imports')
+
+DROP_REPORT_INTERVAL = 60  # segundos entre relatórios de quadros descartados/pulados
+DETECTION_CONF = 0.5  # confiança mínima das detecções YOLO (ao vivo e offline)
+OCR_INTERVAL = 1.0  # segundos entre leituras de temperatura
+
+
+# Detecções só são enviadas com uma Live View inscrita (comando 'subscribe' no stdin).
+detection_channel = DetectionChannel()
+# Quadros só são copiados para o frame bus com um leitor inscrito (Live View, mosaico ou seletor
+# de ROI): comando 'subscribe' com topic 'frames'.
+frame_readers = threading.Event()
+
+
+def set_subscription(command, subscribed):
+    """ Comandos 'subscribe'/'unsubscribe' do controlador para o tópico 'detections' ou 'frames' """
+    if command.get("topic") == "frames":
+        if subscribed:
+            frame_readers.set()
+        else:
+            frame_readers.clear()
+    elif subscribed:
+        detection_channel.subscribe()
+    else:
+        detection_channel.unsubscribe()
 
 
 def report_error(cam_name, message):
-    error_data = {"type": "error", "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "camera": cam_name,
-                  "message": message}
-    print(json.dumps(error_data), flush=True)
+    error_data = {"type": "error", "timestamp": timestamp(), "camera": cam_name, "message": message}
+    send_message(error_data)
+
+
+def send_alert(cam_name, message, frame_seq=None, capture_ts=None, clip_recorder=None):
+    log_data = {"type": "alert", "timestamp": timestamp(), "camera": cam_name, "message": message}
+    if frame_seq is not None:
+        # Quadro que originou o alerta; o controlador calcula a latência quadro→alerta.
+        log_data.update({"frame_seq": frame_seq, "capture_ts": capture_ts})
+    if clip_recorder is not None:
+        # O clipe ainda será gravado (aguarda os segundos pós-evento); o caminho já vai no alerta.
+        log_data["clip"] = clip_recorder.trigger(capture_ts or None)
+    send_message(log_data)
+
+
+def send_detection_data(cam_name, detections, roi=None, offset=(0, 0), frame_seq=0, capture_ts=0.0):
+    # O controlador já sabe de qual câmera é o stdout; o nome não vai no quadro binário.
+    detection_channel.send(detections, roi, offset, frame_seq, capture_ts)
+
+
+def open_monitored_capture(cam_name, video_url, publisher, max_backoff, stats=None, loop_fps=0, clip_recorder=None):
+    """ Abre a câmera em uma LatestFrameCapture que reconecta sozinha quando o sinal cai.
+    Com loop_fps, 'video_url' é um arquivo local tocado em loop nesse ritmo (câmera simulada). """
+    if loop_fps:
+        def open_source():
+            return PacedVideoFile(video_url, loop_fps)
+    else:
+        def open_source():
+            return cv2.VideoCapture(video_url)
+
+    cap = open_source()
+    if not cap.isOpened():
+        report_error(cam_name, f"Não foi possível conectar à câmera: {video_url}")
+        return None
+
+    def on_restored(downtime, attempts):
+        print(f"[{cam_name}] Sinal de vídeo restabelecido após {downtime:.0f} s ({attempts} tentativa(s)).",
+              flush=True)
+
+    return LatestFrameCapture(cap, publisher, reopen=open_source, max_backoff=max_backoff,
+                              on_lost=lambda: report_error(cam_name, "Sinal de vídeo perdido. Tentando reconectar..."),
+                              on_restored=on_restored, stats=stats, recorder=clip_recorder).start()
+
+
+def create_tracker(args):
+    """ IoUTracker do modo 'object', ou None sem --tracker """
+    if not args.tracker:
+        return None
+    return IoUTracker(args.track_iou, args.track_max_age, args.track_min_hits)
 
 
-def send_alert(cam_name, message):
-    log_data = {"type": "alert", "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "camera": cam_name,
-                "message": message}
-    print(json.dumps(log_data), flush=True)
+def create_clip_recorder(args):
+    """ ClipRecorder da câmera, ou None se os clipes de alerta estiverem desativados (--clip_dir vazio) """
+    if not args.clip_dir:
+        return None
+    return ClipRecorder(args.name, args.clip_dir, args.clip_pre, args.clip_post, args.clip_fps,
+                        args.clip_buffer_mb, args.clip_quality).start()
 
 
-def send_detection_data(cam_name, detections, roi=None, offset=(0, 0)):
-    detection_payload = {
-        "type": "detection",
-        "camera": cam_name,
-        "detections": detections,
-        "roi": roi,
-        "offset": offset
-    }
-    print(json.dumps(detection_payload), flush=True)
+def start_stats_reporter(cam_name, stats, capture, interval, motion_gate=None, extras=None):
+    """ Envia a mensagem 'stats' a cada 'interval' segundos (None se desativado).
+    'extras' mapeia chaves da mensagem a objetos com summary() (cache do OCR, leitor...). """
+    if interval <= 0:
+        return None
 
+    def snapshot():
+        data = stats.snapshot(capture.frames_dropped, motion_gate.frames_skipped if motion_gate else None)
+        for key, source in (extras or {}).items():
+            if source is not None:
+                data[key] = source.summary()
+        return data
 
-try:
-    from ultralytics import YOLO
+    return Heartbeat(cam_name, snapshot, interval, msg_type="stats").start()
+
+
+def startup_ready(cam_name):
+    """ Marca a primeira análise concluída e informa quanto tempo a inicialização levou """
+    if 'ready' in startup.marks:
+        return
+    startup.mark('ready')
+    print(f"[{cam_name}] Pronto em {startup.marks['ready']:.1f} s ({format_startup(startup.marks)}).", flush=True)
+
+
+def stats_mark(stats, stage, stage_start):
+    """ Registra a duração da etapa que começou em 'stage_start' e devolve o início da próxima """
+    now = time.perf_counter()
+    stats.record(stage, now - stage_start)
+    return now
+
+
+def capture_status(capture):
+    """ Estado enviado no heartbeat para o watchdog do supervisor """
+    return {"state": "reconnecting" if capture.reconnecting else "streaming",
+            "reconnects": capture.reconnects, "downtime": round(capture.downtime(), 1),
+            "stalled": round(capture.stalled_for(), 1)}
+
+
+def report_dropped_frames(cam_name, capture, motion_gate=None):
+    print(f"[{cam_name}] Quadros descartados (inferência mais lenta que a câmera): "
+          f"{capture.frames_dropped} de {capture.frames_read} ({capture.drop_ratio():.1%}).", flush=True)
+    if motion_gate:
+        print(f"[{cam_name}] Quadros sem movimento (inferência pulada): "
+              f"{motion_gate.frames_skipped} de {motion_gate.frames_seen} ({motion_gate.skip_ratio():.1%}).",
+              flush=True)
 
-    YOLO_AVAILABLE = True
-except ImportError:
-    YOLO_AVAILABLE = False
 
 YOLO_CLASSES = {0: 'pessoa', 1: 'bicicleta', 2: 'carro', 3: 'motocicleta', 4: 'avião', 5: 'ônibus', 6: 'trem',
                 7: 'caminhão', 8: 'barco', 9: 'semáforo', 10: 'hidrante', 11: 'placa de pare', 12: 'parquímetro',
@@ -56,176 +177,349 @@ YOLO_CLASSES = {0: 'pessoa', 1: 'bicicleta', 2: 'carro', 3: 'motocicleta', 4: 'a
                 77: 'ursinho de pelúcia', 78: 'secador de cabelo', 79: 'escova de dentes'}
 
 
+def gpu_available():
+    import torch
+    return torch.cuda.is_available()
+
+
+def preload_worker(args):
+    """ Worker em espera: carrega e aquece (uma inferência em imagem vazia) o que o modo vai usar.
+    Ao receber a câmera, load_model/load_ocr_reader devolvem as instâncias já carregadas. """
+    import numpy as np
+
+    start = time.monotonic()
+    try:
+        if args.mode == 'object' and not args.inference_server and YOLO_AVAILABLE:
+            device = args.device if args.device == 'cpu' or gpu_available() else 'cpu'
+            model = load_model("yolo12n.pt", args.backend, args.int8, args.imgsz)
+            model(np.zeros((args.imgsz, args.imgsz, 3), dtype=np.uint8), imgsz=args.imgsz, verbose=False,
+                  device=device)
+        elif args.mode == 'temperature' and args.ocr_engine == 'easyocr' and not args.inference_server \
+                and OCR_AVAILABLE:
+            load_ocr_reader(args.gpu).readtext(np.zeros((32, 96), dtype=np.uint8))
+        else:
+            return
+    except Exception as e:
+        # O worker ainda pode receber a câmera; o carregamento normal tenta de novo e informa o erro.
+        report_error(args.name, f"Falha ao pré-carregar o modelo: {e}")
+        return
+    print(f"[{args.name}] Modelo pré-carregado em {time.monotonic() - start:.1f} s.", flush=True)
+
+
+def wait_for_assignment(parser, args, control):
+    """ Pré-carrega o modo e aguarda o comando 'assign' com a linha de comando da câmera.
+    Devolve os argumentos da câmera, ou None se o controlador encerrou o worker antes disso. """
+    preload_worker(args)
+    assigned = []
+    ready = threading.Event()
+
+    def assign(command):
+        if not assigned:
+            assigned.append(command["argv"])
+            ready.set()
+
+    control.handlers["assign"] = assign
+    control.on_eof = ready.set
+    control.start()
+    print(f"[{args.name}] Aguardando uma câmera.", flush=True)
+    ready.wait()
+    if not assigned:
+        return None
+    startup.restart()
+    startup.mark('imports')
+    return parser.parse_args(assigned[0])
+
+
 def start_yolo_monitoring(cam_name, video_url, object_ids_str, device, rearm_time, quantity, exact_number, sensitivity,
-                          roi=None):
-    if device != 'cpu' and not torch.cuda.is_available():
+                          roi=None, inference_server=None, motion_gate=None, backend='torch', int8=False, imgsz=640,
+                          watchdog_interval=2.0, max_backoff=30.0, stats_interval=10.0, loop_fps=0,
+                          clip_recorder=None, tracker_factory=None, keyframe_interval=1, dwell_time=0, zones=None):
+    if not inference_server and device != 'cpu' and YOLO_AVAILABLE and not gpu_available():
         print(f"AVISO: GPU solicitada (device='{device}'), mas não disponível. Usando CPU como alternativa.",
               flush=True)
         device = 'cpu'
 
-    if not YOLO_AVAILABLE:
-        report_error(cam_name, "Ultralytics/YOLO não está instalado.")
-        return
-
     try:
-        target_ids = [int(i.strip()) for i in object_ids_str.split(',')]
-    except (ValueError, TypeError):
-        report_error(cam_name, f"Formato de IDs de objeto inválido: '{object_ids_str}'.")
+        # Sem --zones, uma única zona com a ROI (ou o quadro inteiro) e as regras da câmera.
+        zone_list = build_zones(zones, roi, object_ids_str, quantity, exact_number, sensitivity, rearm_time,
+                                YOLO_CLASSES, tracker_factory, dwell_time)
+    except (ValueError, TypeError, AttributeError):
+        report_error(cam_name, f"Formato de IDs de objeto inválido: '{object_ids_str}' (ou em uma das zonas).")
         return
+    target_ids = sorted(set().union(*(zone.target_ids for zone in zone_list)))
+    rois = [zone.roi for zone in zone_list]
+    single_zone = len(zone_list) == 1
+    tracking = zone_list[0].tracker is not None
 
-    try:
-        model = YOLO("yolo12n.pt")
-    except Exception as e:
-        report_error(cam_name, f"Falha ao carregar modelo YOLO: {e}")
-        return
+    if inference_server:
+        # Modo servidor: o modelo fica em um único processo compartilhado por todas as câmeras.
+        try:
+            client = InferenceClient(inference_server, cam_name)
+        except (OSError, RuntimeError) as e:
+            report_error(cam_name, f"Falha ao conectar ao servidor de inferência ({inference_server}): {e}")
+            return
+
+        def detect_batch(images):
+            return client.detect(images, target_ids, conf=DETECTION_CONF, imgsz=imgsz)
+    else:
+        if not YOLO_AVAILABLE:
+            report_error(cam_name, "Ultralytics/YOLO não está instalado.")
+            return
 
-    cap = cv2.VideoCapture(video_url)
-    if not cap.isOpened():
-        report_error(cam_name, f"Não foi possível conectar à câmera: {video_url}")
+        try:
+            # Os modelos exportados têm lote fixo 1; com várias zonas os recortes vão juntos numa
+            # única chamada e o backend precisa da exportação com lote dinâmico.
+            model = load_model("yolo12n.pt", backend, int8, imgsz, dynamic=not single_zone and backend != 'torch')
+        except Exception as e:
+            report_error(cam_name, f"Falha ao carregar modelo YOLO (backend '{backend}'): {e}")
+            return
+
+        def detect_batch(images):
+            results = model(images, classes=target_ids, conf=DETECTION_CONF, imgsz=imgsz, verbose=False, device=device)
+            return [result.boxes.data.tolist() if result.boxes else [] for result in results]
+    startup.mark('model')
+
+    stats = WorkerStats()
+    capture = open_monitored_capture(cam_name, video_url, FramePublisher(cam_name, readers=frame_readers),
+                                     max_backoff, stats, loop_fps, clip_recorder)
+    if capture is None:
         return
+    heartbeat = Heartbeat(cam_name, lambda: capture_status(capture), watchdog_interval).start() \
+        if watchdog_interval > 0 else None
+    startup.mark('capture')
+    stats_reporter = start_stats_reporter(cam_name, stats, capture, stats_interval, motion_gate,
+                                          extras={"startup": startup, "clips": clip_recorder})
 
-    last_alert_time = 0
-    condition_start_time = 0
-    is_condition_active = False
+    last_drop_report = time.time()
+    zone_detections = [[] for _ in zone_list]
+    detections_seq, detections_ts = 0, 0.0  # Quadro em que as detecções atuais foram calculadas
+    frames_to_keyframe = 0  # Com rastreamento, quadros até a próxima inferência completa
 
     while True:
-        ret, frame = cap.read()
+        ret, frame = capture.read()
         if not ret:
             report_error(cam_name, "Sinal de vídeo perdido.")
             break
 
-        frame_to_process = frame
-        offset_x, offset_y = 0, 0
-        if roi:
-            y1, y2, x1, x2 = roi
-            frame_to_process = frame[y1:y2, x1:x2]
-            offset_x, offset_y = x1, y1
-
-        try:
-            results = model(frame_to_process, classes=target_ids, conf=0.5, verbose=False, device=device)
-            detections = results[0].boxes.data.tolist() if results[0].boxes else []
-        except Exception as e:
-            report_error(cam_name, f"Erro durante a inferência do modelo YOLO: {e}")
-            time.sleep(1)
-            continue
-
-        send_detection_data(cam_name, detections, roi, (offset_x, offset_y))
-
-        detection_count = len(detections)
-        quantity_condition_met = (detection_count == quantity) if exact_number else (detection_count >= quantity)
+        if time.time() - last_drop_report >= DROP_REPORT_INTERVAL:
+            report_dropped_frames(cam_name, capture, motion_gate)
+            last_drop_report = time.time()
 
+        stage_start = time.perf_counter()
         current_time = time.time()
 
-        if quantity_condition_met:
-            if not is_condition_active:
-                is_condition_active = True
-                condition_start_time = current_time
-
-            if (current_time - condition_start_time) >= sensitivity and (current_time - last_alert_time) > rearm_time:
-                object_names = [YOLO_CLASSES.get(int(d[5]), "Objeto") for d in detections]
-                message = f"{detection_count} objeto(s) detectado(s): {', '.join(object_names)}"
-                send_alert(cam_name, message)
-                last_alert_time = current_time
+        # Sem movimento na ROI, a cena (e a contagem) é a mesma da última inferência:
+        # as detecções anteriores continuam alimentando os temporizadores de alerta.
+        # Com rastreamento, só os quadros-chave (1 a cada 'keyframe_interval') passam pelo modelo.
+        keyframe = not tracking or frames_to_keyframe <= 0
+        run_inference = keyframe and (motion_gate is None or motion_gate.should_infer(
+            crop_roi(frame, zone_list[0].roi if single_zone else zones_bounds(zone_list, frame.shape)),
+            current_time))
+        stage_start = stats_mark(stats, 'preprocess', stage_start)
+        if run_inference:
+            try:
+                zone_detections = detect_zones(detect_batch, [frame], rois, imgsz)[0]
+            except (EOFError, ConnectionError) as e:
+                report_error(cam_name, f"Conexão com o servidor de inferência perdida: {e}")
+                break
+            except Exception as e:
+                report_error(cam_name, f"Erro durante a inferência do modelo YOLO: {e}")
+                time.sleep(1)
+                continue
+            detections_seq, detections_ts = capture.frame_seq, capture.frame_ts
+            stage_start = stats_mark(stats, 'inference', stage_start)
+            startup_ready(cam_name)
+
+        if tracking:
+            frames_to_keyframe = keyframe_interval - 1 if keyframe else frames_to_keyframe - 1
+            # As caixas propagadas são a estimativa para o quadro atual, não para o da inferência.
+            boxes_seq, boxes_ts = capture.frame_seq, capture.frame_ts
         else:
-            is_condition_active = False
-            condition_start_time = 0
-
-        time.sleep(1 / 30)  # Simula o processamento para não sobrecarregar
-
-    cap.release()
-
-
-# (O resto do arquivo permanece o mesmo, incluindo o código de OCR e o __main__)
-# ...
-# (O código de OCR e o __main__ permanecem inalterados)
-# ...
+            boxes_seq, boxes_ts = detections_seq, detections_ts
+        boxes, alert_messages = [], []
+        for zone, detections in zip(zone_list, zone_detections):
+            # Sem inferência (entre quadros-chave ou segurada pelo filtro de movimento), as
+            # trilhas só são propagadas: detecções antigas não podem confirmá-las de novo.
+            zone_boxes, messages = zone.update(detections, current_time, run_inference)
+            alert_messages.extend(messages)
+            if single_zone:
+                boxes = zone_boxes
+            else:
+                offset_x, offset_y = zone.offset
+                boxes.extend([x1 + offset_x, y1 + offset_y, x2 + offset_x, y2 + offset_y, conf, cls]
+                             for x1, y1, x2, y2, conf, cls in zone_boxes)
+        stage_start = stats_mark(stats, 'alert', stage_start)
+
+        # Com várias zonas, as caixas vão em coordenadas do quadro e a Live View desenha as zonas
+        # a partir da configuração da câmera.
+        if single_zone:
+            send_detection_data(cam_name, boxes, zone_list[0].roi, zone_list[0].offset, boxes_seq, boxes_ts)
+        else:
+            send_detection_data(cam_name, boxes, None, (0, 0), boxes_seq, boxes_ts)
+        for alert_message in alert_messages:
+            send_alert(cam_name, alert_message, boxes_seq, boxes_ts, clip_recorder)
+        stats_mark(stats, 'emit', stage_start)
+        stats.frame_done()
 
-try:
-    import easyocr
+    for reporter in (heartbeat, stats_reporter):
+        if reporter is not None:
+            reporter.stop()
+    report_dropped_frames(cam_name, capture, motion_gate)
+    capture.release()
+    if clip_recorder is not None:
+        clip_recorder.stop()
 
-    OCR_AVAILABLE = True
-except ImportError:
-    OCR_AVAILABLE = False
 
 ocr_data_lock = threading.Lock()
 ocr_latest_frame = None
 ocr_exit_signal = threading.Event()
+_ocr_readers = {}
+
+
+def load_ocr_reader(gpu):
+    """ easyocr.Reader do processo, criado uma vez (importa o EasyOCR/torch só aqui) """
+    if gpu not in _ocr_readers:
+        import easyocr
+        _ocr_readers[gpu] = easyocr.Reader(['en'], gpu=gpu)
+    return _ocr_readers[gpu]
+
+
+def easyocr_texts(reader):
+    """ Função ROI em cinza -> textos usando um easyocr.Reader """
+    def read(gray_roi):
+        return [texto for _, texto, _ in reader.readtext(gray_roi, detail=1, allowlist='0123456789,.')]
+    return read
+
+
+def create_text_reader(engine, gpu, digit_templates=None, digit_confidence=0.6, on_error=print,
+                       inference_server=None, cam_name=None):
+    """ Leitor do modo temperatura (função ROI em cinza -> textos) para o 'engine' pedido:
+    'easyocr' (carregado aqui), 'digits' (só o DigitRecognizer) ou 'auto' (DigitRecognizer com o
+    EasyOCR como fallback, carregado apenas na primeira leitura de baixa confiança).
+    Com 'inference_server', o EasyOCR é o do servidor compartilhado, e não um por processo. """
+    def load_easyocr():
+        if inference_server:
+            client = InferenceClient(inference_server, cam_name)
+            return lambda gray_roi: client.read_text([gray_roi])[0]
+        if not OCR_AVAILABLE:
+            raise RuntimeError("EasyOCR não está instalado.")
+        return easyocr_texts(load_ocr_reader(gpu))
+
+    if engine == 'easyocr':
+        return load_easyocr()
+
+    recognizer = DigitRecognizer.load(digit_templates) if digit_templates else DigitRecognizer()
+    fallback = None
+    if engine == 'auto' and (inference_server or OCR_AVAILABLE):
+        fallback_reader = []
+
+        def fallback(gray_roi):
+            if not fallback_reader:
+                try:
+                    fallback_reader.append(load_easyocr())
+                except Exception as e:
+                    on_error(f"Falha ao iniciar EasyOCR: {e}. Seguindo só com o leitor de dígitos.")
+                    fallback_reader.append(lambda roi: [])
+            return fallback_reader[0](gray_roi)
+    return TemperatureReader(recognizer, digit_confidence, fallback)
 
 
-def ocr_worker(reader, cam_name, roi, limite, rearm_time):
+def read_roi_texts(read, frame, roi, cache=None):
+    """ Textos numéricos reconhecidos na ROI do quadro (mesmo pré-processamento ao vivo e offline).
+    'read' é um leitor de create_text_reader(). Com 'cache' (OcrCache), uma ROI igual a uma já
+    lida reaproveita o resultado sem ler de novo. """
+    y1, y2, x1, x2 = roi
+    gray_roi = cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+    return cache.read(gray_roi, lambda: read(gray_roi)) if cache is not None else read(gray_roi)
+
+
+def ocr_worker(reader, cam_name, roi, limite, rearm_time, stats, cache=None, clip_recorder=None):
     global ocr_latest_frame
-    alerta_ativo = False
-    ultimo_alerta_ts = 0
+    rule = TemperatureRule(limite, rearm_time)
 
     while not ocr_exit_signal.is_set():
         with ocr_data_lock:
-            frame_para_processar = ocr_latest_frame.copy() if ocr_latest_frame is not None else None
-        if frame_para_processar is None:
+            latest = ocr_latest_frame
+        if latest is None:
             time.sleep(0.1)
             continue
+        frame_para_processar, frame_seq, capture_ts = latest
 
-        y1, y2, x1, x2 = roi
-        roi_frame = frame_para_processar[y1:y2, x1:x2]
-        gray_roi = cv2.cvtColor(roi_frame, cv2.COLOR_BGR2GRAY)
-        resultados = reader.readtext(gray_roi, detail=1, allowlist='0123456789,.')
+        stage_start = time.perf_counter()
+        try:
+            textos = read_roi_texts(reader, frame_para_processar, roi, cache)
+        except (EOFError, ConnectionError) as e:
+            report_error(cam_name, f"Conexão com o servidor de inferência perdida: {e}")
+            ocr_exit_signal.set()
+            break
+        except Exception as e:
+            report_error(cam_name, f"Erro durante a leitura do OCR: {e}")
+            time.sleep(OCR_INTERVAL)
+            continue
+        stage_start = stats_mark(stats, 'inference', stage_start)
+        startup_ready(cam_name)
 
-        temp_encontrada = False
-        for _, texto, _ in resultados:
-            match = re.search(r'(\d+[,.]\d+)', texto)
-            if match:
-                try:
-                    temp = float(match.group(1).replace(',', '.'))
-                    temp_encontrada = True
-                    if temp >= limite:
-                        agora = time.time()
-                        if not alerta_ativo or (rearm_time > 0 and (agora - ultimo_alerta_ts) >= rearm_time):
-                            send_alert(cam_name, f"ALERTA DE TEMPERATURA: {temp:.1f}°C")
-                            ultimo_alerta_ts = agora
-                            alerta_ativo = True
-                    else:
-                        alerta_ativo = False
-                    break
-                except (ValueError, IndexError):
-                    continue
-        if not temp_encontrada:
-            alerta_ativo = False
-        time.sleep(1)
+        alert_message = rule.update(textos, time.time())
+        if alert_message:
+            send_alert(cam_name, alert_message, frame_seq, capture_ts, clip_recorder)
+        stats_mark(stats, 'alert', stage_start)
+        stats.frame_done()
+        time.sleep(OCR_INTERVAL)
 
 
 def start_ocr_monitoring(args):
     global ocr_latest_frame
-    if not OCR_AVAILABLE:
-        report_error(args.name, "EasyOCR não está instalado.")
-        return
-
     try:
-        reader = easyocr.Reader(['en'], gpu=args.gpu)
+        reader = create_text_reader(args.ocr_engine, args.gpu, args.digit_templates, args.digit_confidence,
+                                    on_error=lambda message: report_error(args.name, message),
+                                    inference_server=args.inference_server, cam_name=args.name)
     except Exception as e:
-        report_error(args.name, f"Falha ao iniciar EasyOCR: {e}")
+        report_error(args.name, f"Falha ao iniciar o leitor de temperatura: {e}")
         return
+    if args.ocr_engine == 'auto' and not (OCR_AVAILABLE or args.inference_server):
+        print(f"[{args.name}] EasyOCR não está instalado: leituras de baixa confiança não terão fallback.",
+              flush=True)
+    startup.mark('model')
 
+    stats = WorkerStats()
+    cache = OcrCache(args.ocr_cache_size, args.ocr_cache_tolerance) if args.ocr_cache_size > 0 else None
+    clip_recorder = create_clip_recorder(args)
     worker_thread = threading.Thread(target=ocr_worker,
-                                     args=(reader, args.name, args.roi, args.limite, args.rearm_time), daemon=True)
+                                     args=(reader, args.name, args.roi, args.limite, args.rearm_time, stats, cache,
+                                           clip_recorder),
+                                     daemon=True)
     worker_thread.start()
 
-    cap = cv2.VideoCapture(args.url)
-    if not cap.isOpened():
-        report_error(args.name, f"Não foi possível conectar à câmera: {args.url}")
+    capture = open_monitored_capture(args.name, args.url, FramePublisher(args.name, readers=frame_readers),
+                                     args.max_backoff, stats, args.loop_fps, clip_recorder)
+    if capture is None:
         ocr_exit_signal.set()
+        if clip_recorder is not None:
+            clip_recorder.stop()
         return
+    startup.mark('capture')
+    heartbeat = Heartbeat(args.name, lambda: capture_status(capture), args.watchdog_interval).start() \
+        if args.watchdog_interval > 0 else None
+    extras = {"ocr_cache": cache, "ocr_reader": reader if isinstance(reader, TemperatureReader) else None,
+              "startup": startup, "clips": clip_recorder}
+    stats_reporter = start_stats_reporter(args.name, stats, capture, args.stats_interval, extras=extras)
 
     while not ocr_exit_signal.is_set():
-        ret, frame = cap.read()
+        ret, frame = capture.read()
         if not ret:
             report_error(args.name, "Sinal de vídeo perdido.")
             break
         with ocr_data_lock:
-            ocr_latest_frame = frame
-        time.sleep(1 / 30)
+            ocr_latest_frame = (frame, capture.frame_seq, capture.frame_ts)
 
     ocr_exit_signal.set()
     worker_thread.join()
-    cap.release()
+    for reporter in (heartbeat, stats_reporter):
+        if reporter is not None:
+            reporter.stop()
+    capture.release()
+    if clip_recorder is not None:
+        clip_recorder.stop()
 
 
 if __name__ == "__main__":
@@ -243,6 +537,16 @@ if __name__ == "__main__":
     parser.add_argument("--receptor_url")
     parser.add_argument("--receptor_port", type=int)
     parser.add_argument("--gpu", action="store_true")
+    parser.add_argument("--ocr_cache_size", type=int, default=32,
+                        help="Leituras do OCR guardadas para ROIs que não mudaram (0 desativa o cache)")
+    parser.add_argument("--ocr_cache_tolerance", type=int, default=12,
+                        help="Variação máxima (níveis de cinza) da miniatura da ROI para reaproveitar a leitura")
+    parser.add_argument("--ocr_engine", default='auto', choices=['auto', 'digits', 'easyocr'],
+                        help="Leitor do display: dígitos com fallback no EasyOCR (auto), só dígitos ou só EasyOCR")
+    parser.add_argument("--digit_templates", help="Templates do display gerados por 'digit_recognizer.py calibrate' "
+                                                  "(padrão: decodificação de sete segmentos)")
+    parser.add_argument("--digit_confidence", type=float, default=0.6,
+                        help="Confiança mínima do leitor de dígitos; abaixo dela usa o EasyOCR (modo auto)")
 
     # Args de Objetos
     parser.add_argument("--object_ids")
@@ -250,32 +554,119 @@ if __name__ == "__main__":
     parser.add_argument("--exact_number", action="store_true")
     parser.add_argument("--sensitivity", type=int, default=0)
     parser.add_argument("--device", default='0', help="Dispositivo para rodar o modelo ('cpu', '0' para GPU)")
+    parser.add_argument("--backend", default='torch', choices=BACKENDS,
+                        help="Backend de inferência (modelos exportados ficam em cache no disco)")
+    parser.add_argument("--int8", action="store_true", help="Usa a exportação quantizada em INT8 (onnx/openvino)")
+    parser.add_argument("--imgsz", type=int, default=640, help="Resolução de entrada do modelo")
+    parser.add_argument("--inference_server", help="Endereço 'host:porta' do servidor de inferência compartilhado")
+    parser.add_argument("--detection_rate", type=float, default=10,
+                        help="Máximo de mensagens de detecção por segundo para a Live View")
+    parser.add_argument("--motion_gate", action="store_true", help="Roda o modelo apenas quando há movimento na ROI")
+    parser.add_argument("--motion_threshold", type=float, default=0.005,
+                        help="Fração de pixels alterados que caracteriza movimento")
+    parser.add_argument("--heartbeat", type=float, default=5.0,
+                        help="Intervalo máximo (s) entre inferências mesmo sem movimento")
+    parser.add_argument("--zones", type=json.loads,
+                        help="Zonas nomeadas em JSON: [{name, roi: [y1, y2, x1, x2], object_ids, quantity, "
+                             "exact_number}]; cada zona tem seus próprios alertas (substitui --roi)")
+    parser.add_argument("--tracker", action="store_true",
+                        help="Rastreia os objetos (IDs persistentes) e conta as trilhas em vez das caixas de cada quadro")
+    parser.add_argument("--keyframe_interval", type=int, default=1,
+                        help="Com --tracker, roda o modelo a cada N quadros e propaga as trilhas nos demais")
+    parser.add_argument("--track_max_age", type=float, default=1.0,
+                        help="Segundos que uma trilha continua contando sem ser detectada "
+                             "(e no mínimo duas análises do modelo)")
+    parser.add_argument("--track_min_hits", type=int, default=2,
+                        help="Detecções associadas para uma trilha nova passar a contar")
+    parser.add_argument("--track_iou", type=float, default=0.3, help="IoU mínimo para associar detecção e trilha")
+    parser.add_argument("--dwell_time", type=float, default=0,
+                        help="Com --tracker, alerta objetos que permanecem por mais de N segundos (0 desativa)")
+
+    # Reconexão e watchdog (comum aos dois modos)
+    parser.add_argument("--watchdog_interval", type=float, default=2.0,
+                        help="Intervalo (s) entre heartbeats para o supervisor (0 desativa)")
+    parser.add_argument("--max_backoff", type=float, default=30.0,
+                        help="Espera máxima (s) entre tentativas de reconexão à câmera")
+    parser.add_argument("--stats_interval", type=float, default=10.0,
+                        help="Intervalo (s) entre mensagens de estatísticas de desempenho (0 desativa)")
+    parser.add_argument("--loop_fps", type=float, default=0,
+                        help="Trata --url como arquivo local tocado em loop neste ritmo (câmera simulada)")
+
+    # Clipes de alerta: buffer pré-evento em JPEG na memória (comum aos dois modos)
+    parser.add_argument("--clip_dir", default='', help="Diretório dos clipes de alerta (vazio desativa)")
+    parser.add_argument("--clip_pre", type=float, default=5.0, help="Segundos do clipe antes do alerta")
+    parser.add_argument("--clip_post", type=float, default=5.0, help="Segundos do clipe depois do alerta")
+    parser.add_argument("--clip_fps", type=float, default=5.0, help="Quadros por segundo guardados no buffer")
+    parser.add_argument("--clip_buffer_mb", type=float, default=32,
+                        help="Memória máxima (MB) do buffer de quadros comprimidos da câmera")
+    parser.add_argument("--clip_quality", type=int, default=80, help="Qualidade JPEG dos quadros do buffer")
+
+    # Worker em espera do pool do supervisor (a câmera chega depois, no comando 'assign')
+    parser.add_argument("--standby", action="store_true",
+                        help="Worker em espera: pré-carrega o modelo do modo e aguarda o comando 'assign' no stdin")
+
+    # Análise offline de gravações (--url aponta para um arquivo de vídeo ou diretório)
+    parser.add_argument("--offline", action="store_true",
+                        help="Analisa vídeos gravados o mais rápido possível, sem ritmo de tempo real")
+    parser.add_argument("--output", help="Arquivo JSON Lines de resultados (padrão: <nome>_offline.jsonl)")
+    parser.add_argument("--workers", type=int, default=0, help="Processos de análise (padrão: metade dos núcleos)")
+    parser.add_argument("--segment_seconds", type=float, default=120.0,
+                        help="Duração dos trechos de vídeo distribuídos entre os processos")
+    parser.add_argument("--batch_size", type=int, default=8, help="Quadros por lote de inferência")
+    parser.add_argument("--all_detections", action="store_true",
+                        help="Grava também os quadros sem detecções")
 
     main_cam_name = "Desconhecida"
     try:
         args = parser.parse_args()
         main_cam_name = args.name
 
+        if args.offline:
+            from offline_analysis import run_offline
+            run_offline(args)
+            sys.exit(0)
+
+        control = ControlChannel({
+            "subscribe": lambda command: set_subscription(command, True),
+            "unsubscribe": lambda command: set_subscription(command, False),
+        })
+        if args.standby:
+            args = wait_for_assignment(parser, args, control)
+            if args is None:
+                sys.exit(0)
+            main_cam_name = args.name
+        else:
+            control.start()
+
         video_source = int(args.url) if args.url.isdigit() else args.url
         args.url = video_source
 
+        detection_channel.min_interval = 1.0 / args.detection_rate if args.detection_rate > 0 else 0.0
+
         if args.mode == 'temperature':
             print(f"[{args.name}] Iniciando em modo de LEITURA DE TEMPERATURA.", flush=True)
             start_ocr_monitoring(args)
         elif args.mode == 'object':
             print(f"[{args.name}] Iniciando em modo de DETECÇÃO DE OBJETOS.", flush=True)
+            gate = MotionGate(args.motion_threshold, args.heartbeat) if args.motion_gate else None
             start_yolo_monitoring(
                 args.name, args.url, args.object_ids, args.device,
                 args.rearm_time, args.quantity, args.exact_number, args.sensitivity,
-                args.roi
+                args.roi, args.inference_server, gate, args.backend, args.int8, args.imgsz,
+                args.watchdog_interval, args.max_backoff, args.stats_interval, args.loop_fps,
+                create_clip_recorder(args), lambda: create_tracker(args), args.keyframe_interval, args.dwell_time,
+                args.zones
             )
 
     except Exception as e:
-        if '--name' in sys.argv:
+        if main_cam_name == "Desconhecida" and '--name' in sys.argv:
             try:
                 main_cam_name = sys.argv[sys.argv.index('--name') + 1]
             except IndexError:
                 pass
-        report_error(main_cam_name, f"Erro fatal no worker: {e}")
+        if '--offline' in sys.argv:
+            print(f"[{main_cam_name}] Erro fatal na análise offline: {e}", flush=True)
+        else:
+            report_error(main_cam_name, f"Erro fatal no worker: {e}")
 
     print(f"[{main_cam_name}] Worker finalizado.", flush=True)
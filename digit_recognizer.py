@@ -0,0 +1,233 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from alert_rules import parse_temperature
+
+# Segmentos a..g (topo, sup. dir., inf. dir., base, inf. esq., sup. esq., meio) como regiões
+# relativas (x0, x1, y0, y1) da caixa do dígito.
+SEGMENT_REGIONS = (
+    (0.25, 0.75, 0.00, 0.15),
+    (0.70, 1.00, 0.15, 0.45),
+    (0.70, 1.00, 0.55, 0.85),
+    (0.25, 0.75, 0.85, 1.00),
+    (0.00, 0.30, 0.55, 0.85),
+    (0.00, 0.30, 0.15, 0.45),
+    (0.25, 0.75, 0.42, 0.58),
+)
+SEGMENT_DIGITS = {
+    (1, 1, 1, 1, 1, 1, 0): '0', (0, 1, 1, 0, 0, 0, 0): '1', (1, 1, 0, 1, 1, 0, 1): '2',
+    (1, 1, 1, 1, 0, 0, 1): '3', (0, 1, 1, 0, 0, 1, 1): '4', (1, 0, 1, 1, 0, 1, 1): '5',
+    (1, 0, 1, 1, 1, 1, 1): '6', (1, 1, 1, 0, 0, 0, 0): '7', (1, 1, 1, 1, 1, 1, 1): '8',
+    (1, 1, 1, 1, 0, 1, 1): '9',
+    # Variantes comuns: 6 sem o topo, 7 com o segmento f, 9 sem a base.
+    (0, 0, 1, 1, 1, 1, 1): '6', (1, 1, 1, 0, 0, 1, 0): '7', (1, 1, 1, 0, 0, 1, 1): '9',
+}
+SEGMENT_ON = 0.3  # fração preenchida a partir da qual o segmento conta como aceso
+GLYPH_SIZE = (16, 24)  # (largura, altura) dos glifos comparados com os templates
+GLYPH_ASPECT = 0.7  # glifos mais estreitos (o "1") são centralizados nessa proporção
+
+
+class DigitRecognizer:
+    """ Leitor rápido de displays numéricos (temperatura) para o modo 'temperature'.
+
+    Separa os caracteres da ROI por projeção de colunas e reconhece cada um por decodificação
+    de sete segmentos ou, se houver templates calibrados, por correlação com os glifos de
+    calibração da fonte do display. recognize() devolve o texto e uma confiança em [0, 1];
+    quem chama decide quando ela é baixa o bastante para recorrer ao EasyOCR.
+    """
+
+    def __init__(self, templates=None):
+        self.templates = templates or {}  # caractere -> lista de glifos (float32, média zero, norma 1)
+
+    @staticmethod
+    def _binarize(gray):
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        if cv2.countNonZero(binary) > binary.size / 2:
+            binary = cv2.bitwise_not(binary)  # Dígitos são a minoria dos pixels (claros ou escuros).
+        count, labels, component_stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        min_area = max(4, binary.size // 2000)
+        small = [i for i in range(1, count) if component_stats[i, cv2.CC_STAT_AREA] < min_area]
+        if small:
+            binary[np.isin(labels, small)] = 0
+        return binary
+
+    @staticmethod
+    def _characters(binary):
+        """ Caixas (x0, x1, y0, y1) dos caracteres, da esquerda para a direita """
+        columns = np.flatnonzero(binary.any(axis=0))
+        if not columns.size:
+            return []
+        breaks = np.flatnonzero(np.diff(columns) > 1)
+        starts = np.concatenate(([columns[0]], columns[breaks + 1]))
+        ends = np.concatenate((columns[breaks], [columns[-1]])) + 1
+        boxes = []
+        for x0, x1 in zip(starts, ends):
+            rows = np.flatnonzero(binary[:, x0:x1].any(axis=1))
+            boxes.append((int(x0), int(x1), int(rows[0]), int(rows[-1]) + 1))
+        return boxes
+
+    @staticmethod
+    def _glyph(binary, box):
+        x0, x1, y0, y1 = box
+        crop = binary[y0:y1, x0:x1]
+        width = max(crop.shape[1], int(round(crop.shape[0] * GLYPH_ASPECT)))
+        pad = width - crop.shape[1]
+        crop = cv2.copyMakeBorder(crop, 0, 0, pad // 2, pad - pad // 2, cv2.BORDER_CONSTANT, value=0)
+        glyph = cv2.resize(crop, GLYPH_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32)
+        glyph -= glyph.mean()
+        norm = np.linalg.norm(glyph)
+        return glyph / norm if norm else glyph
+
+    def _split(self, gray):
+        """ Caixas dos dígitos e posições dos separadores decimais (caixas baixas junto à base) """
+        binary = self._binarize(gray)
+        boxes = self._characters(binary)
+        if not boxes:
+            return binary, []
+        height = max(y1 - y0 for _, _, y0, y1 in boxes)
+        baseline = max(y1 for _, _, _, y1 in boxes)
+        chars = []
+        for box in boxes:
+            _, _, y0, y1 = box
+            if y1 - y0 >= 0.6 * height:
+                chars.append(('digit', box))
+            elif y1 - y0 < 0.4 * height and baseline - y1 <= 0.25 * height:
+                chars.append(('separator', box))
+            # Outras marcas (sinal de menos, unidade, sujeira) não fazem parte do número.
+        return binary, chars
+
+    def _decode_segments(self, binary, box, digit_width):
+        x0, x1, y0, y1 = box
+        crop = binary[y0:y1, x0:x1]
+        h, w = crop.shape
+        if w < 0.6 * digit_width or w < 0.25 * h:
+            # Só os segmentos da direita: a caixa do "1" é bem mais estreita que a dos outros dígitos.
+            return '1', min(1.0, cv2.countNonZero(crop) / crop.size / 0.5)
+        states, confidence = [], 1.0
+        for rx0, rx1, ry0, ry1 in SEGMENT_REGIONS:
+            region = crop[int(ry0 * h):max(int(ry1 * h), int(ry0 * h) + 1),
+                          int(rx0 * w):max(int(rx1 * w), int(rx0 * w) + 1)]
+            fill = cv2.countNonZero(region) / region.size
+            states.append(1 if fill >= SEGMENT_ON else 0)
+            confidence = min(confidence, abs(fill - SEGMENT_ON) / SEGMENT_ON)
+        digit = SEGMENT_DIGITS.get(tuple(states))
+        return (digit, min(1.0, confidence)) if digit else ('?', 0.0)
+
+    def _match_template(self, binary, box):
+        glyph = self._glyph(binary, box)
+        scores = sorted(((max(float(np.vdot(glyph, t)) for t in samples), char)
+                         for char, samples in self.templates.items()), reverse=True)
+        best, char = scores[0]
+        second = scores[1][0] if len(scores) > 1 else 0.0
+        # Confiança alta só com boa correlação e clara vantagem sobre o segundo colocado.
+        return char, max(0.0, best) * min(1.0, (best - second) / 0.15)
+
+    def recognize(self, gray):
+        """ (texto, confiança) lidos da ROI em tons de cinza; texto vazio se não há caracteres """
+        binary, chars = self._split(gray)
+        digit_width = max((x1 - x0 for kind, (x0, x1, _, _) in chars if kind == 'digit'), default=0)
+        text, confidence = [], 1.0
+        for kind, box in chars:
+            if kind == 'separator':
+                text.append('.')
+                continue
+            if self.templates:
+                char, char_confidence = self._match_template(binary, box)
+            else:
+                char, char_confidence = self._decode_segments(binary, box, digit_width)
+            text.append(char)
+            confidence = min(confidence, char_confidence)
+        if not text:
+            return '', 0.0
+        return ''.join(text), confidence
+
+    def calibrate(self, samples):
+        """ Aprende os glifos da fonte a partir de pares (ROI em cinza, texto esperado), ex.: "23,5" """
+        for gray, expected in samples:
+            digits = [c for c in expected if c.isdigit()]
+            binary, chars = self._split(gray)
+            boxes = [box for kind, box in chars if kind == 'digit']
+            if len(boxes) != len(digits):
+                raise ValueError(f"Calibração: {len(boxes)} dígito(s) encontrados na imagem, "
+                                 f"mas o texto '{expected}' tem {len(digits)}.")
+            for digit, box in zip(digits, boxes):
+                self.templates.setdefault(digit, []).append(self._glyph(binary, box))
+        return self
+
+    def save(self, path):
+        chars = [char for char, samples in self.templates.items() for _ in samples]
+        glyphs = [glyph for samples in self.templates.values() for glyph in samples]
+        np.savez_compressed(path, chars=np.array(chars), glyphs=np.array(glyphs))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path, allow_pickle=False)
+        templates = {}
+        for char, glyph in zip(data['chars'], data['glyphs']):
+            templates.setdefault(str(char), []).append(glyph)
+        return cls(templates)
+
+
+class TemperatureReader:
+    """ Leitura de temperatura da ROI: DigitRecognizer primeiro e 'fallback' (ex.: EasyOCR) só
+    quando a confiança fica abaixo de 'min_confidence' ou o texto não tem o formato \\d+[,.]\\d+.
+    Sem fallback, uma leitura duvidosa é descartada (nenhum texto) em vez de arriscar um alerta
+    com o valor errado. Chamável como função: ROI em cinza -> lista de textos. """
+
+    def __init__(self, recognizer, min_confidence=0.6, fallback=None):
+        self.recognizer = recognizer
+        self.min_confidence = min_confidence
+        self.fallback = fallback
+        self.fast_reads = 0
+        self.fallback_reads = 0
+        self.rejected_reads = 0
+
+    def __call__(self, gray):
+        text, confidence = self.recognizer.recognize(gray)
+        if confidence >= self.min_confidence and parse_temperature(text) is not None:
+            self.fast_reads += 1
+            return [text]
+        if self.fallback is not None:
+            self.fallback_reads += 1
+            return self.fallback(gray)
+        self.rejected_reads += 1
+        return []
+
+    def summary(self):
+        return {"fast": self.fast_reads, "fallback": self.fallback_reads, "rejected": self.rejected_reads}
+
+
+def _load_gray(path):
+    image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise ValueError(f"Não foi possível abrir a imagem '{path}'.")
+    return image
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibra e testa o leitor rápido de dígitos do modo temperatura")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    calibrate_parser = subparsers.add_parser("calibrate", help="Gera templates a partir de recortes da ROI")
+    calibrate_parser.add_argument("samples", nargs='+', help="Pares imagem:texto, ex.: roi1.png:23,5")
+    calibrate_parser.add_argument("--output", required=True, help="Arquivo .npz de templates")
+    read_parser = subparsers.add_parser("read", help="Lê recortes da ROI e mostra o tempo de cada leitura")
+    read_parser.add_argument("images", nargs='+')
+    read_parser.add_argument("--templates", help="Templates gerados por 'calibrate' (padrão: sete segmentos)")
+    args = parser.parse_args()
+
+    if args.command == "calibrate":
+        samples = [(_load_gray(path), text) for path, text in (s.rsplit(':', 1) for s in args.samples)]
+        recognizer = DigitRecognizer().calibrate(samples)
+        recognizer.save(args.output)
+        print(f"Templates de {''.join(sorted(recognizer.templates))} salvos em '{args.output}'.")
+    else:
+        recognizer = DigitRecognizer.load(args.templates) if args.templates else DigitRecognizer()
+        for path in args.images:
+            gray = _load_gray(path)
+            start = time.perf_counter()
+            text, confidence = recognizer.recognize(gray)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{path}: '{text}' (confiança {confidence:.2f}, {elapsed:.2f} ms)")
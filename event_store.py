@@ -0,0 +1,225 @@
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    camera TEXT NOT NULL,
+    type TEXT NOT NULL,
+    message TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_camera_ts ON events (camera, ts);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+"""
+BASE_FIELDS = ("id", "type", "timestamp", "camera", "message")
+_STOP = object()
+
+
+def _event_ts(event):
+    try:
+        return datetime.strptime(event.get("timestamp", ""), "%Y-%m-%d %H:%M:%S").timestamp()
+    except ValueError:
+        return time.time()
+
+
+class EventStore:
+    """ Armazena alertas e erros em SQLite (WAL), gravando em lote numa thread própria.
+
+    add() é barato e pode ser chamado de qualquer thread: apenas coloca o evento na fila. Os ids são
+    atribuídos pelo SQLite na gravação, então vários processos (a interface e um supervisor sem
+    interface, por exemplo) podem gravar no mesmo banco sem sobrescrever os eventos uns dos outros.
+    """
+
+    def __init__(self, path='events.db', batch_size=500, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+
+    def _connection(self):
+        # Uma conexão por thread; em WAL as leituras não bloqueiam a thread de escrita.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def add(self, event):
+        """ Enfileira o evento para gravação; o id é atribuído pelo SQLite ao gravar """
+        self._queue.put(event)
+
+    def _writer_loop(self):
+        conn = self._connection()
+        running = True
+        while running:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                running = False
+                batch = [event for event in batch if event is not _STOP]
+            if not batch:
+                continue
+
+            rows = []
+            for event in batch:
+                extra = {k: v for k, v in event.items() if k not in BASE_FIELDS}
+                rows.append((_event_ts(event), event.get("timestamp", ""), event.get("camera", ""),
+                             event.get("type", "alert"), event.get("message", ""),
+                             json.dumps(extra) if extra else None))
+            try:
+                with conn:
+                    conn.executemany("INSERT INTO events (ts, timestamp, camera, type, message, data) "
+                                     "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                print(f"Aviso: falha ao gravar {len(rows)} evento(s) em '{self.path}': {e}", flush=True)
+        conn.close()
+
+    def query(self, camera=None, since=None, until=None, event_type=None, before_id=None, limit=200):
+        """ Eventos mais recentes primeiro; 'since'/'until' em segundos desde a época """
+        clauses, params = [], []
+        if camera is not None:
+            clauses.append("camera = ?")
+            params.append(camera)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        if event_type is not None:
+            clauses.append("type = ?")
+            params.append(event_type)
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # Os ids seguem a ordem de gravação, o que permite paginar o log com before_id.
+        sql = f"SELECT * FROM events {where} ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+
+        events = []
+        for row in self._connection().execute(sql, params):
+            event = {key: row[key] for key in BASE_FIELDS}
+            if row["data"]:
+                event.update(json.loads(row["data"]))
+            events.append(event)
+        return events
+
+    def _stored_id(self, event):
+        """ Id gravado de um evento recebido ao vivo: a cópia exibida na interface não tem o id """
+        row = self._connection().execute(
+            "SELECT MIN(id) FROM events WHERE camera = ? AND ts = ? AND type = ? AND message = ?",
+            (event.get("camera", ""), _event_ts(event), event.get("type", "alert"), event.get("message", ""))
+        ).fetchone()
+        return row[0]
+
+    def load_older(self, oldest_event, limit):
+        """ history_loader do EventLogModel: eventos anteriores a 'oldest_event', do mais antigo ao mais novo """
+        if oldest_event is None:
+            return list(reversed(self.query(limit=limit)))
+        before_id = oldest_event.get("id") or self._stored_id(oldest_event)
+        if before_id is None:
+            return []  # Ainda não gravado; a próxima tentativa encontra o evento.
+        return list(reversed(self.query(before_id=before_id, limit=limit)))
+
+    def close(self):
+        """ Grava o que está na fila e encerra a thread de escrita """
+        self._queue.put(_STOP)
+        self._writer.join()
+
+
+def _parse_since(value):
+    units = {'m': 60, 'h': 3600, 'd': 86400}
+    if value[-1] in units:
+        return time.time() - float(value[:-1]) * units[value[-1]]
+    return datetime.strptime(value, "%Y-%m-%d").timestamp()
+
+
+def benchmark(total_events=100000, producers=4, cameras=30):
+    """ Mede a vazão de gravação (eventos/s até tudo estar no disco) e o tempo de uma consulta indexada """
+    work_dir = tempfile.mkdtemp(prefix='event_store_bench_')
+    store = EventStore(os.path.join(work_dir, 'bench.db'))
+    per_producer = total_events // producers
+    now = time.time()
+
+    def produce(producer):
+        for i in range(per_producer):
+            ts = datetime.fromtimestamp(now - (i % 1000) * 600).strftime("%Y-%m-%d %H:%M:%S")
+            store.add({"type": "alert" if i % 10 else "error", "timestamp": ts,
+                       "camera": f"Câmera {(producer * per_producer + i) % cameras}",
+                       "message": f"{i % 5 + 1} objeto(s) detectado(s): pessoa"})
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=produce, args=(p,)) for p in range(producers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    enqueued = time.perf_counter() - start
+    store.close()
+    written = time.perf_counter() - start
+
+    reader = EventStore(os.path.join(work_dir, 'bench.db'))
+    t0 = time.perf_counter()
+    rows = reader.query(camera="Câmera 7", since=now - 7 * 86400, event_type="alert", limit=100000)
+    query_ms = (time.perf_counter() - t0) * 1000
+    reader.close()
+
+    count = per_producer * producers
+    print(f"{count} eventos de {producers} threads: enfileirados em {enqueued:.2f} s, "
+          f"gravados em {written:.2f} s ({count / written:,.0f} eventos/s).")
+    print(f"Consulta 'Câmera 7, alertas da última semana': {len(rows)} eventos em {query_ms:.1f} ms.")
+    print(f"Banco de teste: {work_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consulta e benchmark do armazenamento de eventos")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    query_parser = subparsers.add_parser("query", help="Lista eventos gravados")
+    query_parser.add_argument("--db", default='events.db')
+    query_parser.add_argument("--camera")
+    query_parser.add_argument("--type", choices=['alert', 'error'])
+    query_parser.add_argument("--since", help="Ex.: 30m, 12h, 7d ou 2025-01-31")
+    query_parser.add_argument("--limit", type=int, default=100)
+
+    bench_parser = subparsers.add_parser("benchmark", help="Mede a vazão de gravação")
+    bench_parser.add_argument("--events", type=int, default=100000)
+    bench_parser.add_argument("--producers", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.command == "query":
+        store = EventStore(args.db)
+        since = _parse_since(args.since) if args.since else None
+        for event in reversed(store.query(args.camera, since, event_type=args.type, limit=args.limit)):
+            print(f"{event['timestamp']}  [{event['type']}]  {event['camera']}: {event['message']}")
+        store.close()
+    else:
+        benchmark(args.events, args.producers)
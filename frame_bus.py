@@ -0,0 +1,190 @@
+import hashlib
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Layout do segmento de memória compartilhada:
+#   cabeçalho: 8 x uint64 -> [MAGIC, slots, altura, largura, canais, fechado, seq, reservado]
+#   seq de cada slot (uint64) e timestamp de captura de cada slot (float64, time.monotonic())
+#   dados dos quadros: slots x altura x largura x canais (uint8), alinhados em 64 bytes
+MAGIC = 0x49414652414D4553  # "IAFRAMES"
+HEADER_FIELDS = 8
+H_MAGIC, H_SLOTS, H_HEIGHT, H_WIDTH, H_CHANNELS, H_CLOSED, H_SEQ = range(7)
+DEFAULT_SLOTS = 3
+
+
+def frame_bus_name(cam_name):
+    """ Nome do segmento de memória compartilhada de uma câmera (estável entre processos) """
+    return "iaframes_" + hashlib.md5(cam_name.encode('utf-8')).hexdigest()[:16]
+
+
+def _layout(slots, height, width, channels):
+    slot_seq_offset = HEADER_FIELDS * 8
+    slot_ts_offset = slot_seq_offset + slots * 8
+    frames_offset = (slot_ts_offset + slots * 8 + 63) // 64 * 64
+    total = frames_offset + slots * height * width * channels
+    return slot_seq_offset, slot_ts_offset, frames_offset, total
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix':
+            # Antes do 3.13 o resource_tracker do leitor apagaria o segmento do worker ao sair.
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class _FrameBusView:
+    """ Visões numpy sobre um segmento já criado ou anexado """
+
+    def __init__(self, shm, slots, height, width, channels):
+        self.shm = shm
+        slot_seq_offset, slot_ts_offset, frames_offset, _ = _layout(slots, height, width, channels)
+        self.slots = slots
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.uint64, buffer=shm.buf)
+        self.slot_seq = np.ndarray((slots,), dtype=np.uint64, buffer=shm.buf, offset=slot_seq_offset)
+        self.slot_ts = np.ndarray((slots,), dtype=np.float64, buffer=shm.buf, offset=slot_ts_offset)
+        self.frames = np.ndarray((slots, height, width, channels), dtype=np.uint8, buffer=shm.buf,
+                                 offset=frames_offset)
+
+    def release(self):
+        # As visões precisam sumir antes de fechar o mmap.
+        del self.header, self.slot_seq, self.slot_ts, self.frames
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # Ainda há uma visão em uso (read(copy=False)); o mapeamento é liberado pelo GC.
+
+
+class FramePublisher:
+    """ Lado do worker: publica cada quadro decodificado em um anel de slots na memória compartilhada.
+    Com 'readers' (threading.Event ligado enquanto há um leitor inscrito), os quadros só são
+    copiados quando alguém vai lê-los. """
+
+    def __init__(self, cam_name, slots=DEFAULT_SLOTS, readers=None):
+        self.name = frame_bus_name(cam_name)
+        self.slots = slots
+        self.readers = readers
+        self._view = None
+        self._shape = None
+        self._seq = 0
+
+    def _create(self, shape):
+        height, width, channels = shape
+        size = _layout(self.slots, height, width, channels)[3]
+        try:
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        except FileExistsError:
+            # Segmento órfão de um worker anterior que não terminou corretamente (ex.: morto pelo
+            # watchdog). Marcado como fechado para os leitores ainda anexados a ele se reconectarem.
+            stale = shared_memory.SharedMemory(name=self.name)
+            if stale.size >= HEADER_FIELDS * 8:
+                header = np.ndarray((HEADER_FIELDS,), dtype=np.uint64, buffer=stale.buf)
+                header[H_CLOSED] = 1
+                del header
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        view = _FrameBusView(shm, self.slots, height, width, channels)
+        view.slot_seq[:] = 0
+        view.header[:] = 0
+        view.header[H_SLOTS:H_CHANNELS + 1] = (self.slots, height, width, channels)
+        view.header[H_SEQ] = self._seq
+        view.header[H_MAGIC] = MAGIC  # Por último: leitores só usam o segmento depois disso.
+        self._view = view
+        self._shape = shape
+
+    def publish(self, frame, capture_ts=None, seq=None):
+        """ 'seq' permite usar a numeração da captura, para a interface casar quadros e detecções """
+        if frame.ndim != 3 or (self.readers is not None and not self.readers.is_set()):
+            return
+        if frame.shape != self._shape:
+            self.close()
+            self._create(frame.shape)
+
+        view = self._view
+        seq = seq if seq is not None and seq > self._seq else self._seq + 1
+        index = seq % self.slots
+        view.slot_seq[index] = 0  # Invalida o slot enquanto ele é reescrito.
+        np.copyto(view.frames[index], frame)
+        view.slot_ts[index] = capture_ts if capture_ts is not None else time.monotonic()
+        view.slot_seq[index] = seq
+        view.header[H_SEQ] = seq
+        self._seq = seq
+
+    def close(self):
+        if self._view is None:
+            return
+        view, self._view = self._view, None
+        view.header[H_CLOSED] = 1
+        shm = view.shm
+        view.release()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class FrameBusReader:
+    """ Lado da interface: lê o quadro mais recente publicado pelo worker, sem abrir a câmera """
+
+    def __init__(self, shm):
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.uint64, buffer=shm.buf)
+        if int(header[H_MAGIC]) != MAGIC:
+            del header
+            shm.close()
+            raise ValueError("Segmento de quadros ainda não inicializado.")
+        slots, height, width, channels = (int(v) for v in header[H_SLOTS:H_CHANNELS + 1])
+        del header
+        self._view = _FrameBusView(shm, slots, height, width, channels)
+        self._view.frames.flags.writeable = False
+        self.last_seq = 0
+
+    @classmethod
+    def attach(cls, cam_name):
+        """ Retorna um leitor se a câmera estiver publicando quadros, ou None """
+        try:
+            return cls(_attach(frame_bus_name(cam_name)))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @property
+    def closed(self):
+        return self._view is None or int(self._view.header[H_CLOSED]) == 1
+
+    def read(self, copy=True):
+        """ Retorna (seq, capture_ts, frame) do quadro mais novo, ou None se não houver quadro novo.
+
+        Com copy=False o quadro é uma visão somente leitura da memória compartilhada; use
+        is_valid(seq) depois de usá-lo para confirmar que o worker não sobrescreveu o slot.
+        """
+        view = self._view
+        if view is None:
+            return None
+        seq = int(view.header[H_SEQ])
+        if seq == 0 or seq == self.last_seq:
+            return None
+        index = seq % view.slots
+        if int(view.slot_seq[index]) != seq:
+            return None
+        capture_ts = float(view.slot_ts[index])
+        frame = view.frames[index].copy() if copy else view.frames[index]
+        if copy and int(view.slot_seq[index]) != seq:
+            return None  # O slot foi reescrito durante a cópia; tenta de novo no próximo quadro.
+        self.last_seq = seq
+        return seq, capture_ts, frame
+
+    def is_valid(self, seq):
+        view = self._view
+        return view is not None and int(view.slot_seq[seq % view.slots]) == seq
+
+    def close(self):
+        if self._view is not None:
+            view, self._view = self._view, None
+            view.release()
@@ -0,0 +1,179 @@
+import threading
+import time
+
+
+class LatestFrameCapture:
+    """ Decodifica a câmera em uma thread própria e mantém apenas o quadro mais recente.
+
+    O consumidor (inferência) sempre recebe o quadro mais novo; os quadros que chegaram
+    enquanto ele estava ocupado são descartados e contabilizados em frames_dropped.
+
+    Com 'reopen' (função que devolve um novo cv2.VideoCapture), a perda de sinal não encerra a
+    captura: a thread tenta reconectar com espera exponencial (1 s, 2 s, 4 s... até 'max_backoff')
+    e read() simplesmente aguarda o próximo quadro, mantendo o modelo já carregado no worker.
+    """
+
+    def __init__(self, cap, publisher=None, reopen=None, max_backoff=30.0, on_lost=None, on_restored=None,
+                 stats=None, recorder=None):
+        self.cap = cap
+        self.publisher = publisher  # FramePublisher opcional (Live View sem segunda conexão)
+        self.recorder = recorder  # ClipRecorder opcional (buffer pré-evento dos clipes de alerta)
+        self.reopen = reopen
+        self.max_backoff = max_backoff
+        self.on_lost = on_lost  # on_lost() ao perder o sinal
+        self.on_restored = on_restored  # on_restored(segundos_sem_sinal, tentativas)
+        self.stats = stats  # WorkerStats opcional: tempo de leitura/decodificação em 'capture'
+        # Tupla (seq, frame, capture_ts). A troca da referência é atômica, então não há lock nem
+        # cópia: cada cap.read() devolve um array novo que não é mais alterado pela thread de captura.
+        self._latest = None
+        self._last_seq = 0
+        # seq e instante de captura (time.monotonic()) do último quadro entregue por read().
+        self.frame_seq = 0
+        self.frame_ts = 0.0
+        self._new_frame = threading.Event()
+        self._stop_signal = threading.Event()
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.failed = False
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.reconnects = 0
+        self._lost_since = None
+        self._downtime = 0.0
+        # Início da chamada bloqueante em andamento (read/abertura); o watchdog do supervisor
+        # usa isso para reconhecer um decodificador travado.
+        self._blocked_since = None
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _blocking(self, call, *args):
+        self._blocked_since = time.monotonic()
+        try:
+            return call(*args)
+        finally:
+            self._blocked_since = None
+
+    def _reconnect(self):
+        """ Reabre a câmera com espera exponencial; False se a captura foi encerrada antes """
+        self._lost_since = time.monotonic()
+        if self.on_lost is not None:
+            self.on_lost()
+        self._blocking(self.cap.release)
+        delay, attempts = 1.0, 0
+        while not self._stop_signal.wait(delay):
+            attempts += 1
+            cap = self._blocking(self.reopen)
+            if cap.isOpened():
+                self.cap = cap
+                downtime = time.monotonic() - self._lost_since
+                self._downtime += downtime
+                self._lost_since = None
+                self.reconnects += 1
+                if self.on_restored is not None:
+                    self.on_restored(downtime, attempts)
+                return True
+            cap.release()
+            delay = min(delay * 2, self.max_backoff)
+        return False
+
+    def _capture_loop(self):
+        seq = 0
+        while not self._stop_signal.is_set():
+            read_start = time.perf_counter()
+            ret, frame = self._blocking(self.cap.read)
+            if not ret:
+                if self.reopen is not None and not self._stop_signal.is_set() and self._reconnect():
+                    continue
+                self.failed = True
+                break
+            capture_ts = time.monotonic()
+            if self.stats is not None:
+                self.stats.record('capture', time.perf_counter() - read_start)
+            seq += 1
+            self._latest = (seq, frame, capture_ts)
+            self._new_frame.set()
+            if self.publisher is not None:
+                self.publisher.publish(frame, capture_ts, seq)
+            if self.recorder is not None:
+                self.recorder.push(frame, capture_ts)
+        self._new_frame.set()
+
+    def read(self):
+        """ Bloqueia até haver um quadro ainda não entregue; mesmo contrato de cv2.VideoCapture.read() """
+        while True:
+            latest = self._latest
+            if latest is not None and latest[0] != self._last_seq:
+                break
+            if self.failed or self._stop_signal.is_set():
+                return False, None
+            self._new_frame.wait()
+            self._new_frame.clear()
+
+        seq, frame, capture_ts = latest
+        self.frames_dropped += seq - self._last_seq - 1
+        self.frames_read = seq
+        self._last_seq = seq
+        self.frame_seq = seq
+        self.frame_ts = capture_ts
+        return True, frame
+
+    def drop_ratio(self):
+        return self.frames_dropped / self.frames_read if self.frames_read else 0.0
+
+    @property
+    def reconnecting(self):
+        return self._lost_since is not None
+
+    def downtime(self):
+        """ Segundos acumulados sem sinal, incluindo a queda em andamento """
+        lost_since = self._lost_since
+        return self._downtime + (time.monotonic() - lost_since if lost_since is not None else 0.0)
+
+    def stalled_for(self):
+        """ Há quantos segundos a chamada atual ao decodificador está bloqueada (0 se nenhuma) """
+        blocked_since = self._blocked_since
+        return time.monotonic() - blocked_since if blocked_since is not None else 0.0
+
+    def release(self):
+        self._stop_signal.set()
+        self._thread.join(timeout=2)
+        if not self._thread.is_alive():
+            # Liberar enquanto cap.read() ainda está bloqueado pode derrubar o processo.
+            self.cap.release()
+            if self.publisher is not None:
+                self.publisher.close()
+
+
+class PacedVideoFile:
+    """ Arquivo de vídeo que se comporta como uma câmera: entrega os quadros no ritmo de 'fps'
+    e recomeça do início ao chegar ao fim. Usado no teste de carga e para câmeras simuladas. """
+
+    def __init__(self, path, fps):
+        import cv2
+
+        self._cv2 = cv2
+        self.cap = cv2.VideoCapture(path)
+        self.interval = 1.0 / fps
+        self._next_frame = None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        now = time.monotonic()
+        if self._next_frame is None:
+            self._next_frame = now
+        elif self._next_frame > now:
+            time.sleep(self._next_frame - now)
+        # Se o consumidor atrasou, não tenta compensar com uma rajada de quadros.
+        self._next_frame = max(self._next_frame + self.interval, time.monotonic() - self.interval)
+
+        ret, frame = self.cap.read()
+        if not ret:
+            self.cap.set(self._cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
@@ -0,0 +1,265 @@
+import argparse
+import ipaddress
+import os
+import queue
+import socket
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+from worker_protocol import send_message, timestamp
+
+SERVER_NAME = "Servidor de Inferência"
+# Chave da autenticação de multiprocessing.connection, que desserializa (pickle) tudo o que
+# recebe: o supervisor gera uma nova a cada execução e a repassa ao servidor e aos workers.
+AUTHKEY_ENV = 'INTERFACE_IA_AUTHKEY'
+OCR_ALLOWLIST = '0123456789,.'
+
+
+def get_authkey():
+    key = os.environ.get(AUTHKEY_ENV)
+    if not key:
+        raise RuntimeError(f"Chave de autenticação ausente: defina a variável de ambiente {AUTHKEY_ENV} "
+                           f"(o supervisor gera uma a cada execução).")
+    return key.encode('ascii')
+
+
+def is_loopback(host):
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+def check_host(host, allow_remote):
+    """ Por padrão o servidor só escuta em endereços locais """
+    if not allow_remote and not is_loopback(host):
+        raise ValueError(f"O host '{host}' aceita conexões de outras máquinas; use --allow_remote "
+                         f"(inference_server.allow_remote) para permitir.")
+
+
+def parse_address(address):
+    """ Converte 'host:porta' na tupla usada por multiprocessing.connection """
+    if isinstance(address, tuple):
+        return address
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def report_error(message):
+    error_data = {"type": "error", "timestamp": timestamp(), "camera": SERVER_NAME, "message": message}
+    send_message(error_data)
+
+
+class InferenceClient:
+    """ Lado do worker: envia quadros ao servidor e aguarda as detecções de cada um """
+
+    def __init__(self, address, cam_name, connect_timeout=60):
+        self.cam_name = cam_name
+        address = parse_address(address)
+        deadline = time.monotonic() + connect_timeout
+        while True:
+            # O servidor pode ainda estar carregando o modelo; tenta novamente até o prazo.
+            try:
+                self.conn = Client(address, authkey=get_authkey())
+                break
+            except (ConnectionRefusedError, OSError):
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.5)
+
+    def _request(self, request):
+        self.conn.send({"camera": self.cam_name, **request})
+        reply = self.conn.recv()
+        if reply.get("error"):
+            raise RuntimeError(reply["error"])
+        return reply
+
+    def detect(self, frames, classes, conf=0.5, imgsz=None):
+        """ Detecções de cada quadro; 'imgsz' é a resolução de entrada do modelo (None: a do servidor) """
+        return self._request({"frames": frames, "classes": classes, "conf": conf, "imgsz": imgsz})["detections"]
+
+    def read_text(self, crops):
+        """ Textos reconhecidos pelo OCR compartilhado em cada recorte (ROI em tons de cinza) """
+        return self._request({"kind": "ocr", "crops": crops})["texts"]
+
+    def close(self):
+        self.conn.close()
+
+
+class InferenceServer:
+    """ Mantém um único modelo carregado e agrupa quadros de várias câmeras em uma só inferência.
+    Com 'ocr_reader' (easyocr.Reader), também atende as leituras de temperatura de todas as
+    câmeras com um só leitor, em lotes separados dos de detecção. """
+
+    def __init__(self, model, device, max_batch=8, max_wait=0.015, ocr_reader=None):
+        self.model = model
+        self.device = device
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.ocr_reader = ocr_reader
+        self.requests = queue.Queue()
+        self.ocr_requests = queue.Queue()
+
+    def serve_forever(self, address, allow_remote=False):
+        host, port = parse_address(address)
+        check_host(host, allow_remote)
+        listener = Listener((host, port), authkey=get_authkey())
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+        if self.ocr_reader is not None:
+            threading.Thread(target=self._ocr_loop, daemon=True).start()
+        print(f"[{SERVER_NAME}] Aguardando conexões em {host}:{port} "
+              f"(lote máx.: {self.max_batch}, espera máx.: {self.max_wait * 1000:.0f} ms).", flush=True)
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                report_error(f"Falha ao aceitar conexão: {e}")
+                continue
+            threading.Thread(target=self._client_loop, args=(conn,), daemon=True).start()
+
+    def _client_loop(self, conn):
+        while True:
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                break
+            if request.get("kind") == "ocr":
+                if self.ocr_reader is None:
+                    self._reply(conn, {"error": "O servidor de inferência foi iniciado sem OCR (--ocr)."})
+                else:
+                    self.ocr_requests.put((conn, request))
+            else:
+                self.requests.put((conn, request))
+        conn.close()
+
+    def _collect_batch(self, requests, key="frames"):
+        batch = [requests.get()]
+        item_count = len(batch[0][1][key])
+        deadline = time.monotonic() + self.max_wait
+        while item_count < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            item_count += len(item[1][key])
+        return batch
+
+    def _batch_loop(self):
+        while True:
+            batch = self._collect_batch(self.requests)
+            # Cada câmera pede a resolução de entrada do seu --imgsz (os recortes das zonas já vêm
+            # em letterbox nesse tamanho); pedidos com resoluções diferentes vão em passadas separadas.
+            by_imgsz = {}
+            for item in batch:
+                by_imgsz.setdefault(item[1].get("imgsz"), []).append(item)
+            for imgsz, requests in by_imgsz.items():
+                self._detect(requests, imgsz)
+
+    def _detect(self, batch, imgsz):
+        frames = [frame for _, request in batch for frame in request["frames"]]
+        # Uma única passada com a união das classes; cada câmera recebe só as suas.
+        classes = sorted({int(c) for _, request in batch for c in request["classes"]})
+        min_conf = min(request.get("conf", 0.5) for _, request in batch)
+        options = {"imgsz": imgsz} if imgsz else {}
+        try:
+            results = self.model(frames, classes=classes, conf=min_conf, verbose=False, device=self.device, **options)
+            all_detections = [r.boxes.data.tolist() if r.boxes else [] for r in results]
+        except Exception as e:
+            for conn, request in batch:
+                self._reply(conn, {"error": f"Erro durante a inferência do modelo YOLO: {e}"})
+            return
+
+        index = 0
+        for conn, request in batch:
+            wanted = set(int(c) for c in request["classes"])
+            conf = request.get("conf", 0.5)
+            per_frame = []
+            for detections in all_detections[index:index + len(request["frames"])]:
+                per_frame.append([d for d in detections if int(d[5]) in wanted and d[4] >= conf])
+            index += len(request["frames"])
+            self._reply(conn, {"detections": per_frame})
+
+    def _read_texts(self, crops):
+        """ OCR de todos os recortes do lote; recortes do mesmo tamanho vão juntos para a rede """
+        texts = [None] * len(crops)
+        by_shape = {}
+        for i, crop in enumerate(crops):
+            by_shape.setdefault(crop.shape, []).append(i)
+        for indices in by_shape.values():
+            if len(indices) == 1:
+                results = [self.ocr_reader.readtext(crops[indices[0]], detail=1, allowlist=OCR_ALLOWLIST)]
+            else:
+                results = self.ocr_reader.readtext_batched([crops[i] for i in indices], detail=1,
+                                                           allowlist=OCR_ALLOWLIST, batch_size=len(indices))
+            for i, result in zip(indices, results):
+                texts[i] = [texto for _, texto, _ in result]
+        return texts
+
+    def _ocr_loop(self):
+        while True:
+            batch = self._collect_batch(self.ocr_requests, "crops")
+            crops = [crop for _, request in batch for crop in request["crops"]]
+            try:
+                texts = self._read_texts(crops)
+            except Exception as e:
+                for conn, request in batch:
+                    self._reply(conn, {"error": f"Erro durante a leitura do OCR: {e}"})
+                continue
+
+            index = 0
+            for conn, request in batch:
+                self._reply(conn, {"texts": texts[index:index + len(request["crops"])]})
+                index += len(request["crops"])
+
+    def _reply(self, conn, payload):
+        try:
+            conn.send(payload)
+        except (OSError, ValueError):
+            pass  # O worker desconectou; o _client_loop encerra a conexão.
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de Inferência Compartilhado (YOLO)")
+    parser.add_argument("--host", default='127.0.0.1')
+    parser.add_argument("--port", type=int, default=6001)
+    parser.add_argument("--model", default='yolo12n.pt')
+    parser.add_argument("--backend", default='torch', help="Backend de inferência ('torch', 'onnx', 'openvino')")
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument("--device", default='cpu', help="Dispositivo para rodar o modelo ('cpu', '0' para GPU)")
+    parser.add_argument("--max_batch", type=int, default=8, help="Máximo de quadros por inferência")
+    parser.add_argument("--max_wait_ms", type=float, default=15, help="Espera máxima para completar um lote (ms)")
+    parser.add_argument("--ocr", action="store_true", help="Atende também o OCR das câmeras de temperatura")
+    parser.add_argument("--ocr_gpu", action="store_true", help="Roda o EasyOCR na GPU")
+    parser.add_argument("--allow_remote", action="store_true",
+                        help="Permite escutar em um endereço que não seja local (127.0.0.1/localhost)")
+    args = parser.parse_args()
+
+    try:
+        get_authkey()  # Falha antes de carregar o modelo.
+        check_host(args.host, args.allow_remote)
+
+        import torch
+        from model_backends import load_model
+
+        device = args.device
+        if device != 'cpu' and not torch.cuda.is_available():
+            print(f"AVISO: GPU solicitada (device='{device}'), mas não disponível. Usando CPU como alternativa.",
+                  flush=True)
+            device = 'cpu'
+        # Lote dinâmico: o servidor envia vários quadros por inferência.
+        model = load_model(args.model, args.backend, args.int8, dynamic=True)
+        ocr_reader = None
+        if args.ocr:
+            import easyocr
+            ocr_reader = easyocr.Reader(['en'], gpu=args.ocr_gpu)
+        server = InferenceServer(model, device, args.max_batch, args.max_wait_ms / 1000, ocr_reader)
+        server.serve_forever((args.host, args.port), args.allow_remote)
+    except Exception as e:
+        report_error(f"Erro fatal no servidor de inferência: {e}")
+
+    print(f"[{SERVER_NAME}] Servidor finalizado.", flush=True)
@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from app_settings import load_settings
+from supervisor import CameraSupervisor
+from worker_stats import LatencyHistogram
+
+CAMERA_PREFIX = "loadtest_"
+
+
+def generate_synthetic_video(path, width=1280, height=720, fps=15, seconds=20, seed=0):
+    """ Grava um vídeo sintético (ruído + retângulos em movimento) em MJPG, que qualquer build do
+    OpenCV consegue gravar e ler sem dependências externas """
+    rng = np.random.default_rng(seed)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Não foi possível gravar '{path}'.")
+    background = rng.integers(40, 90, (height, width, 3), dtype=np.uint8)
+    boxes = [(rng.integers(0, width), rng.integers(0, height), rng.integers(-12, 12), rng.integers(-8, 8),
+              tuple(int(c) for c in rng.integers(0, 255, 3))) for _ in range(6)]
+    for i in range(int(fps * seconds)):
+        frame = background.copy()
+        noise = rng.integers(0, 20, (height // 4, width // 4, 1), dtype=np.uint8)
+        frame += cv2.resize(noise, (width, height))[..., None]
+        for x, y, dx, dy, color in boxes:
+            cx, cy = int((x + dx * i) % width), int((y + dy * i) % height)
+            cv2.rectangle(frame, (cx, cy), (cx + width // 10, cy + height // 6), color, -1)
+        cv2.putText(frame, f"quadro {i}", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def camera_config(args, source):
+    """ Configuração de câmera (formato do cameras_config.json) de uma câmera simulada """
+    return {"url": source, "mode": "object", "object_ids": args.object_ids, "quantity": 1,
+            "exact_number": False, "sensitivity": 0, "rearm_time": 5, "use_gpu": args.device != 'cpu',
+            "backend": args.backend, "int8": args.int8, "motion_gate": args.motion_gate,
+            "loop_fps": args.fps}
+
+
+class LoadTest:
+    """ Sobe câmeras simuladas em degraus pelo CameraSupervisor (mesma linha de comando da
+    interface) até os workers não sustentarem o FPS da fonte ou a latência passar do limite """
+
+    def __init__(self, args, source):
+        self.args = args
+        self.source = source
+        settings = load_settings()
+        settings['stats']['interval'] = args.stats_interval
+        settings['stats']['path'] = ''  # Não mistura o teste com o arquivo de estatísticas da operação.
+        settings['worker_pool']['size'] = 0  # Workers em espera ociosos distorceriam CPU e memória medidas.
+        self.supervisor = CameraSupervisor(settings, on_message=self._on_message,
+                                           on_output=lambda cam_name, text: None)
+        self.stats = {}
+        self.streaming = set()
+        self.cameras = []
+
+    def _on_message(self, cam_name, data):
+        if data.get("type") == "stats":
+            self.stats.setdefault(cam_name, []).append({**data, "received": time.monotonic()})
+        elif data.get("type") == "heartbeat" and data.get("state") == "streaming":
+            self.streaming.add(cam_name)
+        elif data.get("type") == "error":
+            print(f"  [{cam_name}] {data.get('message')}", flush=True)
+
+    async def _add_cameras(self, total):
+        while len(self.cameras) < total:
+            cam_name = f"{CAMERA_PREFIX}{len(self.cameras):03d}"
+            await self.supervisor.start_camera(cam_name, camera_config(self.args, self.source))
+            # As detecções (com o instante de captura) são a amostra de latência do teste.
+            await self.supervisor.send_command(cam_name, "subscribe", topic="detections")
+            self.cameras.append(cam_name)
+
+    async def _wait_streaming(self):
+        deadline = time.monotonic() + self.args.startup_timeout
+        while time.monotonic() < deadline:
+            if all(cam_name in self.streaming for cam_name in self.cameras):
+                return True
+            await asyncio.sleep(0.5)
+        return False
+
+    def _measure(self, level, started):
+        args = self.args
+        fps, dropped, rss = [], 0, 0.0
+        latency = LatencyHistogram()
+        alive = [cam_name for cam_name in self.cameras if self.supervisor.is_running(cam_name)]
+        for cam_name in alive:
+            window = [s for s in self.stats.get(cam_name, []) if s["received"] >= started]
+            if window:
+                fps.append(sum(s["fps"] for s in window) / len(window))
+                dropped += sum(s["dropped"] for s in window)
+                rss += window[-1].get("rss_mb") or 0.0
+            else:
+                fps.append(0.0)
+            latency.merge(self.supervisor.latency[cam_name]["detection"])
+
+        min_fps = min(fps) if fps else 0.0
+        p95 = latency.percentile(95)
+        failures = []
+        if len(alive) < len(self.cameras):
+            failures.append(f"{len(self.cameras) - len(alive)} worker(s) encerrado(s)")
+        if min_fps < args.fps * args.min_fps_ratio:
+            failures.append(f"FPS mínimo {min_fps:.1f} < {args.fps * args.min_fps_ratio:.1f}")
+        if p95 is None or p95 > args.max_latency_ms:
+            failures.append(f"latência p95 {'sem amostras' if p95 is None else f'≤ {p95:.0f} ms'}"
+                            f" (limite {args.max_latency_ms:.0f} ms)")
+        return {"cameras": level, "fps_min": round(min_fps, 2),
+                "fps_mean": round(sum(fps) / len(fps), 2) if fps else 0.0,
+                "dropped_frames": dropped, "latency": latency.summary(), "rss_mb_total": round(rss, 1),
+                "load_avg": os.getloadavg()[0] if hasattr(os, 'getloadavg') else None,
+                "passed": not failures, "failures": failures}
+
+    async def run(self):
+        args = self.args
+        results = []
+        try:
+            for level in range(args.start, args.max_cameras + 1, args.step):
+                await self._add_cameras(level)
+                if not await self._wait_streaming():
+                    print(f"  Nem todos os workers começaram a receber quadros em {args.startup_timeout:.0f} s.")
+                await asyncio.sleep(args.warmup)
+
+                for cam_name in self.cameras:
+                    self.supervisor.latency[cam_name] = {"alert": LatencyHistogram(), "detection": LatencyHistogram()}
+                started = time.monotonic()
+                await asyncio.sleep(args.window)
+                result = self._measure(level, started)
+                results.append(result)
+                print(f"{level:>8}{result['fps_min']:>10.1f}{result['fps_mean']:>10.1f}"
+                      f"{result['latency']['p95_ms'] or 0:>12.0f}{result['dropped_frames']:>12}"
+                      f"{result['rss_mb_total']:>12.0f}   {'ok' if result['passed'] else '; '.join(result['failures'])}",
+                      flush=True)
+                if not result['passed']:
+                    break
+        finally:
+            await self.supervisor.stop_all()
+        return results
+
+
+async def main(args):
+    source = args.source
+    if not source:
+        source = os.path.abspath(os.path.join(args.work_dir, f"synthetic_{args.width}x{args.height}_{args.fps:g}.avi"))
+        if not os.path.exists(source):
+            os.makedirs(args.work_dir, exist_ok=True)
+            print(f"Gerando vídeo sintético: {source}", flush=True)
+            generate_synthetic_video(source, args.width, args.height, args.fps, args.seconds)
+
+    test = LoadTest(args, source)
+
+    print(f"Fonte: {source} a {args.fps:g} q/s | backend {args.backend} | dispositivo {args.device}")
+    print(f"{'Câmeras':>8}{'FPS mín':>10}{'FPS méd':>10}{'Lat p95':>12}{'Descartes':>12}{'RSS (MB)':>12}   Resultado")
+    results = await test.run()
+
+    passed = [r['cameras'] for r in results if r['passed']]
+    summary = {"source": source, "fps": args.fps, "backend": args.backend, "device": args.device,
+               "min_fps_ratio": args.min_fps_ratio, "max_latency_ms": args.max_latency_ms,
+               "max_cameras_passed": max(passed) if passed else 0, "levels": results}
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=4, ensure_ascii=False)
+    print(f"Capacidade: {summary['max_cameras_passed']} câmera(s) dentro das metas. Relatório: {args.report}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga: quantas câmeras simuladas a máquina sustenta")
+    parser.add_argument("--source", help="Vídeo local a usar como câmera (padrão: gera um sintético)")
+    parser.add_argument("--work_dir", default="loadtest_data")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--seconds", type=float, default=20, help="Duração do vídeo sintético (tocado em loop)")
+    parser.add_argument("--fps", type=float, default=15, help="Ritmo de cada câmera simulada")
+    parser.add_argument("--start", type=int, default=1)
+    parser.add_argument("--step", type=int, default=1)
+    parser.add_argument("--max_cameras", type=int, default=32)
+    parser.add_argument("--warmup", type=float, default=10, help="Espera (s) após cada degrau antes de medir")
+    parser.add_argument("--window", type=float, default=30, help="Duração (s) da medição de cada degrau")
+    parser.add_argument("--startup_timeout", type=float, default=180,
+                        help="Espera máxima (s) para os workers novos carregarem o modelo")
+    parser.add_argument("--stats_interval", type=float, default=2)
+    parser.add_argument("--min_fps_ratio", type=float, default=0.9,
+                        help="Fração do FPS da fonte que cada worker precisa sustentar")
+    parser.add_argument("--max_latency_ms", type=float, default=1000, help="Latência p95 máxima quadro→detecção")
+    parser.add_argument("--object_ids", default="0")
+    parser.add_argument("--backend", default='torch')
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument("--device", default='cpu')
+    parser.add_argument("--motion_gate", action="store_true")
+    parser.add_argument("--report", default="loadtest_report.json")
+    asyncio.run(main(parser.parse_args()))
@@ -1,34 +1,101 @@
 import sys
 import json
-import os
-import subprocess
-import threading
 import time
+from collections import Counter
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                                QHBoxLayout, QPushButton, QLabel, QMessageBox,
-                               QTableWidget, QTableWidgetItem, QAbstractItemView,
+                               QTableWidget, QTableWidgetItem, QTableView, QAbstractItemView,
                                QHeaderView, QStyle, QSplitter, QDialog)
 from PySide6.QtCore import Qt, QRect, QPropertyAnimation, QSequentialAnimationGroup, Signal, QObject
 from PySide6.QtGui import QColor, QKeySequence, QShortcut, QIcon, QPixmap, QPainter, QPen
-from ui_components import CameraConfigDialog, LiveViewDialog  # LiveViewDialog importado aqui
-
-
-def resource_path(relative_path):
-    """ Retorna o caminho absoluto para o recurso, funcionando tanto em dev quanto no PyInstaller """
-    try:
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
+from ui_components import CameraConfigDialog, LiveViewDialog, VideoWallDialog, EventLogModel  # LiveViewDialog importado aqui
+from app_settings import load_settings
+from event_store import EventStore
+from inference_server import SERVER_NAME as INFERENCE_SERVER_NAME
+from supervisor import CONFIG_FILE, CameraSupervisor, load_camera_configs
+from worker_stats import format_startup
 
 
 class WorkerSignals(QObject):
     log_received = Signal(dict)
     error_received = Signal(dict)
     detection_received = Signal(dict)  # NOVO SINAL
+    health_received = Signal(dict)
+    stats_received = Signal(dict)
     finished = Signal(str)
 
 
+CONNECTION_STATES = {"starting": "Iniciando", "streaming": "Conectada", "reconnecting": "Reconectando",
+                     "restarting": "Reiniciando"}
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def format_health(health):
+    """ Texto da coluna 'Conexão': estado do worker, reconexões, tempo sem sinal e reinícios """
+    parts = [CONNECTION_STATES.get(health.get("state"), "")]
+    if health.get("reconnects"):
+        parts.append(f"{health['reconnects']} reconexão(ões)")
+    if health.get("downtime", 0) >= 1:
+        parts.append(f"{format_duration(health['downtime'])} sem sinal")
+    if health.get("restarts"):
+        parts.append(f"{health['restarts']} reinício(s)")
+    return " · ".join(part for part in parts if part)
+
+
+STAGE_NAMES = {"capture": "Captura", "preprocess": "Pré-processamento", "inference": "Inferência",
+               "alert": "Regras de alerta", "emit": "Envio"}
+
+
+def format_stats(stats):
+    """ Texto da coluna 'Desempenho' e tooltip com os percentis de cada etapa """
+    parts = [f"{stats.get('fps', 0):.1f} q/s"]
+    inference = stats.get("stages", {}).get("inference")
+    if inference:
+        parts.append(f"inferência p95 {inference['p95']:.0f} ms")
+    if stats.get("dropped"):
+        parts.append(f"{stats['dropped']} descartados")
+    if stats.get("rss_mb") is not None:
+        parts.append(f"{stats['rss_mb']:.0f} MB")
+
+    lines = ["Etapa: p50 / p95 / p99 (ms)"]
+    for stage, values in stats.get("stages", {}).items():
+        lines.append(f"{STAGE_NAMES.get(stage, stage)}: {values['p50']:.1f} / {values['p95']:.1f} / {values['p99']:.1f}")
+    for kind, label in (("alert", "Latência quadro→alerta"), ("detection", "Latência quadro→detecção")):
+        latency = stats.get("latency", {}).get(kind)
+        if latency and latency["count"]:
+            lines.append(f"{label}: p50 ≤ {latency['p50_ms']:.0f} / p95 ≤ {latency['p95_ms']:.0f} / "
+                         f"máx. {latency['max_ms']:.0f} ms ({latency['count']} amostras)")
+    lines.append(f"Quadros descartados (total): {stats.get('dropped_total', 0)}")
+    if stats.get("skipped_total") is not None:
+        lines.append(f"Quadros sem movimento (total): {stats['skipped_total']}")
+    startup = stats.get("startup")
+    if startup and "ready" in startup:
+        lines.append(f"Inicialização: {startup['ready']:.1f} s ({format_startup(startup)})")
+    ocr_reader = stats.get("ocr_reader")
+    if ocr_reader:
+        lines.append(f"Leituras de temperatura: {ocr_reader['fast']} pelo leitor de dígitos, "
+                     f"{ocr_reader['fallback']} pelo EasyOCR, {ocr_reader['rejected']} descartadas")
+    ocr_cache = stats.get("ocr_cache")
+    if ocr_cache:
+        parts.append(f"cache OCR {ocr_cache['hit_rate']:.0%}")
+        lines.append(f"Cache do OCR: {ocr_cache['hits']} acertos / {ocr_cache['misses']} leituras "
+                     f"({ocr_cache['entries']} entradas)")
+    clips = stats.get("clips")
+    if clips:
+        lines.append(f"Buffer de clipes: {clips['buffer_seconds']:.0f} s em {clips['buffer_mb']:.1f} MB, "
+                     f"{clips['clips']} clipe(s) gravado(s)"
+                     + (f", {clips['evicted']} quadro(s) perdidos por falta de memória" if clips['evicted'] else ""))
+    return " · ".join(parts), "\n".join(lines)
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -36,8 +103,12 @@ class MainWindow(QMainWindow):
         self.setWindowIcon(icon)
         self.setWindowTitle("Sistema de Monitoramento Inteligente")
         self.setGeometry(100, 100, 900, 500)
-        self.running_processes = {}
         self.live_view_dialogs = {}  # Dicionário para gerenciar janelas de live view
+        self.frame_readers = Counter()  # Janelas lendo o frame bus de cada câmera (Live View, mosaico, ROI)
+        self.video_wall = None
+        self.camera_health = {}  # Último heartbeat de cada câmera (via supervisor)
+        self.camera_stats = {}  # Última mensagem 'stats' de cada câmera
+        self.settings = load_settings()
 
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
@@ -50,8 +121,8 @@ class MainWindow(QMainWindow):
         top_layout.addWidget(QLabel("Câmeras:"))
         table_and_buttons_layout = QHBoxLayout()
         self.camera_table = QTableWidget()
-        self.camera_table.setColumnCount(2)
-        self.camera_table.setHorizontalHeaderLabels(["Câmera", "Status"])
+        self.camera_table.setColumnCount(4)
+        self.camera_table.setHorizontalHeaderLabels(["Câmera", "Status", "Conexão", "Desempenho"])
         self.camera_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
         self.camera_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.camera_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
@@ -64,10 +135,12 @@ class MainWindow(QMainWindow):
         self.edit_cam_button = QPushButton("Editar Câmera")
         self.remove_cam_button = QPushButton("Remover Câmeras")
         self.view_cam_button = QPushButton("Ver ao Vivo")  # NOVO BOTÃO
+        self.wall_button = QPushButton("Mosaico ao Vivo")
         right_panel.addWidget(self.add_cam_button)
         right_panel.addWidget(self.edit_cam_button)
         right_panel.addWidget(self.remove_cam_button)
         right_panel.addWidget(self.view_cam_button)
+        right_panel.addWidget(self.wall_button)
         right_panel.addStretch()
         self.start_button = QPushButton("▶ Iniciar Selecionadas")
         self.stop_button = QPushButton("■ Parar Selecionadas")
@@ -82,13 +155,26 @@ class MainWindow(QMainWindow):
         bottom_layout = QVBoxLayout(bottom_widget)
         bottom_layout.setContentsMargins(10, 10, 10, 10)
         bottom_layout.addWidget(QLabel("Log de Eventos:"))
-        self.log_table = QTableWidget()
-        self.log_table.setColumnCount(3)
-        self.log_table.setHorizontalHeaderLabels(["Data e Hora", "Câmera", "Mensagem de Alerta / Erro"])
-        self.log_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        self.log_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        store_settings = self.settings['event_store']
+        self.event_store = EventStore(store_settings['path'], store_settings['batch_size'],
+                                      store_settings['flush_interval_ms'] / 1000)
+        log_settings = self.settings['event_log']
+        self.log_model = EventLogModel(log_settings['capacity'], log_settings['flush_interval_ms'],
+                                       self.event_store.load_older, parent=self)
+        self.log_table = QTableView()
+        self.log_table.setModel(self.log_model)
+        # Larguras e alturas fixas: ResizeToContents percorreria todas as linhas a cada inserção.
+        self.log_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Interactive)
+        self.log_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Interactive)
         self.log_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.log_table.setColumnWidth(0, 150)
+        self.log_table.setColumnWidth(1, 160)
+        self.log_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self.log_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.log_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.loading_log_history = False
+        self.log_model.rows_appended.connect(self.on_log_rows_appended)
+        self.log_table.verticalScrollBar().valueChanged.connect(self.on_log_scrolled)
         bottom_layout.addWidget(self.log_table)
 
         splitter.addWidget(top_widget)
@@ -100,14 +186,24 @@ class MainWindow(QMainWindow):
         self.worker_signals.log_received.connect(self.add_log_entry)
         self.worker_signals.error_received.connect(self.add_error_entry)
         self.worker_signals.detection_received.connect(self.on_detection_received)  # CONEXÃO DO SINAL
+        self.worker_signals.health_received.connect(self.on_health_received)
+        self.worker_signals.stats_received.connect(self.on_stats_received)
         self.worker_signals.finished.connect(self.on_worker_finished)
 
+        # Os workers são do supervisor; a janela só recebe as mensagens (na thread do supervisor,
+        # por isso via sinais) e manda comandos.
+        self.supervisor = CameraSupervisor(self.settings, self.event_store,
+                                           on_message=self.on_worker_message,
+                                           on_finished=self.worker_signals.finished.emit)
+        self.supervisor.start_in_thread()
+
         self.camera_table.itemDoubleClicked.connect(self.edit_camera)
         self.camera_table.itemSelectionChanged.connect(self.update_button_states)
         self.add_cam_button.clicked.connect(self.add_camera)
         self.edit_cam_button.clicked.connect(self.edit_camera)
         self.remove_cam_button.clicked.connect(self.remove_cameras)
         self.view_cam_button.clicked.connect(self.show_live_view)  # CONEXÃO DO BOTÃO
+        self.wall_button.clicked.connect(self.show_video_wall)
         self.start_button.clicked.connect(self.start_monitoring)
         self.stop_button.clicked.connect(self.stop_monitoring)
 
@@ -115,6 +211,7 @@ class MainWindow(QMainWindow):
         self.edit_cam_button.pressed.connect(lambda: self.animate_click(self.edit_cam_button))
         self.remove_cam_button.pressed.connect(lambda: self.animate_click(self.remove_cam_button))
         self.view_cam_button.pressed.connect(lambda: self.animate_click(self.view_cam_button))
+        self.wall_button.pressed.connect(lambda: self.animate_click(self.wall_button))
         self.start_button.pressed.connect(lambda: self.animate_click(self.start_button))
         self.stop_button.pressed.connect(lambda: self.animate_click(self.stop_button))
 
@@ -122,17 +219,47 @@ class MainWindow(QMainWindow):
         shortcut_select_all.activated.connect(self.camera_table.selectAll)
         self.load_cameras()
         self.update_button_states()
+        # Workers em espera com os modelos das câmeras cadastradas: iniciar uma câmera é só entregá-la.
+        self.supervisor.run(self.supervisor.prewarm(list(load_camera_configs().values())), wait=False)
+
+    def is_camera_running(self, cam_name):
+        return self.supervisor.is_running(cam_name)
 
     def on_detection_received(self, data):
         cam_name = data.get("camera")
         if cam_name in self.live_view_dialogs:
             self.live_view_dialogs[cam_name].update_detections(data)
 
+    def on_health_received(self, data):
+        cam_name = data.get("camera")
+        if not self.is_camera_running(cam_name):
+            return
+        self.camera_health[cam_name] = data
+        for row in range(self.camera_table.rowCount()):
+            if self.camera_table.item(row, 0).text() == cam_name:
+                health_item = self.camera_table.item(row, 2)
+                if health_item is not None:
+                    health_item.setText(format_health(data))
+                break
+
+    def on_stats_received(self, data):
+        cam_name = data.get("camera")
+        if not self.is_camera_running(cam_name):
+            return
+        self.camera_stats[cam_name] = data
+        for row in range(self.camera_table.rowCount()):
+            if self.camera_table.item(row, 0).text() == cam_name:
+                stats_item = self.camera_table.item(row, 3)
+                if stats_item is not None:
+                    text, tooltip = format_stats(data)
+                    stats_item.setText(text)
+                    stats_item.setToolTip(tooltip)
+                break
+
     def on_worker_finished(self, cam_name):
+        if cam_name == INFERENCE_SERVER_NAME:
+            return
         print(f"Worker da câmera '{cam_name}' finalizou. Atualizando status.")
-        if cam_name in self.running_processes:
-            self.running_processes.pop(cam_name)
-
         for row in range(self.camera_table.rowCount()):
             if self.camera_table.item(row, 0).text() == cam_name:
                 config = self.camera_table.item(row, 0).data(Qt.UserRole)
@@ -140,53 +267,47 @@ class MainWindow(QMainWindow):
                 break
         self.update_button_states()
 
-    def stream_reader(self, process, cam_name):
-        for line in iter(process.stdout.readline, ''):
-            if not line: break
-            try:
-                data = json.loads(line)
-                if isinstance(data, dict):
-                    msg_type = data.get("type")
-                    if msg_type == "alert":
-                        self.worker_signals.log_received.emit(data)
-                    elif msg_type == "error":
-                        self.worker_signals.error_received.emit(data)
-                    elif msg_type == "detection":
-                        self.worker_signals.detection_received.emit(data)
-                    else:
-                        print(f"[{cam_name}] (saída ignorada): {data}")
-            except json.JSONDecodeError:
-                print(f"[{cam_name}]: {line.strip()}")
-        process.stdout.close()
-        process.wait()
-        self.worker_signals.finished.emit(cam_name)
-
-    # (As funções add_log_entry, add_error_entry, create_themed_icon, animate_click permanecem as mesmas)
+    def on_worker_message(self, cam_name, data):
+        # Chamado na thread do supervisor; alertas e erros já foram gravados no event_store.
+        msg_type = data.get("type")
+        if msg_type == "alert":
+            self.worker_signals.log_received.emit(data)
+        elif msg_type == "error":
+            self.worker_signals.error_received.emit(data)
+        elif msg_type == "detection":
+            self.worker_signals.detection_received.emit(data)
+        elif msg_type == "heartbeat":
+            self.worker_signals.health_received.emit(data)
+        elif msg_type == "stats":
+            self.worker_signals.stats_received.emit(data)
+        else:
+            print(f"[{cam_name}] (saída ignorada): {data}")
+
+    # (As funções create_themed_icon, animate_click permanecem as mesmas)
     def add_log_entry(self, log_data):
-        row_position = self.log_table.rowCount()
-        self.log_table.insertRow(row_position)
-        timestamp = QTableWidgetItem(log_data.get("timestamp", ""))
-        camera = QTableWidgetItem(log_data.get("camera", ""))
-        message = QTableWidgetItem(log_data.get('message', "Evento recebido"))
-        self.log_table.setItem(row_position, 0, timestamp)
-        self.log_table.setItem(row_position, 1, camera)
-        self.log_table.setItem(row_position, 2, message)
-        self.log_table.scrollToBottom()
+        self.log_model.append_event({"type": "alert", **log_data})
 
     def add_error_entry(self, error_data):
-        row_position = self.log_table.rowCount()
-        self.log_table.insertRow(row_position)
-        timestamp_item = QTableWidgetItem(error_data.get("timestamp", ""))
-        camera_item = QTableWidgetItem(error_data.get("camera", ""))
-        message_item = QTableWidgetItem(error_data.get("message", "Erro desconhecido"))
-        error_color = QColor(191, 97, 106, 80)
-        timestamp_item.setBackground(error_color)
-        camera_item.setBackground(error_color)
-        message_item.setBackground(error_color)
-        self.log_table.setItem(row_position, 0, timestamp_item)
-        self.log_table.setItem(row_position, 1, camera_item)
-        self.log_table.setItem(row_position, 2, message_item)
-        self.log_table.scrollToBottom()
+        self.log_model.append_event({"type": "error", **error_data})
+
+    def on_log_rows_appended(self):
+        if self.log_model.follow_tail:
+            self.log_table.scrollToBottom()
+
+    def on_log_scrolled(self, value):
+        if self.loading_log_history:
+            return
+        scroll_bar = self.log_table.verticalScrollBar()
+        self.log_model.follow_tail = value >= scroll_bar.maximum()
+        if not self.log_model.follow_tail and value == scroll_bar.minimum():
+            # Chegou ao topo: pagina eventos mais antigos do armazenamento persistente.
+            self.loading_log_history = True
+            loaded = self.log_model.load_older(self.settings['event_log']['page_size'])
+            if loaded:
+                # Refaz o layout já, para a faixa da barra de rolagem incluir as linhas novas.
+                self.log_table.doItemsLayout()
+                self.log_table.scrollTo(self.log_model.index(loaded, 0), QAbstractItemView.PositionAtTop)
+            self.loading_log_history = False
 
     def create_themed_icon(self):
         pixmap = QPixmap(64, 64)
@@ -246,34 +367,40 @@ class MainWindow(QMainWindow):
     def add_or_update_camera_in_table(self, cam_name, config, row_to_update=None):
         name_item = QTableWidgetItem(cam_name)
         name_item.setData(Qt.UserRole, config)
-        status = "Ativo" if cam_name in self.running_processes else "Inativo"
+        status = "Ativo" if self.is_camera_running(cam_name) else "Inativo"
         status_item = QTableWidgetItem(status)
         icon = self.style().standardIcon(
             QStyle.SP_DialogApplyButton if status == "Ativo" else QStyle.SP_DialogCancelButton)
         status_item.setIcon(icon)
+        health = self.camera_health.get(cam_name)
+        health_item = QTableWidgetItem(format_health(health) if health and status == "Ativo" else "")
         row = row_to_update if row_to_update is not None else self.camera_table.rowCount()
         if row_to_update is None:
             self.camera_table.insertRow(row)
         self.camera_table.setItem(row, 0, name_item)
         self.camera_table.setItem(row, 1, status_item)
+        self.camera_table.setItem(row, 2, health_item)
+        stats_item = QTableWidgetItem()
+        stats = self.camera_stats.get(cam_name)
+        if stats and status == "Ativo":
+            text, tooltip = format_stats(stats)
+            stats_item.setText(text)
+            stats_item.setToolTip(tooltip)
+        self.camera_table.setItem(row, 3, stats_item)
 
     def load_cameras(self):
-        if not os.path.exists('cameras_config.json'): return
-        try:
-            with open('cameras_config.json', 'r', encoding='utf-8') as f:
-                cameras = json.load(f)
-            self.camera_table.setRowCount(0)
-            for cam_name, config in cameras.items():
-                self.add_or_update_camera_in_table(cam_name, config)
-        except json.JSONDecodeError:
-            print("Aviso: 'cameras_config.json' está corrompido.")
+        cameras = load_camera_configs()
+        if not cameras: return
+        self.camera_table.setRowCount(0)
+        for cam_name, config in cameras.items():
+            self.add_or_update_camera_in_table(cam_name, config)
 
     def save_cameras(self):
         cameras = {}
         for row in range(self.camera_table.rowCount()):
             name_item = self.camera_table.item(row, 0)
             cameras[name_item.text()] = name_item.data(Qt.UserRole)
-        with open('cameras_config.json', 'w', encoding='utf-8') as f:
+        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
             json.dump(cameras, f, indent=4)
 
     def get_selected_rows(self):
@@ -295,7 +422,7 @@ class MainWindow(QMainWindow):
             config = dialog.get_config()
             if not config: return
             new_name = config.get('name')
-            was_running = cam_name in self.running_processes
+            was_running = cam_name is not None and self.is_camera_running(cam_name)
             if was_running:
                 reply = QMessageBox.question(self, "Aplicar Alterações",
                                              f"Para aplicar as novas configurações na câmera '{cam_name}', ela precisa ser reiniciada. Deseja continuar?",
@@ -321,7 +448,7 @@ class MainWindow(QMainWindow):
         if reply == QMessageBox.Yes:
             for row in sorted(selected_rows, reverse=True):
                 cam_name = self.camera_table.item(row, 0).text()
-                if cam_name in self.running_processes:
+                if self.is_camera_running(cam_name):
                     self._stop_single_camera(cam_name)
                 self.camera_table.removeRow(row)
             self.save_cameras()
@@ -342,63 +469,66 @@ class MainWindow(QMainWindow):
 
         config_with_name = {'name': cam_name, **config}
 
-        dialog = LiveViewDialog(config_with_name, self)
+        dialog = LiveViewDialog(config_with_name, self, use_frame_bus=self.is_camera_running(cam_name))
         self.live_view_dialogs[cam_name] = dialog
+        self.send_worker_command(cam_name, "subscribe", topic="detections")
+        if dialog.use_frame_bus:
+            self.subscribe_frames(cam_name)
         dialog.show()
 
     def on_live_view_closed(self, cam_name):
         if cam_name in self.live_view_dialogs:
-            del self.live_view_dialogs[cam_name]
+            dialog = self.live_view_dialogs.pop(cam_name)
+            self.send_worker_command(cam_name, "unsubscribe", topic="detections")
+            if dialog.use_frame_bus:
+                self.unsubscribe_frames(cam_name)
+
+    def subscribe_frames(self, cam_name):
+        """ O worker só copia os quadros para o frame bus enquanto alguma janela os lê """
+        self.frame_readers[cam_name] += 1
+        if self.frame_readers[cam_name] == 1:
+            self.send_worker_command(cam_name, "subscribe", topic="frames")
+
+    def unsubscribe_frames(self, cam_name):
+        self.frame_readers[cam_name] -= 1
+        if self.frame_readers[cam_name] <= 0:
+            del self.frame_readers[cam_name]
+            self.send_worker_command(cam_name, "unsubscribe", topic="frames")
+
+    def running_cameras(self):
+        names = (self.camera_table.item(row, 0).text() for row in range(self.camera_table.rowCount()))
+        return [cam_name for cam_name in names if self.is_camera_running(cam_name)]
+
+    def show_video_wall(self):
+        if self.video_wall is not None:
+            self.video_wall.activateWindow()
+            return
+        wall_settings = self.settings['video_wall']
+        self.video_wall = VideoWallDialog(self.running_cameras, self, wall_settings['max_fps'],
+                                          wall_settings['total_fps'])
+        self.video_wall.show()
+
+    def on_video_wall_closed(self):
+        self.video_wall = None
+
+    def send_worker_command(self, cam_name, command, **fields):
+        self.supervisor.run(self.supervisor.send_command(cam_name, command, **fields), wait=False)
 
     def _start_single_camera(self, row):
         name_item = self.camera_table.item(row, 0)
         cam_name = name_item.text()
         config = name_item.data(Qt.UserRole)
 
-        if cam_name in self.running_processes: return True
-
-        worker_script_path = resource_path('detector_worker.py')
-
-        command = [
-            sys.executable, worker_script_path,
-            '--name', cam_name,
-            '--url', config['url'],
-            '--mode', config.get('mode', 'temperature'),
-            '--rearm_time', str(config.get('rearm_time', 5))
-        ]
-
-        if config.get('mode') == 'object':
-            command.extend(['--object_ids', config.get('object_ids', '')])
-            command.extend(['--quantity', str(config.get('quantity', 1))])
-            if config.get('exact_number', False):
-                command.append('--exact_number')
-            command.extend(['--sensitivity', str(config.get('sensitivity', 0))])
-
-            if config.get('use_roi') and config.get('roi'):
-                command.extend(['--roi', ','.join(map(str, config['roi']))])
-
-            use_gpu = config.get('use_gpu', True)
-            device_arg = '0' if use_gpu else 'cpu'
-            command.extend(['--device', device_arg])
-        else:  # Modo temperatura
-            command.extend(['--roi', ','.join(map(str, config.get('roi', [0, 0, 0, 0])))])
-            command.extend(['--limite', str(config.get('limite', 0))])
-            command.extend(['--receptor_url', config.get('receptor', '')])
-            command.extend(['--receptor_port', str(config.get('receptor_port', 5000))])
-            if config.get('gpu', False):
-                command.append('--gpu')
+        if self.is_camera_running(cam_name): return True
 
+        self.camera_health.pop(cam_name, None)
+        self.camera_stats.pop(cam_name, None)
         try:
-            process = subprocess.Popen(
-                command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
-                encoding='utf-8', bufsize=1, creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
-            self.running_processes[cam_name] = process
-            thread = threading.Thread(target=self.stream_reader, args=(process, cam_name), daemon=True)
-            thread.start()
-            self.add_or_update_camera_in_table(cam_name, config, row)
+            self.supervisor.run(self.supervisor.start_camera(cam_name, config))
         except FileNotFoundError:
             QMessageBox.critical(self, "Erro", "Script 'detector_worker.py' não encontrado.")
             return False
+        self.add_or_update_camera_in_table(cam_name, config, row)
         return True
 
     def start_monitoring(self):
@@ -409,13 +539,7 @@ class MainWindow(QMainWindow):
         self.update_button_states()
 
     def _stop_single_camera(self, cam_name):
-        if cam_name in self.running_processes:
-            process = self.running_processes.pop(cam_name)
-            process.terminate()
-            try:
-                process.wait(timeout=3)
-            except subprocess.TimeoutExpired:
-                process.kill()
+        self.supervisor.run(self.supervisor.stop_camera(cam_name))
 
     def stop_monitoring(self):
         selected_rows = self.get_selected_rows()
@@ -425,10 +549,12 @@ class MainWindow(QMainWindow):
             self._stop_single_camera(cam_name)
 
     def closeEvent(self, event):
-        for dialog in self.live_view_dialogs.values():
+        for dialog in list(self.live_view_dialogs.values()):
             dialog.close()
-        for process in self.running_processes.values():
-            process.terminate()
+        if self.video_wall is not None:
+            self.video_wall.close()
+        self.supervisor.shutdown()
+        self.event_store.close()
         event.accept()
 
 
@@ -0,0 +1,169 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+MODEL_CACHE_DIR = 'model_cache'
+BACKENDS = ('torch', 'onnx', 'openvino')
+
+_loaded_models = {}
+
+
+def cached_export_path(weights, backend, int8=False, imgsz=640, dynamic=False, cache_dir=MODEL_CACHE_DIR):
+    """ Caminho do modelo exportado no cache (arquivo .onnx ou diretório OpenVINO IR) """
+    stem = os.path.splitext(os.path.basename(weights))[0]
+    name = f"{stem}_{imgsz}{'_int8' if int8 else ''}{'_dyn' if dynamic else ''}"
+    if backend == 'onnx':
+        return os.path.join(cache_dir, f"{name}.onnx")
+    return os.path.join(cache_dir, f"{name}_openvino_model")
+
+
+def _quantize_onnx(source, target):
+    # A exportação ONNX do Ultralytics não suporta INT8; a quantização dinâmica vem do ONNX Runtime.
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(source, target, weight_type=QuantType.QUInt8)
+
+
+def _export(weights, backend, int8, imgsz, dynamic, target, int8_data=None):
+    from ultralytics import YOLO
+
+    os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+    model = YOLO(weights)
+    # Exporta a partir de uma cópia dos pesos em um diretório temporário: o Ultralytics grava o
+    # resultado ao lado do .pt, e vários workers podem estar exportando ao mesmo tempo.
+    work_dir = tempfile.mkdtemp(prefix='export_', dir=os.path.dirname(target) or '.')
+    try:
+        local_weights = shutil.copy(getattr(model, 'ckpt_path', None) or weights, work_dir)
+        export_args = {"format": backend, "imgsz": imgsz, "dynamic": dynamic}
+        if backend == 'openvino' and int8:
+            export_args["int8"] = True
+            if int8_data:
+                export_args["data"] = int8_data
+        exported = YOLO(local_weights).export(**export_args)
+
+        if backend == 'onnx' and int8:
+            quantized = os.path.join(work_dir, 'quantized.onnx')
+            _quantize_onnx(exported, quantized)
+            exported = quantized
+
+        if os.path.isdir(exported):
+            try:
+                os.rename(exported, target)
+            except OSError:
+                pass  # Outro worker terminou a mesma exportação antes; usa a dele.
+        else:
+            os.replace(exported, target)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return target
+
+
+def load_model(weights="yolo12n.pt", backend='torch', int8=False, imgsz=640, dynamic=False, int8_data=None):
+    """ Carrega o modelo no backend pedido, exportando e guardando em cache na primeira vez.
+    Dentro do processo o modelo carregado fica em memória: chamadas seguintes com os mesmos
+    parâmetros devolvem a mesma instância, já aquecida. """
+    key = (weights, backend, int8, None if backend == 'torch' else imgsz, dynamic)
+    if key not in _loaded_models:
+        _loaded_models[key] = _load_model(weights, backend, int8, imgsz, dynamic, int8_data)
+    return _loaded_models[key]
+
+
+def _load_model(weights, backend, int8, imgsz, dynamic, int8_data):
+    from ultralytics import YOLO
+
+    if backend == 'torch':
+        return YOLO(weights)
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de inferência desconhecido: '{backend}'.")
+
+    target = cached_export_path(weights, backend, int8, imgsz, dynamic)
+    if not os.path.exists(target):
+        print(f"Exportando '{weights}' para {backend}{' (INT8)' if int8 else ''}. "
+              f"Isso acontece apenas uma vez; o resultado fica em '{target}'.", flush=True)
+        _export(weights, backend, int8, imgsz, dynamic, target, int8_data)
+    return YOLO(target, task='detect')
+
+
+def _read_frames(source, count):
+    import cv2
+
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def benchmark(source, backends, frames_count=200, warmup=5, imgsz=640, int8=False, device='cpu',
+              weights="yolo12n.pt"):
+    """ Roda cada backend sobre os mesmos quadros e mede latência por quadro e vazão """
+    frames = _read_frames(source, frames_count)
+    if not frames:
+        raise RuntimeError(f"Nenhum quadro lido de '{source}'.")
+
+    report = []
+    for backend in backends:
+        model = load_model(weights, backend, int8 and backend != 'torch', imgsz)
+        for frame in frames[:warmup]:
+            model(frame, imgsz=imgsz, verbose=False, device=device)
+
+        latencies = []
+        start = time.perf_counter()
+        for frame in frames:
+            t0 = time.perf_counter()
+            model(frame, imgsz=imgsz, verbose=False, device=device)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        total = time.perf_counter() - start
+
+        latencies.sort()
+        report.append({
+            "backend": backend + (' int8' if int8 and backend != 'torch' else ''),
+            "mean_ms": sum(latencies) / len(latencies),
+            "p50_ms": latencies[len(latencies) // 2],
+            "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            "fps": len(frames) / total,
+        })
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exportação e benchmark dos backends de inferência YOLO")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Exporta o modelo para o cache")
+    export_parser.add_argument("--backend", required=True, choices=BACKENDS[1:])
+    export_parser.add_argument("--int8", action="store_true")
+    export_parser.add_argument("--int8_data", help="Dataset de calibração INT8 do OpenVINO (ex.: coco8.yaml)")
+    export_parser.add_argument("--imgsz", type=int, default=640)
+    export_parser.add_argument("--dynamic", action="store_true", help="Lote dinâmico (servidor de inferência)")
+    export_parser.add_argument("--weights", default="yolo12n.pt")
+
+    bench_parser = subparsers.add_parser("benchmark", help="Compara latência e vazão dos backends")
+    bench_parser.add_argument("--source", required=True, help="Arquivo de vídeo (ou índice de câmera)")
+    bench_parser.add_argument("--backends", default=','.join(BACKENDS))
+    bench_parser.add_argument("--frames", type=int, default=200)
+    bench_parser.add_argument("--int8", action="store_true")
+    bench_parser.add_argument("--imgsz", type=int, default=640)
+    bench_parser.add_argument("--device", default='cpu')
+    bench_parser.add_argument("--weights", default="yolo12n.pt")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        path = cached_export_path(args.weights, args.backend, args.int8, args.imgsz, args.dynamic)
+        if os.path.exists(path):
+            print(f"Modelo já está no cache: {path}")
+        else:
+            _export(args.weights, args.backend, args.int8, args.imgsz, args.dynamic, path, args.int8_data)
+            print(f"Modelo exportado: {path}")
+    else:
+        results = benchmark(args.source, [b.strip() for b in args.backends.split(',')], args.frames,
+                            imgsz=args.imgsz, int8=args.int8, device=args.device, weights=args.weights)
+        print(f"{'Backend':<16}{'Média (ms)':>12}{'p50 (ms)':>12}{'p95 (ms)':>12}{'Quadros/s':>12}")
+        for row in results:
+            print(f"{row['backend']:<16}{row['mean_ms']:>12.1f}{row['p50_ms']:>12.1f}"
+                  f"{row['p95_ms']:>12.1f}{row['fps']:>12.1f}")
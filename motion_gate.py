@@ -0,0 +1,51 @@
+import cv2
+
+
+class MotionGate:
+    """ Pré-filtro barato que decide se vale a pena rodar o modelo no quadro atual.
+
+    Compara uma cópia reduzida em tons de cinza da imagem (já recortada na ROI) com a
+    imagem usada na última inferência. Se a fração de pixels alterados passar de
+    'threshold', ou se 'heartbeat' segundos se passaram desde a última inferência,
+    o quadro deve ser processado.
+    """
+
+    def __init__(self, threshold=0.005, heartbeat=5.0, width=160, pixel_delta=25):
+        self.threshold = threshold
+        self.heartbeat = heartbeat
+        self.width = width
+        self.pixel_delta = pixel_delta
+        self._reference = None
+        self._last_inference_time = 0
+        self.frames_seen = 0
+        self.frames_skipped = 0
+
+    def _prepare(self, image):
+        h, w = image.shape[:2]
+        scale = min(1.0, self.width / w)
+        small = cv2.resize(image, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def should_infer(self, image, now):
+        self.frames_seen += 1
+        gray = self._prepare(image)
+
+        run_inference = (self._reference is None or self._reference.shape != gray.shape
+                         or (now - self._last_inference_time) >= self.heartbeat)
+        if not run_inference:
+            diff = cv2.absdiff(gray, self._reference)
+            _, changed = cv2.threshold(diff, self.pixel_delta, 255, cv2.THRESH_BINARY)
+            run_inference = cv2.countNonZero(changed) / changed.size >= self.threshold
+
+        if run_inference:
+            # A referência é o quadro da última inferência (e não o anterior), para que
+            # mudanças lentas também acabem disparando o modelo.
+            self._reference = gray
+            self._last_inference_time = now
+        else:
+            self.frames_skipped += 1
+        return run_inference
+
+    def skip_ratio(self):
+        return self.frames_skipped / self.frames_seen if self.frames_seen else 0.0
@@ -0,0 +1,112 @@
+import itertools
+
+import numpy as np
+
+
+def iou_matrix(a, b):
+    """ IoU entre cada caixa de 'a' (n, 4) e cada caixa de 'b' (m, 4), no formato x1, y1, x2, y2 """
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
+
+
+class Track:
+    """ Objeto rastreado: última caixa medida, velocidade (px/s) e histórico de aparições """
+
+    def __init__(self, track_id, detection, now):
+        self.track_id = track_id
+        self.box = np.array(detection[:4], dtype=np.float64)
+        self.velocity = np.zeros(4)
+        self.conf = float(detection[4])
+        self.cls = int(detection[5])
+        self.first_seen = now
+        self.last_seen = now
+        self.hits = 1
+        self.misses = 0  # inferências seguidas sem detecção associada
+
+    def predicted_box(self, now):
+        return self.box + self.velocity * (now - self.last_seen)
+
+    def correct(self, detection, now):
+        box = np.array(detection[:4], dtype=np.float64)
+        dt = now - self.last_seen
+        if dt > 0:
+            # Média móvel: uma medida ruidosa não faz a caixa propagada disparar.
+            self.velocity = 0.5 * self.velocity + 0.5 * (box - self.box) / dt
+        self.box = box
+        self.conf = float(detection[4])
+        self.last_seen = now
+        self.hits += 1
+        self.misses = 0
+
+    def detection(self, now):
+        """ Caixa propagada até 'now' no formato das detecções [x1, y1, x2, y2, conf, classe] """
+        return [*self.predicted_box(now).tolist(), self.conf, self.cls]
+
+
+class IoUTracker:
+    """ Rastreador leve por sobreposição (IoU) com propagação por velocidade constante.
+
+    update() associa as detecções de um quadro-chave às trilhas existentes (mesma classe, maior
+    IoU com a caixa prevista primeiro); predict() apenas propaga as trilhas nos quadros entre
+    quadros-chave, sem inferência. Uma trilha só conta depois de 'min_hits' associações e continua
+    contando por até 'max_age' segundos sem ser vista, o que estabiliza a contagem quando o modelo
+    perde um objeto por um quadro ou dois. 'now' segue a convenção das regras de alerta.
+
+    Uma trilha só expira depois de também faltar em 'min_misses' inferências seguidas: com
+    quadros-chave espaçados (ou o filtro de movimento segurando o modelo), o tempo sozinho a
+    apagaria entre duas análises e zeraria a contagem e a permanência.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_age=1.0, min_hits=2, min_misses=2):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.min_misses = min_misses
+        self.tracks = []
+        self._ids = itertools.count(1)
+
+    def update(self, detections, now):
+        """ Incorpora as detecções do quadro e devolve as trilhas confirmadas """
+        unmatched = list(range(len(detections)))
+        matched_tracks = set()
+        if self.tracks and detections:
+            predicted = np.array([track.predicted_box(now) for track in self.tracks])
+            boxes = np.array([det[:4] for det in detections], dtype=np.float64)
+            overlap = iou_matrix(predicted, boxes)
+            same_class = (np.array([track.cls for track in self.tracks])[:, None]
+                          == np.array([int(det[5]) for det in detections])[None, :])
+            overlap[~same_class] = 0.0
+            for ti, di in zip(*np.unravel_index(np.argsort(-overlap, axis=None), overlap.shape)):
+                if overlap[ti, di] < self.iou_threshold:
+                    break
+                if ti in matched_tracks or di not in unmatched:
+                    continue
+                self.tracks[ti].correct(detections[di], now)
+                matched_tracks.add(ti)
+                unmatched.remove(di)
+
+        for ti, track in enumerate(self.tracks):
+            if ti not in matched_tracks:
+                track.misses += 1
+        self._expire(now)
+        self.tracks.extend(Track(next(self._ids), detections[di], now) for di in unmatched)
+        return self.confirmed()
+
+    def predict(self, now):
+        """ Trilhas confirmadas sem nova inferência (quadros entre quadros-chave) """
+        self._expire(now)
+        return self.confirmed()
+
+    def _expire(self, now):
+        self.tracks = [track for track in self.tracks
+                       if now - track.last_seen <= self.max_age or track.misses < self.min_misses]
+
+    def confirmed(self):
+        return [track for track in self.tracks if track.hits >= self.min_hits]
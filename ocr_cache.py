@@ -0,0 +1,61 @@
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class OcrCache:
+    """ Cache LRU dos textos lidos pelo OCR, indexado por uma miniatura da ROI em tons de cinza.
+
+    Um display de temperatura muda pouco; enquanto a ROI continuar visualmente igual a uma
+    leitura anterior (nenhum pixel da miniatura 'size' varia mais que 'tolerance' níveis de
+    cinza), o resultado dessa leitura é reaproveitado sem chamar o EasyOCR. A tolerância
+    absorve ruído do sensor; a troca de um dígito altera a miniatura bem além dela. Uma
+    entrada é relida depois de 'max_age' segundos, para uma leitura errada não ficar presa.
+    """
+
+    def __init__(self, max_entries=32, tolerance=12, max_age=60.0, size=(32, 16)):
+        self.max_entries = max_entries
+        self.tolerance = tolerance
+        self.max_age = max_age
+        self.size = size
+        self._entries = OrderedDict()  # id -> (miniatura, textos, instante da leitura)
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _thumbnail(self, gray):
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def read(self, gray, compute):
+        """ Textos da ROI 'gray': do cache se houver leitura equivalente, senão compute() """
+        now = time.monotonic()
+        thumbnail = self._thumbnail(gray)
+        # Mais recentes primeiro: o caso comum é o display não ter mudado desde a última leitura.
+        for entry_id in reversed(self._entries):
+            reference, texts, read_at = self._entries[entry_id]
+            if now - read_at > self.max_age:
+                continue
+            if np.abs(reference - thumbnail).max() <= self.tolerance:
+                self._entries.move_to_end(entry_id)
+                self.hits += 1
+                return texts
+
+        self.misses += 1
+        texts = compute()
+        for entry_id in [i for i, (_, _, read_at) in self._entries.items() if now - read_at > self.max_age]:
+            del self._entries[entry_id]
+        self._entries[self._next_id] = (thumbnail, texts, now)
+        self._next_id += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return texts
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hit_rate(), 3),
+                "entries": len(self._entries)}
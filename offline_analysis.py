@@ -0,0 +1,234 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from alert_rules import TemperatureRule, parse_temperature
+from roi_zones import build_zones, detect_zones
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov', '.m4v', '.ts', '.webm', '.wmv', '.mpg', '.mpeg')
+
+# Estado de cada processo do pool (modelo/leitor OCR carregados uma vez no initializer).
+_options = None
+_model = None
+_reader = None
+
+
+def list_videos(path):
+    """ Um arquivo de vídeo ou todos os vídeos de um diretório (recursivo), em ordem de nome """
+    if os.path.isfile(path):
+        return [path]
+    videos = []
+    for root, _, files in os.walk(path):
+        videos.extend(os.path.join(root, name) for name in files if name.lower().endswith(VIDEO_EXTENSIONS))
+    return sorted(videos)
+
+
+def plan_segments(path, segment_seconds):
+    """ Divide o vídeo em trechos de 'segment_seconds' (em quadros) para o pool de processos """
+    cap = cv2.VideoCapture(path)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    if frame_count <= 0:
+        return [(path, 0, None, fps)]  # Duração desconhecida: um único trecho até o fim.
+    step = max(1, int(segment_seconds * fps))
+    return [(path, start, min(start + step, frame_count), fps) for start in range(0, frame_count, step)]
+
+
+def format_video_time(seconds):
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+
+def _init_worker(options, threads):
+    global _options, _model, _reader
+    _options = options
+    if options['mode'] == 'object':
+        from model_backends import load_model
+        # Os modelos exportados têm lote fixo 1; lotes de vários quadros (ou zonas) precisam da
+        # exportação com lote dinâmico, como no servidor de inferência.
+        dynamic = options['backend'] != 'torch' and options['batch_size'] * len(options['rois']) > 1
+        _model = load_model("yolo12n.pt", options['backend'], options['int8'], options['imgsz'], dynamic=dynamic)
+    else:
+        from detector_worker import create_text_reader
+        _reader = create_text_reader(options['ocr_engine'], options['gpu'], options['digit_templates'],
+                                     options['digit_confidence'])
+    # O torch só é importado pelo modelo/EasyOCR quando eles precisam; sem ele não há o que limitar.
+    if 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(threads)
+
+
+def _open_at(path, start_frame):
+    cap = cv2.VideoCapture(path)
+    if start_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    return cap
+
+
+def _detect_batch(indices, batch):
+    from detector_worker import DETECTION_CONF
+
+    def detect(images):
+        results = _model(images, classes=_options['target_ids'], conf=DETECTION_CONF, imgsz=_options['imgsz'],
+                         verbose=False, device=_options['device'])
+        return [result.boxes.data.tolist() if result.boxes else [] for result in results]
+
+    return list(zip(indices, detect_zones(detect, batch, _options['rois'], _options['imgsz'])))
+
+
+def _analyze_object_segment(path, start, end):
+    """ Detecções de cada zona em todos os quadros do trecho, inferidas em lotes de 'batch_size' quadros """
+    batch_size = _options['batch_size']
+    cap = _open_at(path, start)
+    detections, batch, indices = [], [], []
+    index = start
+    while end is None or index < end:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        batch.append(frame)
+        indices.append(index)
+        if len(batch) == batch_size:
+            detections.extend(_detect_batch(indices, batch))
+            batch, indices = [], []
+        index += 1
+    if batch:
+        detections.extend(_detect_batch(indices, batch))
+    cap.release()
+    return detections
+
+
+def _analyze_temperature_segment(path, start, end, fps):
+    """ Textos lidos pelo OCR a cada OCR_INTERVAL segundos de vídeo (a cadência do worker ao vivo) """
+    from detector_worker import OCR_INTERVAL, read_roi_texts
+
+    step = max(1, round(fps * OCR_INTERVAL))
+    cap = _open_at(path, start)
+    readings = []
+    index = start
+    while end is None or index < end:
+        if index % step:
+            # Quadro fora da amostragem: grab() avança sem converter a imagem.
+            if not cap.grab():
+                break
+        else:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            readings.append((index, read_roi_texts(_reader, frame, _options['roi'])))
+        index += 1
+    cap.release()
+    return readings
+
+
+def _analyze_segment(task):
+    path, start, end, fps = task
+    if _options['mode'] == 'object':
+        return _analyze_object_segment(path, start, end)
+    return _analyze_temperature_segment(path, start, end, fps)
+
+
+def _make_zones(args):
+    """ Zonas do modo 'object' com as mesmas regras do worker ao vivo. Offline todos os quadros passam
+    pelo modelo, então --keyframe_interval não se aplica. """
+    from detector_worker import YOLO_CLASSES, create_tracker
+    return build_zones(args.zones, args.roi, args.object_ids, args.quantity, args.exact_number, args.sensitivity,
+                       args.rearm_time, YOLO_CLASSES, lambda: create_tracker(args), args.dwell_time)
+
+
+def run_offline(args):
+    """ Roda as regras do worker sobre vídeos gravados, sem o ritmo de tempo real.
+
+    A inferência (a parte cara) é dividida em trechos entre os processos do pool; as regras de
+    alerta, que dependem do histórico, rodam depois em sequência sobre os resultados de cada
+    arquivo, na ordem dos quadros e com o tempo do vídeo como relógio. Assim os alertas são os
+    mesmos que o worker ao vivo produziria para os mesmos quadros.
+    """
+    videos = list_videos(args.url)
+    if not videos:
+        print(f"[{args.name}] Nenhum vídeo encontrado em '{args.url}'.", flush=True)
+        return
+
+    target_ids, rois = [], [args.roi]
+    if args.mode == 'object':
+        zones = _make_zones(args)
+        target_ids = sorted(set().union(*(zone.target_ids for zone in zones)))
+        rois = [zone.roi for zone in zones]
+    elif not args.roi:
+        raise ValueError("O modo temperatura precisa de --roi.")
+
+    device = args.device
+    if args.mode == 'object' and device != 'cpu':
+        import torch
+        if not torch.cuda.is_available():
+            print(f"AVISO: GPU solicitada (device='{device}'), mas não disponível. Usando CPU.", flush=True)
+            device = 'cpu'
+
+    workers = args.workers or max(1, (os.cpu_count() or 2) // 2)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    options = {"mode": args.mode, "roi": args.roi, "rois": rois, "target_ids": target_ids, "device": device,
+               "backend": args.backend, "int8": args.int8, "imgsz": args.imgsz, "gpu": args.gpu,
+               "batch_size": args.batch_size, "ocr_engine": args.ocr_engine,
+               "digit_templates": args.digit_templates, "digit_confidence": args.digit_confidence}
+    output = args.output or f"{args.name}_offline.jsonl"
+
+    started = time.perf_counter()
+    frames_analyzed = alerts = 0
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(options, threads)) as pool, \
+            open(output, 'w', encoding='utf-8') as out:
+        out.write(json.dumps({"type": "analysis", "camera": args.name, "mode": args.mode, "files": videos,
+                              "roi": args.roi, "object_ids": target_ids, "quantity": args.quantity,
+                              "exact_number": args.exact_number, "sensitivity": args.sensitivity,
+                              "limite": args.limite, "rearm_time": args.rearm_time, "tracker": args.tracker,
+                              "dwell_time": args.dwell_time, "zones": args.zones},
+                             ensure_ascii=False) + '\n')
+
+        # Todos os trechos de todos os arquivos entram no pool de uma vez; os resultados são
+        # consumidos em ordem, arquivo por arquivo.
+        plans = [(video, plan_segments(video, args.segment_seconds)) for video in videos]
+        futures = [(video, segments[0][3], [pool.submit(_analyze_segment, task) for task in segments])
+                   for video, segments in plans]
+
+        for video, fps, segment_futures in futures:
+            # Cada arquivo é uma gravação independente.
+            if args.mode == 'object':
+                zones = _make_zones(args)
+            else:
+                rule = TemperatureRule(args.limite, args.rearm_time)
+            for future in segment_futures:
+                for index, result in future.result():
+                    video_time = index / fps
+                    record = {"camera": args.name, "file": video, "frame_index": index,
+                              "video_time": round(video_time, 3)}
+                    if args.mode == 'object':
+                        boxes, messages = [], []
+                        for zone, detections in zip(zones, result):
+                            # O lote usa a união das classes de todas as zonas; cada zona só registra as suas.
+                            detections = [det for det in detections if int(det[5]) in zone.target_ids]
+                            offset_x, offset_y = zone.offset
+                            boxes.extend([x1 + offset_x, y1 + offset_y, x2 + offset_x, y2 + offset_y, conf, cls]
+                                         for x1, y1, x2, y2, conf, cls in detections)
+                            messages.extend(zone.update(detections, video_time)[1])
+                        if boxes or args.all_detections:
+                            out.write(json.dumps({"type": "detection", **record, "detections": boxes}) + '\n')
+                    else:
+                        temps = [t for t in map(parse_temperature, result) if t is not None]
+                        out.write(json.dumps({"type": "reading", **record, "texts": result,
+                                              "temperature": temps[0] if temps else None}) + '\n')
+                        messages = filter(None, [rule.update(result, video_time)])
+                    for message in messages:
+                        alerts += 1
+                        out.write(json.dumps({"type": "alert", **record, "timestamp": format_video_time(video_time),
+                                              "message": message}, ensure_ascii=False) + '\n')
+                    frames_analyzed += 1
+            print(f"[{args.name}] Arquivo analisado: {video}", flush=True)
+
+    elapsed = time.perf_counter() - started
+    print(f"[{args.name}] {frames_analyzed} quadros analisados em {elapsed:.1f} s "
+          f"({frames_analyzed / elapsed:.1f} quadros/s, {workers} processo(s)); {alerts} alerta(s). "
+          f"Resultados em '{output}'.", flush=True)
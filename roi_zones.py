@@ -0,0 +1,128 @@
+import cv2
+
+from alert_rules import DwellRule, ObjectCountRule
+
+LETTERBOX_COLOR = (114, 114, 114)  # mesma cor de preenchimento do pré-processamento do YOLO
+
+
+def parse_object_ids(value):
+    """ IDs de classe de "0, 67" ou de uma lista; ValueError se algum não for inteiro """
+    if isinstance(value, str):
+        value = value.split(',')
+    return [int(str(i).strip()) for i in value]
+
+
+def crop_roi(frame, roi):
+    """ Recorte (visão, sem cópia) da ROI [y1, y2, x1, x2]; roi vazia/None é o quadro inteiro """
+    if not roi:
+        return frame
+    y1, y2, x1, x2 = roi
+    return frame[y1:y2, x1:x2]
+
+
+def letterbox(image, size):
+    """ Reduz/amplia a imagem mantendo a proporção e completa com bordas até size x size.
+    Devolve (imagem, escala, (pad_x, pad_y)) para unletterbox() levar as caixas de volta. """
+    h, w = image.shape[:2]
+    scale = min(size / w, size / h)
+    new_w, new_h = max(1, round(w * scale)), max(1, round(h * scale))
+    if (new_w, new_h) != (w, h):
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        image = cv2.resize(image, (new_w, new_h), interpolation=interpolation)
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    image = cv2.copyMakeBorder(image, pad_y, size - new_h - pad_y, pad_x, size - new_w - pad_x,
+                               cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+    return image, scale, (pad_x, pad_y)
+
+
+def unletterbox(detections, scale, pad, width, height):
+    """ Caixas detectadas na imagem de letterbox() de volta às coordenadas do recorte original """
+    pad_x, pad_y = pad
+    boxes = []
+    for x1, y1, x2, y2, conf, cls in detections:
+        boxes.append([min(max((x1 - pad_x) / scale, 0), width), min(max((y1 - pad_y) / scale, 0), height),
+                      min(max((x2 - pad_x) / scale, 0), width), min(max((y2 - pad_y) / scale, 0), height),
+                      conf, cls])
+    return boxes
+
+
+class Zone:
+    """ Área nomeada de uma câmera no modo 'object', com seus IDs de objeto e seu próprio estado de
+    alerta (regra de contagem, rastreador e regra de permanência). roi=None é o quadro inteiro. """
+
+    def __init__(self, name, roi, target_ids, rule, tracker=None, dwell_rule=None):
+        self.name = name
+        self.roi = roi
+        self.target_ids = set(target_ids)
+        self.rule = rule
+        self.tracker = tracker
+        self.dwell_rule = dwell_rule
+
+    @property
+    def offset(self):
+        return (self.roi[2], self.roi[0]) if self.roi else (0, 0)
+
+    def crop(self, frame):
+        return crop_roi(frame, self.roi)
+
+    def update(self, detections, now, keyframe=True):
+        """ Aplica rastreamento e regras às detecções da zona (coordenadas do recorte).
+        Devolve (caixas para a Live View, mensagens de alerta); nos quadros sem nova inferência
+        (keyframe=False) as trilhas são apenas propagadas. """
+        detections = [det for det in detections if int(det[5]) in self.target_ids]
+        if self.tracker is None:
+            boxes = detections
+            messages = [self.rule.update(detections, now)]
+        else:
+            tracks = self.tracker.update(detections, now) if keyframe else self.tracker.predict(now)
+            boxes = [track.detection(now) for track in tracks]
+            messages = [self.rule.update(boxes, now)]
+            if self.dwell_rule is not None:
+                messages.append(self.dwell_rule.update(tracks, now))
+        prefix = f"[{self.name}] " if self.name else ""
+        return boxes, [prefix + message for message in messages if message]
+
+
+def build_zones(zone_specs, roi, object_ids, quantity, exact_number, sensitivity, rearm_time, class_names,
+                tracker_factory=None, dwell_time=0):
+    """ Zonas a partir da lista 'zones' da câmera ({name, roi, object_ids, quantity, exact_number});
+    campos ausentes herdam os da câmera. Sem zonas, uma única zona sem nome com 'roi' (ou o quadro
+    inteiro), que se comporta como a configuração de ROI única. """
+    zones = []
+    for spec in zone_specs or [{"name": "", "roi": roi}]:
+        rule = ObjectCountRule(spec.get("quantity", quantity), spec.get("exact_number", exact_number),
+                               spec.get("sensitivity", sensitivity), rearm_time, class_names)
+        tracker = tracker_factory() if tracker_factory is not None else None
+        dwell_rule = DwellRule(dwell_time, class_names) if tracker is not None and dwell_time > 0 else None
+        target_ids = parse_object_ids(spec.get("object_ids", object_ids))
+        zones.append(Zone(spec.get("name", ""), spec.get("roi"), target_ids, rule, tracker, dwell_rule))
+    return zones
+
+
+def zones_bounds(zones, frame_shape):
+    """ ROI (y1, y2, x1, x2) que cobre todas as zonas; o filtro de movimento olha só essa área """
+    height, width = frame_shape[:2]
+    if any(not zone.roi for zone in zones):
+        return [0, height, 0, width]
+    return [min(z.roi[0] for z in zones), max(z.roi[1] for z in zones),
+            min(z.roi[2] for z in zones), max(z.roi[3] for z in zones)]
+
+
+def detect_zones(detect_batch, frames, rois, size):
+    """ Detecções de cada ROI de cada quadro numa única chamada em lote ao modelo.
+
+    Devolve, por quadro, a lista de detecções de cada ROI em coordenadas do recorte. Com uma ROI
+    só, o recorte vai direto (o modelo faz o próprio redimensionamento, como antes). Com várias,
+    cada recorte passa por letterbox() para 'size' x 'size': o lote fica uniforme e zonas pequenas
+    são analisadas na resolução de entrada do modelo em vez de encolhidas junto com o quadro
+    inteiro. O lote tem um recorte por ROI, então os backends exportados precisam de lote dinâmico
+    (load_model(..., dynamic=True)); o letterbox fixa só altura e largura.
+    """
+    crops = [crop_roi(frame, roi) for frame in frames for roi in rois]
+    if len(rois) == 1:
+        results = detect_batch(crops)
+    else:
+        boxed = [letterbox(crop, size) for crop in crops]
+        results = [unletterbox(detections, scale, pad, crop.shape[1], crop.shape[0])
+                   for detections, (_, scale, pad), crop in zip(detect_batch([b[0] for b in boxed]), boxed, crops)]
+    return [results[i:i + len(rois)] for i in range(0, len(results), len(rois))]
@@ -0,0 +1,55 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# O que cada tipo de worker importa até começar a analisar (detector_worker.py adia o resto).
+# 'temperature' vale também para o modo objeto com servidor de inferência, que não carrega o YOLO.
+MODE_IMPORTS = {
+    "temperature": "import detector_worker",
+    "temperature-easyocr": "import detector_worker, easyocr",
+    "object": "import detector_worker, torch, ultralytics",
+}
+
+
+def import_times(statement, python=sys.executable):
+    """ Tempo de importação (s, acumulado) e profundidade de cada módulo, medidos com 'python -X importtime' """
+    result = subprocess.run([python, '-X', 'importtime', '-c', statement], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        last_line = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else ''
+        raise RuntimeError(last_line or f"Falha ao executar '{statement}'.")
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2  # Indentação = importado por outro módulo.
+        modules.append((int(cumulative) / 1e6, depth, name.strip()))
+    return modules
+
+
+def report(modes, top=8, python=sys.executable):
+    for mode in modes:
+        try:
+            modules = import_times(MODE_IMPORTS[mode], python)
+        except RuntimeError as e:
+            print(f"{mode}: não foi possível medir ({e})\n")
+            continue
+        total = sum(seconds for seconds, depth, _ in modules if depth == 0)
+        print(f"{mode}: {total:.2f} s de importações ({MODE_IMPORTS[mode]})")
+        # Módulos importados pela instrução e os que eles importam diretamente.
+        slowest = sorted((m for m in modules if m[1] <= 1), reverse=True)[:top]
+        for seconds, depth, name in slowest:
+            print(f"    {seconds:8.3f} s  {'  ' * depth}{name}")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tempo de importação de cada tipo de worker (python -X importtime). "
+                                                 "O tempo completo até a primeira análise aparece no log de cada "
+                                                 "worker ('Pronto em ...') e na mensagem 'stats'.")
+    parser.add_argument("--modes", default=','.join(MODE_IMPORTS), help="Tipos de worker a medir, separados por vírgula")
+    parser.add_argument("--top", type=int, default=8, help="Módulos mais lentos a listar por tipo")
+    args = parser.parse_args()
+    report([mode.strip() for mode in args.modes.split(',')], args.top)
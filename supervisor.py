@@ -0,0 +1,570 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from app_settings import load_settings
+from event_store import EventStore
+from inference_server import AUTHKEY_ENV
+from inference_server import SERVER_NAME as INFERENCE_SERVER_NAME
+from worker_protocol import MessageDecoder, encode_command, timestamp
+from worker_stats import LatencyHistogram
+
+CONFIG_FILE = 'cameras_config.json'
+STANDBY_NAME = "Worker em espera"  # Só para exibição; o pool identifica os workers pelo processo.
+CREATION_FLAGS = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+
+
+def resource_path(relative_path):
+    """ Retorna o caminho absoluto para o recurso, funcionando tanto em dev quanto no PyInstaller """
+    try:
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+
+def load_camera_configs(path=CONFIG_FILE):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        print(f"Aviso: '{path}' está corrompido.")
+        return {}
+
+
+def build_worker_command(cam_name, config, inference_server=None, settings=None):
+    """ Linha de comando do detector_worker.py para uma câmera do cameras_config.json """
+    command = [
+        sys.executable, resource_path('detector_worker.py'),
+        '--name', cam_name,
+        '--url', config['url'],
+        '--mode', config.get('mode', 'temperature'),
+        '--rearm_time', str(config.get('rearm_time', 5))
+    ]
+    if config.get('loop_fps'):
+        command.extend(['--loop_fps', str(config['loop_fps'])])
+    if settings:
+        command.extend(['--watchdog_interval', str(settings['watchdog']['heartbeat_interval'])])
+        command.extend(['--max_backoff', str(settings['watchdog']['reconnect_max_backoff'])])
+        command.extend(['--stats_interval', str(settings['stats']['interval'])])
+        clips = settings['clips']
+        if clips['enabled']:
+            command.extend(['--clip_dir', os.path.abspath(clips['directory']),
+                            '--clip_pre', str(clips['pre_seconds']), '--clip_post', str(clips['post_seconds']),
+                            '--clip_fps', str(clips['fps']), '--clip_buffer_mb', str(clips['max_buffer_mb']),
+                            '--clip_quality', str(clips['jpeg_quality'])])
+
+    if config.get('mode') == 'object':
+        command.extend(['--object_ids', config.get('object_ids', '')])
+        command.extend(['--quantity', str(config.get('quantity', 1))])
+        if config.get('exact_number', False):
+            command.append('--exact_number')
+        command.extend(['--sensitivity', str(config.get('sensitivity', 0))])
+
+        if config.get('use_roi') and config.get('roi'):
+            command.extend(['--roi', ','.join(map(str, config['roi']))])
+        if config.get('zones'):
+            command.extend(['--zones', json.dumps(config['zones'])])
+
+        if config.get('motion_gate', False):
+            command.append('--motion_gate')
+            command.extend(['--heartbeat', str(config.get('heartbeat', 5))])
+
+        if config.get('tracker', False):
+            command.append('--tracker')
+            command.extend(['--keyframe_interval', str(config.get('keyframe_interval', 1))])
+            command.extend(['--dwell_time', str(config.get('dwell_time', 0))])
+
+        use_gpu = config.get('use_gpu', True)
+        device_arg = '0' if use_gpu else 'cpu'
+        command.extend(['--device', device_arg])
+        command.extend(['--backend', config.get('backend', 'torch')])
+        if config.get('int8', False):
+            command.append('--int8')
+
+        if inference_server:
+            command.extend(['--inference_server', inference_server])
+    else:  # Modo temperatura
+        command.extend(['--roi', ','.join(map(str, config.get('roi', [0, 0, 0, 0])))])
+        command.extend(['--limite', str(config.get('limite', 0))])
+        command.extend(['--receptor_url', config.get('receptor', '')])
+        command.extend(['--receptor_port', str(config.get('receptor_port', 5000))])
+        if config.get('gpu', False):
+            command.append('--gpu')
+        if 'ocr_cache_size' in config:
+            command.extend(['--ocr_cache_size', str(config['ocr_cache_size'])])
+        if config.get('ocr_engine'):
+            command.extend(['--ocr_engine', config['ocr_engine']])
+        if config.get('digit_templates'):
+            command.extend(['--digit_templates', config['digit_templates']])
+        if inference_server:
+            command.extend(['--inference_server', inference_server])
+    return command
+
+
+# Opções que decidem o que um worker em espera pré-carrega; o resto da linha de comando da câmera
+# só chega no comando 'assign'.
+PRELOAD_OPTIONS = ('--mode', '--device', '--backend', '--imgsz', '--ocr_engine', '--inference_server')
+PRELOAD_FLAGS = ('--int8', '--gpu')
+
+
+def build_standby_command(worker_command):
+    """ Linha de comando de um worker em espera que pode assumir 'worker_command'; serve também
+    de chave do pool (workers com o mesmo modelo pré-carregado) """
+    command = worker_command[:2] + ['--standby', '--name', STANDBY_NAME, '--url', '']
+    args = worker_command[2:]
+    for i, arg in enumerate(args):
+        if arg in PRELOAD_OPTIONS:
+            command.extend(args[i:i + 2])
+        elif arg in PRELOAD_FLAGS:
+            command.append(arg)
+    return command
+
+
+def build_inference_server_command(server_settings):
+    command = [
+        sys.executable, resource_path('inference_server.py'),
+        '--host', server_settings['host'],
+        '--port', str(server_settings['port']),
+        '--model', server_settings['model'],
+        '--backend', server_settings['backend'],
+        '--device', str(server_settings['device']),
+        '--max_batch', str(server_settings['max_batch']),
+        '--max_wait_ms', str(server_settings['max_wait_ms'])
+    ]
+    if server_settings.get('int8'):
+        command.append('--int8')
+    if server_settings.get('allow_remote'):
+        command.append('--allow_remote')
+    if server_settings.get('ocr'):
+        command.append('--ocr')
+        if server_settings.get('ocr_gpu'):
+            command.append('--ocr_gpu')
+    return command
+
+
+def open_stats_log(stats_settings):
+    """ Logger que grava cada mensagem 'stats' como uma linha JSON em um arquivo rotativo """
+    if not stats_settings.get('path'):
+        return None
+    logger = logging.getLogger('worker_stats')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    if not logger.handlers:
+        handler = RotatingFileHandler(stats_settings['path'], maxBytes=stats_settings['max_bytes'],
+                                      backupCount=stats_settings['backup_count'], encoding='utf-8')
+        logger.addHandler(handler)
+    return logger
+
+
+class CameraSupervisor:
+    """ Inicia e acompanha os workers das câmeras sem depender de Qt.
+
+    Toda a saída dos workers é lida por um único loop asyncio (um stream por processo, sem
+    uma thread por worker). As mensagens decodificadas chegam em on_message(cam_name, dict),
+    as linhas de texto em on_output(cam_name, str) e o término em on_finished(cam_name).
+    Alertas e erros são gravados no event_store (se houver) antes de on_message.
+
+    Watchdog: cada worker envia heartbeats com o estado da captura. Um worker sem heartbeat por
+    'heartbeat_timeout' ou com o decodificador bloqueado por mais de 'stall_timeout' é morto e
+    reiniciado com espera exponencial. Reconexões, tempo sem sinal e reinícios ficam em health.
+    As mensagens 'stats' dos workers são gravadas no arquivo rotativo de settings['stats'].
+
+    Alertas e detecções trazem o instante de captura do quadro (time.monotonic() do worker, o
+    mesmo relógio do sistema aqui); a latência quadro→controlador de cada um vai para os
+    histogramas em latency, para o campo 'latency_ms' do alerta e para as linhas de 'stats'.
+
+    As inscrições da Live View (comandos 'subscribe'/'unsubscribe' de send_command) ficam
+    guardadas por câmera e são reenviadas a cada worker que assume a câmera: início, reinício
+    pelo watchdog ou worker em espera.
+
+    Pool de workers em espera: para cada combinação de modelo já usada (ou pedida em prewarm),
+    o supervisor mantém settings['worker_pool']['size'] workers com o modelo carregado e aquecido.
+    Iniciar uma câmera entrega a um deles a linha de comando completa (comando 'assign'), sem
+    pagar de novo o interpretador, as importações e o carregamento do modelo. Desativado por
+    padrão (cada worker em espera é um processo a mais com o modelo na memória) e sem reposição
+    para câmeras que usam o servidor de inferência compartilhado.
+
+    As corrotinas rodam no loop do supervisor; uma interface gráfica usa start_in_thread()
+    e run(), que agenda a corrotina a partir de outra thread.
+    """
+
+    def __init__(self, settings, event_store=None, on_message=None, on_output=None, on_finished=None):
+        self.settings = settings
+        self.event_store = event_store
+        self.on_message = on_message or (lambda cam_name, data: None)
+        self.on_output = on_output or (lambda cam_name, text: print(f"[{cam_name}]: {text}", flush=True))
+        self.on_finished = on_finished or (lambda cam_name: None)
+        self.processes = {}
+        self.configs = {}
+        self.health = {}  # cam_name -> estado do último heartbeat + reinícios feitos pelo watchdog
+        self.subscriptions = {}  # cam_name -> tópicos pedidos com 'subscribe' (reenviados a cada worker novo)
+        self.inference_server = None
+        # Chave nova a cada execução para o servidor de inferência e os workers se autenticarem.
+        self.env = {**os.environ, AUTHKEY_ENV: os.environ.get(AUTHKEY_ENV) or secrets.token_hex(32)}
+        self.standby = {}  # perfil (linha de comando em espera) -> workers ociosos com o modelo carregado
+        self._names = {}  # processo -> nome atual (o worker em espera passa a ter o nome da câmera)
+        self._idle = set()  # workers em espera que ainda não receberam câmera
+        self._restarting = set()
+        self._restart_tasks = {}
+        self.stats_log = open_stats_log(settings['stats'])
+        self.latency = {}  # cam_name -> {"alert": LatencyHistogram, "detection": LatencyHistogram}
+        self._watchdog_task = None
+        self.loop = None
+        self._thread = None
+
+    # --- Uso a partir de outra thread (interface gráfica) ---
+
+    def start_in_thread(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def run(self, coro, wait=True, timeout=10):
+        """ Agenda a corrotina no loop do supervisor; com wait=True aguarda e devolve o resultado """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return future.result(timeout) if wait else future
+
+    def shutdown(self):
+        self.run(self.stop_all(), timeout=15)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=2)
+
+    # --- Corrotinas (rodam no loop do supervisor) ---
+
+    def is_running(self, cam_name):
+        return cam_name in self.processes
+
+    async def _spawn(self, name, command, with_stdin):
+        process = await asyncio.create_subprocess_exec(
+            *command, stdin=subprocess.PIPE if with_stdin else subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=self.env, creationflags=CREATION_FLAGS)
+        self._names[process] = name
+        asyncio.ensure_future(self._read_output(name, process))
+        asyncio.ensure_future(self._read_errors(name, process))
+        return process
+
+    async def ensure_inference_server(self):
+        """ Inicia o servidor de inferência compartilhado (se habilitado) e retorna seu endereço """
+        server_settings = self.settings['inference_server']
+        if not server_settings.get('enabled'):
+            return None
+        if self.inference_server is None or self.inference_server.returncode is not None:
+            self.inference_server = await self._spawn(
+                INFERENCE_SERVER_NAME, build_inference_server_command(server_settings), with_stdin=False)
+        return f"{server_settings['host']}:{server_settings['port']}"
+
+    async def start_camera(self, cam_name, config):
+        if cam_name in self.processes:
+            return True
+        self.configs[cam_name] = config
+        self.health[cam_name] = {"state": "starting", "reconnects": 0, "downtime": 0.0, "restarts": 0,
+                                 "last_heartbeat": None}
+        self.latency[cam_name] = {"alert": LatencyHistogram(), "detection": LatencyHistogram()}
+        await self._spawn_worker(cam_name)
+        if self._watchdog_task is None:
+            self._watchdog_task = asyncio.ensure_future(self._watchdog_loop())
+        return True
+
+    async def _spawn_worker(self, cam_name):
+        config = self.configs[cam_name]
+        uses_server = config.get('mode') == 'object' or self.settings['inference_server'].get('ocr')
+        server_address = await self.ensure_inference_server() if uses_server else None
+        command = build_worker_command(cam_name, config, server_address, self.settings)
+        profile = tuple(build_standby_command(command))
+        if not await self._assign_standby(profile, cam_name, command):
+            self.processes[cam_name] = await self._spawn(cam_name, command, with_stdin=True)
+        # O worker novo (inclusive o reiniciado pelo watchdog) começa sem inscrições.
+        for topic in sorted(self.subscriptions.get(cam_name, ())):
+            await self.send_command(cam_name, "subscribe", topic=topic)
+        # Com o servidor de inferência o modelo já está carregado nele; um worker em espera só
+        # pouparia as importações, ao custo de mais um processo.
+        if server_address is None:
+            await self._refill_pool(profile)
+
+    async def _assign_standby(self, profile, cam_name, command):
+        """ Entrega a câmera a um worker em espera do perfil; False se não havia nenhum disponível """
+        pool = self.standby.get(profile, [])
+        while pool:
+            process = pool.pop(0)
+            if process.returncode is not None:
+                continue
+            self._names[process] = cam_name
+            self._idle.discard(process)
+            self.processes[cam_name] = process
+            try:
+                process.stdin.write(encode_command("assign", argv=command[2:]))
+                await process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError, OSError):
+                self._names[process] = STANDBY_NAME
+                self._idle.add(process)
+                self.processes.pop(cam_name, None)
+                continue
+            return True
+        return False
+
+    async def _refill_pool(self, profile):
+        pool = self.standby.setdefault(profile, [])
+        pool[:] = [process for process in pool if process.returncode is None]
+        while len(pool) < self.settings['worker_pool']['size']:
+            process = await self._spawn(STANDBY_NAME, list(profile), with_stdin=True)
+            self._idle.add(process)
+            pool.append(process)
+
+    async def prewarm(self, configs):
+        """ Deixa workers em espera para os modelos que essas câmeras (configurações) vão usar """
+        if self.settings['worker_pool']['size'] <= 0:
+            return
+        for config in configs:
+            uses_server = config.get('mode') == 'object' or self.settings['inference_server'].get('ocr')
+            server_address = await self.ensure_inference_server() if uses_server else None
+            if server_address is None:
+                command = build_worker_command(STANDBY_NAME, config, server_address, self.settings)
+                await self._refill_pool(tuple(build_standby_command(command)))
+
+    async def _terminate(self, process, timeout=3):
+        if process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    async def stop_camera(self, cam_name, timeout=3):
+        was_restarting = cam_name in self._restarting
+        self._restarting.discard(cam_name)
+        restart_task = self._restart_tasks.pop(cam_name, None)
+        if restart_task is not None:
+            restart_task.cancel()
+        process = self.processes.pop(cam_name, None)
+        if process is None:
+            return
+        if was_restarting and process.returncode is not None:
+            self.on_finished(cam_name)  # _read_output já terminou sem avisar, à espera do reinício.
+            return
+        await self._terminate(process, timeout)
+
+    async def _watchdog_loop(self):
+        watchdog = self.settings['watchdog']
+        while True:
+            await asyncio.sleep(1)
+            now = time.monotonic()
+            for cam_name, process in list(self.processes.items()):
+                health = self.health.get(cam_name)
+                if cam_name in self._restarting or health is None or health["last_heartbeat"] is None:
+                    continue  # Ainda carregando o modelo / abrindo a câmera: sem heartbeat para vigiar.
+                silent = now - health["last_heartbeat"]
+                if silent > watchdog['heartbeat_timeout']:
+                    reason = f"sem heartbeat há {silent:.0f} s"
+                elif health.get("stalled", 0) > watchdog['stall_timeout']:
+                    reason = f"decodificador bloqueado há {health['stalled']:.0f} s"
+                else:
+                    continue
+                self._restarting.add(cam_name)
+                self._restart_tasks[cam_name] = asyncio.ensure_future(self._restart_hung(cam_name, process, reason))
+
+    async def _restart_hung(self, cam_name, process, reason):
+        health = self.health[cam_name]
+        health["restarts"] += 1
+        health["state"] = "restarting"
+        delay = min(2 ** (health["restarts"] - 1), self.settings['watchdog']['restart_max_backoff'])
+        self._dispatch(cam_name, {"type": "error", "timestamp": timestamp(), "camera": cam_name,
+                                  "message": f"Worker travado ({reason}). Reiniciando em {delay:.0f} s "
+                                             f"(reinício nº {health['restarts']})."})
+        self.on_message(cam_name, self._health_message(cam_name))
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+        await asyncio.sleep(delay)
+        # stop_camera durante a espera cancela o reinício.
+        if cam_name in self._restarting and self.processes.get(cam_name) is process:
+            self._restarting.discard(cam_name)
+            self._restart_tasks.pop(cam_name, None)
+            # O worker novo conta do zero; os totais da câmera continuam acumulando.
+            health["reconnects_base"] = health["reconnects"]
+            health["downtime_base"] = health["downtime"]
+            health["last_heartbeat"] = None
+            health["stalled"] = 0
+            try:
+                await self._spawn_worker(cam_name)
+            except (FileNotFoundError, KeyError) as e:
+                del self.processes[cam_name]
+                self.on_output(cam_name, f"Falha ao reiniciar o worker: {e}")
+                self.on_finished(cam_name)
+
+    async def stop_all(self):
+        if self._watchdog_task is not None:
+            self._watchdog_task.cancel()
+            self._watchdog_task = None
+        await asyncio.gather(*(self.stop_camera(cam_name) for cam_name in list(self.processes)))
+        idle = [process for pool in self.standby.values() for process in pool]
+        self.standby.clear()
+        await asyncio.gather(*(self._terminate(process) for process in idle))
+        if self.inference_server is not None and self.inference_server.returncode is None:
+            self.inference_server.terminate()
+            await self.inference_server.wait()
+
+    async def send_command(self, cam_name, command, **fields):
+        if command in ("subscribe", "unsubscribe"):
+            # Vale também para a câmera parada: a inscrição é enviada quando o worker iniciar.
+            topics = self.subscriptions.setdefault(cam_name, set())
+            if command == "subscribe":
+                topics.add(fields.get("topic"))
+            else:
+                topics.discard(fields.get("topic"))
+        process = self.processes.get(cam_name)
+        if process is None or process.stdin is None:
+            return
+        try:
+            process.stdin.write(encode_command(command, **fields))
+            await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass  # O worker já terminou; _read_output cuida do resto.
+
+    async def _read_output(self, name, process):
+        decoder = MessageDecoder(name)
+        while True:
+            data = await process.stdout.read(65536)
+            if not data:
+                break
+            # Um worker em espera muda de nome quando recebe a câmera.
+            name = decoder.cam_name = self._names.get(process, name)
+            for item in decoder.feed(data):
+                if process in self._idle:
+                    # Ainda sem câmera: só texto, para não tocar no estado de uma câmera com o mesmo nome.
+                    self.on_output(name, item.get("message", item) if isinstance(item, dict) else item)
+                else:
+                    self._dispatch(name, item)
+        await process.wait()
+        name = self._names.pop(process, name)
+        if process in self._idle:
+            self._idle.discard(process)
+            for pool in self.standby.values():
+                if process in pool:
+                    pool.remove(process)  # Não é reposto aqui, para um erro ao carregar não virar um laço.
+            return
+        # Em um reinício, a câmera pode já ter um processo novo (ou estar à espera de um);
+        # nesse caso ela continua ativa e não há o que avisar.
+        current = self.processes.get(name)
+        if current is process:
+            if name in self._restarting:
+                return
+            del self.processes[name]
+        elif current is not None:
+            return
+        self.on_finished(name)
+
+    async def _read_errors(self, name, process):
+        """ stderr fica fora do canal binário: avisos do FFmpeg/OpenCV e tracebacks chegam só como texto """
+        while True:
+            try:
+                line = await process.stderr.readline()
+            except ValueError:
+                continue  # Linha maior que o limite do StreamReader; o trecho é descartado.
+            if not line:
+                break
+            text = line.decode('utf-8', errors='replace').rstrip('\r\n')
+            if text:
+                self.on_output(self._names.get(process, name), text)
+
+    def _dispatch(self, name, item):
+        if not isinstance(item, dict):
+            self.on_output(name, item)
+            return
+        msg_type = item.get("type")
+        if msg_type in ("alert", "detection") and item.get("capture_ts") and name in self.latency:
+            latency_ms = (time.monotonic() - item["capture_ts"]) * 1000
+            self.latency[name][msg_type].add(latency_ms)
+            if msg_type == "alert":
+                item["latency_ms"] = round(latency_ms, 1)
+        if msg_type in ("alert", "error") and self.event_store is not None:
+            self.event_store.add(item)
+        elif msg_type == "heartbeat" and name in self.health:
+            health = self.health[name]
+            health["state"] = item.get("state", health["state"])
+            health["stalled"] = item.get("stalled", 0)
+            health["reconnects"] = health.get("reconnects_base", 0) + item.get("reconnects", 0)
+            health["downtime"] = health.get("downtime_base", 0.0) + item.get("downtime", 0.0)
+            health["last_heartbeat"] = time.monotonic()
+            item = self._health_message(name)
+        elif msg_type == "stats":
+            if name in self.latency:
+                item["latency"] = {kind: histogram.summary() for kind, histogram in self.latency[name].items()}
+            if self.stats_log is not None:
+                self.stats_log.info(json.dumps({"timestamp": timestamp(), **item}, ensure_ascii=False))
+        self.on_message(name, item)
+
+    def _health_message(self, cam_name):
+        health = self.health[cam_name]
+        return {"type": "heartbeat", "camera": cam_name,
+                **{key: health[key] for key in ("state", "reconnects", "downtime", "restarts")}}
+
+
+def _print_event(cam_name, data):
+    if data.get("type") in ("alert", "error"):
+        print(f"{data.get('timestamp', '')}  [{data['type']}]  {data.get('camera', cam_name)}: "
+              f"{data.get('message', '')}", flush=True)
+
+
+async def run_headless(config_path, camera_names=None):
+    settings = load_settings()
+    store_settings = settings['event_store']
+    event_store = EventStore(store_settings['path'], store_settings['batch_size'],
+                             store_settings['flush_interval_ms'] / 1000)
+    cameras = load_camera_configs(config_path)
+    if camera_names:
+        cameras = {name: cfg for name, cfg in cameras.items() if name in camera_names}
+    if not cameras:
+        print(f"Nenhuma câmera para iniciar em '{config_path}'.")
+        event_store.close()
+        return
+
+    finished = asyncio.Event()
+    supervisor = CameraSupervisor(settings, event_store, on_message=_print_event,
+                                  on_finished=lambda name: None if supervisor.processes else finished.set())
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, finished.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C chega como KeyboardInterrupt.
+
+    for cam_name, config in cameras.items():
+        try:
+            await supervisor.start_camera(cam_name, config)
+            print(f"Câmera '{cam_name}' iniciada.", flush=True)
+        except (FileNotFoundError, KeyError) as e:
+            print(f"Falha ao iniciar a câmera '{cam_name}': {e}", flush=True)
+
+    try:
+        await finished.wait()
+    finally:
+        print("Encerrando os workers...", flush=True)
+        await supervisor.stop_all()
+        event_store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Supervisor das câmeras sem interface gráfica")
+    parser.add_argument("--config", default=CONFIG_FILE)
+    parser.add_argument("--cameras", help="Nomes das câmeras a iniciar, separados por vírgula (padrão: todas)")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.cameras.split(',')] if args.cameras else None
+    try:
+        asyncio.run(run_headless(args.config, names))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,85 @@
+""" Testes do leitor rápido de displays de sete segmentos """
+import numpy as np
+import pytest
+
+from digit_recognizer import DigitRecognizer, SEGMENT_DIGITS, TemperatureReader
+
+DIGIT_W, DIGIT_H, STROKE, GAP = 20, 40, 4, 8
+# Retângulos (x0, x1, y0, y1) dos segmentos a..g na caixa do dígito.
+SEGMENT_RECTS = (
+    (2, 18, 0, 4), (16, 20, 2, 20), (16, 20, 20, 38), (2, 18, 36, 40),
+    (0, 4, 20, 38), (0, 4, 2, 20), (2, 18, 18, 22),
+)
+SEGMENTS = {digit: states for states, digit in reversed(list(SEGMENT_DIGITS.items()))}
+
+
+def display(text, background=20, ink=230):
+    """ ROI sintética com 'text' (dígitos e '.' ou ',') desenhado em sete segmentos """
+    gray = np.full((DIGIT_H + 20, 10 + len(text) * (DIGIT_W + GAP)), background, dtype=np.uint8)
+    x, y = 10, 10
+    for char in text:
+        if char in '.,':
+            gray[y + DIGIT_H - STROKE:y + DIGIT_H, x:x + STROKE] = ink
+            x += STROKE + GAP
+            continue
+        for on, (x0, x1, y0, y1) in zip(SEGMENTS[char], SEGMENT_RECTS):
+            if on:
+                gray[y + y0:y + y1, x + x0:x + x1] = ink
+        x += DIGIT_W + GAP
+    return gray
+
+
+def test_segment_decode_reads_every_digit():
+    text, confidence = DigitRecognizer().recognize(display("0123456789"))
+    assert text == "0123456789"
+    assert confidence > 0.5
+
+
+def test_decimal_separator_and_dark_digits():
+    assert DigitRecognizer().recognize(display("23.5"))[0] == "23.5"
+    # Dígitos escuros em fundo claro: a binarização inverte a imagem.
+    assert DigitRecognizer().recognize(display("18,0", background=230, ink=20))[0] == "18.0"
+
+
+def test_empty_roi_has_no_confidence():
+    assert DigitRecognizer().recognize(np.full((40, 80), 50, dtype=np.uint8)) == ('', 0.0)
+
+
+def test_calibrated_templates_are_used():
+    recognizer = DigitRecognizer().calibrate([(display("0123456789"), "0123456789")])
+    assert sorted(recognizer.templates) == list("0123456789")
+    text, confidence = recognizer.recognize(display("47.9"))
+    assert text == "47.9"
+    assert confidence > 0.5
+
+
+def test_calibrate_rejects_digit_count_mismatch():
+    with pytest.raises(ValueError):
+        DigitRecognizer().calibrate([(display("23.5"), "23,56")])
+
+
+def test_templates_survive_save_and_load(tmp_path):
+    path = tmp_path / "templates.npz"
+    DigitRecognizer().calibrate([(display("0123456789"), "0123456789")]).save(path)
+    loaded = DigitRecognizer.load(path)
+    assert sorted(loaded.templates) == list("0123456789")
+    assert loaded.recognize(display("31.2"))[0] == "31.2"
+
+
+def test_temperature_reader_falls_back_or_rejects():
+    fallback_calls = []
+
+    def fallback(gray):
+        fallback_calls.append(gray)
+        return ["lido pelo fallback"]
+
+    reader = TemperatureReader(DigitRecognizer(), fallback=fallback)
+    assert reader(display("23.5")) == ["23.5"]
+    # Sem casa decimal o texto não tem formato de temperatura: vai para o fallback.
+    assert reader(display("235")) == ["lido pelo fallback"]
+    assert len(fallback_calls) == 1
+
+    strict = TemperatureReader(DigitRecognizer(), min_confidence=1.1)
+    assert strict(display("23.5")) == []
+    assert reader.summary() == {"fast": 1, "fallback": 1, "rejected": 0}
+    assert strict.summary() == {"fast": 0, "fallback": 0, "rejected": 1}
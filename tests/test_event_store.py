@@ -0,0 +1,109 @@
+""" Testes da gravação e paginação do EventStore """
+import threading
+from datetime import datetime, timedelta
+
+from event_store import EventStore
+
+
+def make_event(i, camera="cam1", event_type="alert", when=None):
+    when = when or datetime(2025, 1, 1, 12, 0, 0) + timedelta(seconds=i)
+    return {"type": event_type, "timestamp": when.strftime("%Y-%m-%d %H:%M:%S"), "camera": camera,
+            "message": f"evento {i}"}
+
+
+def filled_store(path, count=25, **kwargs):
+    store = EventStore(str(path), **kwargs)
+    for i in range(count):
+        store.add(make_event(i, camera=f"cam{i % 2}", event_type="error" if i % 5 == 0 else "alert"))
+    store.close()  # Garante que a fila foi gravada.
+    return store
+
+
+def test_ids_follow_arrival_order(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"))
+    for i in range(3):
+        store.add(make_event(i))
+    store.close()
+    assert [(event["id"], event["message"]) for event in store.query()] == \
+        [(3, "evento 2"), (2, "evento 1"), (1, "evento 0")]
+
+
+def test_query_pages_with_before_id(tmp_path):
+    store = filled_store(tmp_path / "events.db", batch_size=7)
+    pages, before_id = [], None
+    while True:
+        page = store.query(before_id=before_id, limit=10)
+        if not page:
+            break
+        pages.append([event["id"] for event in page])
+        before_id = page[-1]["id"]
+    assert pages == [list(range(25, 15, -1)), list(range(15, 5, -1)), list(range(5, 0, -1))]
+
+
+def test_query_filters(tmp_path):
+    store = filled_store(tmp_path / "events.db")
+    assert {event["camera"] for event in store.query(camera="cam1")} == {"cam1"}
+    errors = store.query(event_type="error")
+    assert [event["message"] for event in errors] == ["evento 20", "evento 15", "evento 10", "evento 5", "evento 0"]
+    since = datetime(2025, 1, 1, 12, 0, 20).timestamp()
+    assert [event["id"] for event in store.query(since=since)] == [25, 24, 23, 22, 21]
+    until = datetime(2025, 1, 1, 12, 0, 2).timestamp()
+    assert [event["id"] for event in store.query(until=until)] == [2, 1]
+
+
+def test_load_older_returns_oldest_first(tmp_path):
+    store = filled_store(tmp_path / "events.db")
+    older = store.load_older({"id": 11}, 4)
+    assert [event["id"] for event in older] == [7, 8, 9, 10]
+    # Sem evento de referência, começa pelo mais novo gravado.
+    assert [event["id"] for event in store.load_older(None, 3)] == [23, 24, 25]
+    assert store.load_older({"id": 1}, 10) == []
+
+
+def test_load_older_finds_live_event_without_id(tmp_path):
+    store = filled_store(tmp_path / "events.db")
+    # A cópia exibida no log (evento 10, gravado com id 11) chega à interface sem o id.
+    live_copy = make_event(10, camera="cam0", event_type="error")
+    assert [event["id"] for event in store.load_older(live_copy, 4)] == [7, 8, 9, 10]
+    assert store.load_older(make_event(500), 4) == []  # Ainda não gravado.
+
+
+def test_two_writers_keep_each_others_events(tmp_path):
+    path = str(tmp_path / "events.db")
+    stores = [EventStore(path, batch_size=5, flush_interval=0.01) for _ in range(2)]
+
+    def produce(store, camera):
+        for i in range(50):
+            store.add(make_event(i, camera=camera))
+
+    threads = [threading.Thread(target=produce, args=(store, f"cam{n}")) for n, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for store in stores:
+        store.close()
+    events = stores[0].query(limit=1000)
+    assert len(events) == 100
+    assert sorted(event["id"] for event in events) == list(range(1, 101))
+    for camera in ("cam0", "cam1"):
+        assert sorted(event["message"] for event in events if event["camera"] == camera) == \
+            sorted(f"evento {i}" for i in range(50))
+
+
+def test_extra_fields_round_trip(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"))
+    store.add({**make_event(0), "clip": "/clips/cam.avi", "latency_ms": 12.5})
+    store.close()
+    event = store.query()[0]
+    assert event["clip"] == "/clips/cam.avi"
+    assert event["latency_ms"] == 12.5
+    assert event["message"] == "evento 0"
+
+
+def test_reopen_continues_numbering(tmp_path):
+    filled_store(tmp_path / "events.db", count=3)
+    store = EventStore(str(tmp_path / "events.db"))
+    store.add(make_event(99))
+    store.close()
+    assert [event["id"] for event in store.query()] == [4, 3, 2, 1]
@@ -0,0 +1,65 @@
+""" Testes do frame bus: quadros só são publicados com um leitor inscrito """
+import threading
+import uuid
+
+import numpy as np
+import pytest
+
+import detector_worker
+from frame_bus import FrameBusReader, FramePublisher
+
+
+@pytest.fixture
+def cam_name():
+    return f"teste-{uuid.uuid4().hex[:8]}"
+
+
+def frame(value):
+    return np.full((24, 32, 3), value, dtype=np.uint8)
+
+
+def test_publisher_without_readers_flag_always_publishes(cam_name):
+    publisher = FramePublisher(cam_name)
+    publisher.publish(frame(1), 10.0, 1)
+    reader = FrameBusReader.attach(cam_name)
+    try:
+        seq, capture_ts, image = reader.read()
+        assert (seq, capture_ts, int(image[0, 0, 0])) == (1, 10.0, 1)
+    finally:
+        reader.close()
+        publisher.close()
+
+
+def test_frames_are_copied_only_while_subscribed(cam_name):
+    readers = threading.Event()
+    publisher = FramePublisher(cam_name, readers=readers)
+    try:
+        publisher.publish(frame(1), 1.0, 1)
+        assert FrameBusReader.attach(cam_name) is None  # Nenhum leitor: nem o segmento é criado.
+
+        readers.set()
+        publisher.publish(frame(2), 2.0, 2)
+        reader = FrameBusReader.attach(cam_name)
+        assert reader.read()[0] == 2
+
+        readers.clear()
+        publisher.publish(frame(3), 3.0, 3)
+        assert reader.read() is None  # Sem inscritos o quadro não é copiado.
+        readers.set()
+        publisher.publish(frame(4), 4.0, 4)
+        seq, _, image = reader.read()
+        assert (seq, int(image[0, 0, 0])) == (4, 4)
+        reader.close()
+    finally:
+        publisher.close()
+
+
+def test_worker_subscription_topics(monkeypatch):
+    monkeypatch.setattr(detector_worker, "frame_readers", threading.Event())
+    monkeypatch.setattr(detector_worker.detection_channel, "subscribed", False)
+    detector_worker.set_subscription({"command": "subscribe", "topic": "frames"}, True)
+    assert detector_worker.frame_readers.is_set() and not detector_worker.detection_channel.subscribed
+    detector_worker.set_subscription({"command": "subscribe", "topic": "detections"}, True)
+    assert detector_worker.detection_channel.subscribed
+    detector_worker.set_subscription({"command": "unsubscribe", "topic": "frames"}, False)
+    assert not detector_worker.frame_readers.is_set() and detector_worker.detection_channel.subscribed
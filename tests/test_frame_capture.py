@@ -0,0 +1,131 @@
+""" Testes da captura que mantém só o quadro mais recente """
+import threading
+import time
+
+import numpy as np
+
+from frame_capture import LatestFrameCapture
+
+
+class FakeSource:
+    """ cv2.VideoCapture falso: entrega 'count' quadros (o valor do pixel é o número do quadro) """
+
+    def __init__(self, count, opened=True, start=1, gate=None, hold=None):
+        self.frames = list(range(start, start + count))
+        self.opened = opened
+        self.gate = gate  # threading.Event opcional que segura read() (decodificador travado)
+        self.hold = hold  # threading.Event opcional que segura read() depois do último quadro
+        self.released = False
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        if self.gate is not None:
+            self.gate.wait()
+        if not self.frames:
+            if self.hold is not None:
+                self.hold.wait()
+            return False, None
+        return True, np.full((4, 4, 3), self.frames.pop(0), dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+class RecordingStop(threading.Event):
+    """ _stop_signal que registra as esperas entre tentativas de reconexão sem esperar de fato """
+
+    def __init__(self):
+        super().__init__()
+        self.delays = []
+
+    def wait(self, timeout=None):
+        if timeout is None:
+            return super().wait()
+        self.delays.append(timeout)
+        return self.is_set()
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condição não atingida"
+        time.sleep(0.01)
+
+
+def test_read_returns_only_the_newest_frame():
+    published = []
+
+    class Publisher:
+        def publish(self, frame, capture_ts, seq):
+            published.append(seq)
+
+        def close(self):
+            pass
+
+    capture = LatestFrameCapture(FakeSource(5), publisher=Publisher())
+    capture.start()
+    wait_until(lambda: capture.failed)  # Fonte esgotada sem 'reopen': a captura termina.
+    ret, frame = capture.read()
+    assert ret and int(frame[0, 0, 0]) == 5
+    assert (capture.frame_seq, capture.frames_read, capture.frames_dropped) == (5, 5, 4)
+    assert capture.drop_ratio() == 0.8
+    # O frame bus recebe todos os quadros, inclusive os que a inferência pulou.
+    assert published == [1, 2, 3, 4, 5]
+    assert capture.read() == (False, None)
+    capture.release()
+
+
+def test_read_waits_for_a_new_frame():
+    gate = threading.Event()
+    capture = LatestFrameCapture(FakeSource(1, gate=gate)).start()
+    result = []
+    reader = threading.Thread(target=lambda: result.append(capture.read()))
+    reader.start()
+    time.sleep(0.05)
+    assert not result  # Nenhum quadro ainda: read() bloqueia.
+    gate.set()
+    reader.join(timeout=2)
+    assert result[0][0] and capture.frame_seq == 1
+    capture.release()
+
+
+def test_reconnect_uses_exponential_backoff():
+    events, hold = [], threading.Event()
+    attempts = iter([FakeSource(0, opened=False) for _ in range(4)] + [FakeSource(2, start=10, hold=hold)])
+    capture = LatestFrameCapture(FakeSource(1), reopen=lambda: next(attempts), max_backoff=5.0,
+                                 on_lost=lambda: events.append("lost"),
+                                 on_restored=lambda downtime, tries: events.append(("restored", tries)))
+    capture._stop_signal = RecordingStop()
+    capture.start()
+    wait_until(lambda: capture.reconnects == 1 and capture._latest[0] == 3)
+    assert capture._stop_signal.delays == [1.0, 2.0, 4.0, 5.0, 5.0]
+    assert events == ["lost", ("restored", 5)]
+    assert not capture.reconnecting
+    # Os quadros da conexão nova continuam a numeração.
+    ret, frame = capture.read()
+    assert ret and int(frame[0, 0, 0]) == 11 and capture.frame_seq == 3
+    capture._stop_signal.set()
+    hold.set()
+    capture.release()
+
+
+def test_stalled_decoder_is_reported():
+    gate = threading.Event()
+    capture = LatestFrameCapture(FakeSource(1, gate=gate)).start()
+    time.sleep(0.15)
+    assert capture.stalled_for() >= 0.1
+    gate.set()
+    capture.read()
+    wait_until(lambda: capture.stalled_for() == 0.0 or capture.failed)
+    assert capture.stalled_for() == 0.0
+    capture.release()
+
+
+def test_release_unblocks_read():
+    gate = threading.Event()
+    capture = LatestFrameCapture(FakeSource(0, gate=gate)).start()
+    capture.release()
+    gate.set()
+    assert capture.read() == (False, None)
@@ -0,0 +1,72 @@
+""" Testes do pré-filtro de movimento com quadros sintéticos """
+import numpy as np
+
+from motion_gate import MotionGate
+
+
+def frame(value=0, shape=(120, 160)):
+    return np.full(shape + (3,), value, dtype=np.uint8)
+
+
+def with_square(value, size, base=0):
+    image = frame(base)
+    image[10:10 + size, 10:10 + size] = value
+    return image
+
+
+def test_first_frame_is_inferred():
+    gate = MotionGate()
+    assert gate.should_infer(frame(), now=0.0)
+
+
+def test_identical_frame_is_skipped():
+    gate = MotionGate()
+    gate.should_infer(frame(), now=0.0)
+    assert not gate.should_infer(frame(), now=1.0)
+    assert (gate.frames_seen, gate.frames_skipped) == (2, 1)
+
+
+def test_large_change_is_inferred():
+    gate = MotionGate()
+    gate.should_infer(frame(), now=0.0)
+    assert gate.should_infer(with_square(255, 40), now=1.0)
+
+
+def test_small_noise_is_skipped():
+    gate = MotionGate()
+    gate.should_infer(frame(100), now=0.0)
+    # Variação abaixo de 'pixel_delta' em toda a imagem não conta como movimento.
+    assert not gate.should_infer(frame(110), now=1.0)
+    # Uma mancha minúscula fica abaixo de 'threshold'.
+    assert not gate.should_infer(with_square(255, 2, base=100), now=2.0)
+
+
+def test_heartbeat_forces_inference():
+    gate = MotionGate(heartbeat=5.0)
+    gate.should_infer(frame(), now=0.0)
+    assert not gate.should_infer(frame(), now=4.9)
+    assert gate.should_infer(frame(), now=5.0)
+    assert not gate.should_infer(frame(), now=6.0)
+
+
+def test_slow_drift_is_compared_with_last_inference():
+    gate = MotionGate(heartbeat=1000)
+    gate.should_infer(frame(100), now=0.0)
+    # Cada passo é pequeno em relação ao quadro anterior, mas a referência é o
+    # quadro da última inferência: a diferença acumula e acaba disparando o modelo.
+    results = [gate.should_infer(frame(100 + 10 * step), now=step) for step in range(1, 5)]
+    assert results == [False, False, True, False]
+
+
+def test_shape_change_is_inferred():
+    gate = MotionGate()
+    gate.should_infer(frame(), now=0.0)
+    assert gate.should_infer(frame(shape=(60, 80)), now=1.0)
+
+
+def test_skip_ratio():
+    gate = MotionGate()
+    assert gate.skip_ratio() == 0.0
+    for now in range(4):
+        gate.should_infer(frame(), now=float(now))
+    assert gate.skip_ratio() == 0.75
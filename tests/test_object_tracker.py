@@ -0,0 +1,85 @@
+""" Testes do rastreador por IoU e da regra de permanência """
+import numpy as np
+
+from alert_rules import DwellRule
+from object_tracker import IoUTracker, iou_matrix
+
+
+def det(x, y, size=20, cls=0, conf=0.9):
+    return [x, y, x + size, y + size, conf, cls]
+
+
+def test_iou_matrix():
+    a = np.array([[0, 0, 10, 10], [100, 100, 110, 110]], dtype=np.float64)
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [0, 0, 0, 0]], dtype=np.float64)
+    overlap = iou_matrix(a, b)
+    assert overlap.shape == (2, 3)
+    assert np.allclose(overlap[0], [1.0, 50 / 150, 0.0])
+    assert np.allclose(overlap[1], 0.0)
+
+
+def test_track_is_confirmed_after_min_hits():
+    tracker = IoUTracker(min_hits=2)
+    assert tracker.update([det(0, 0)], 0.0) == []
+    confirmed = tracker.update([det(2, 0)], 0.1)
+    assert [track.track_id for track in confirmed] == [1]
+
+
+def test_different_class_does_not_match():
+    tracker = IoUTracker(min_hits=1)
+    tracker.update([det(0, 0, cls=0)], 0.0)
+    tracker.update([det(0, 0, cls=2)], 0.1)
+    assert sorted((track.track_id, track.cls) for track in tracker.tracks) == [(1, 0), (2, 2)]
+
+
+def test_predict_propagates_with_velocity():
+    tracker = IoUTracker(min_hits=1)
+    tracker.update([det(0, 0)], 0.0)
+    tracker.update([det(10, 0)], 1.0)  # 10 px/s, suavizado pela média móvel: 5 px/s
+    [track] = tracker.predict(1.5)
+    assert np.allclose(track.detection(1.5)[:4], [12.5, 0, 32.5, 20])
+    # A trilha prevista continua associável a uma detecção que andou mais rápido que a média.
+    [track] = tracker.update([det(14, 0)], 1.5)
+    assert track.track_id == 1 and track.hits == 3
+
+
+def test_track_expires_after_max_age_and_min_misses():
+    tracker = IoUTracker(max_age=1.0, min_hits=1, min_misses=2)
+    tracker.update([det(0, 0)], 0.0)
+    # Sem inferência (quadros entre quadros-chave) a trilha sobrevive além de max_age.
+    assert len(tracker.predict(5.0)) == 1
+    tracker.update([], 5.0)
+    assert len(tracker.tracks) == 1  # Uma inferência sem a trilha ainda não basta.
+    tracker.update([], 5.5)
+    assert tracker.tracks == []
+
+
+def test_recent_track_survives_misses():
+    tracker = IoUTracker(max_age=1.0, min_hits=1, min_misses=2)
+    tracker.update([det(0, 0)], 0.0)
+    tracker.update([], 0.3)
+    tracker.update([], 0.6)
+    assert len(tracker.tracks) == 1
+    [track] = tracker.update([det(0, 0)], 0.9)
+    assert track.track_id == 1 and track.misses == 0
+
+
+def test_dwell_rule_alerts_once_per_track():
+    tracker = IoUTracker(min_hits=1)
+    rule = DwellRule(dwell_time=5.0, class_names={0: "Pessoa"})
+    assert rule.update(tracker.update([det(0, 0)], 0.0), 0.0) is None
+    assert rule.update(tracker.update([det(0, 0)], 4.0), 4.0) is None
+    message = rule.update(tracker.update([det(0, 0), det(200, 200, cls=5)], 5.0), 5.0)
+    assert message == "Permanência acima de 5 s: Pessoa #1"
+    assert rule.update(tracker.update([det(0, 0), det(200, 200, cls=5)], 6.0), 6.0) is None
+    message = rule.update(tracker.update([det(0, 0), det(200, 200, cls=5)], 10.0), 10.0)
+    assert message == "Permanência acima de 5 s: Objeto #2"
+
+
+def test_dwell_rule_forgets_expired_tracks():
+    rule = DwellRule(dwell_time=1.0, class_names={})
+    tracker = IoUTracker(min_hits=1, max_age=0.5, min_misses=1)
+    tracker.update([det(0, 0)], 0.0)
+    assert rule.update(tracker.update([det(0, 0)], 1.0), 1.0) is not None
+    assert rule.update(tracker.update([], 2.0), 2.0) is None
+    assert rule.alerted == set()
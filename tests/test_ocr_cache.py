@@ -0,0 +1,72 @@
+""" Testes do cache de leituras do OCR """
+import numpy as np
+
+import ocr_cache
+from ocr_cache import OcrCache
+
+
+def display(value):
+    """ ROI sintética em cinza: um bloco claro cuja posição depende de 'value' """
+    gray = np.full((40, 80), 30, dtype=np.uint8)
+    gray[8:32, 5 + value * 7:15 + value * 7] = 220
+    return gray
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts):
+        def compute():
+            self.calls += 1
+            return texts
+        return compute
+
+
+def test_same_roi_is_read_once():
+    cache, compute = OcrCache(), Counter()
+    assert cache.read(display(1), compute(["23,5"])) == ["23,5"]
+    assert cache.read(display(1), compute(["errado"])) == ["23,5"]
+    assert compute.calls == 1
+    assert cache.summary() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+
+def test_sensor_noise_within_tolerance_hits():
+    cache, compute = OcrCache(tolerance=12), Counter()
+    cache.read(display(1), compute(["23,5"]))
+    noise = np.random.default_rng(0).integers(-5, 6, size=(40, 80))
+    noisy = np.clip(display(1).astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    assert cache.read(noisy, compute(["outro"])) == ["23,5"]
+    assert compute.calls == 1
+
+
+def test_changed_display_is_read_again():
+    cache, compute = OcrCache(), Counter()
+    cache.read(display(1), compute(["23,5"]))
+    assert cache.read(display(4), compute(["24,1"])) == ["24,1"]
+    # A leitura anterior continua no cache: o display voltou ao valor antigo.
+    assert cache.read(display(1), compute(["errado"])) == ["23,5"]
+    assert compute.calls == 2
+
+
+def test_entries_expire_after_max_age(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ocr_cache.time, "monotonic", lambda: now[0])
+    cache, compute = OcrCache(max_age=60.0), Counter()
+    cache.read(display(1), compute(["23,5"]))
+    now[0] += 59.0
+    assert cache.read(display(1), compute(["23,6"])) == ["23,5"]
+    now[0] += 2.0
+    assert cache.read(display(1), compute(["23,6"])) == ["23,6"]
+    assert cache.summary()["entries"] == 1  # A entrada expirada foi removida.
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache, compute = OcrCache(max_entries=2), Counter()
+    cache.read(display(0), compute(["0"]))
+    cache.read(display(1), compute(["1"]))
+    cache.read(display(0), compute(["x"]))  # Hit: display(0) passa a ser o mais recente.
+    cache.read(display(2), compute(["2"]))  # Remove display(1).
+    assert cache.read(display(0), compute(["x"])) == ["0"]
+    assert cache.read(display(1), compute(["1 de novo"])) == ["1 de novo"]
+    assert compute.calls == 4
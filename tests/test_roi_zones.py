@@ -0,0 +1,64 @@
+""" Testes das zonas: letterbox e detecção em lote das ROIs """
+import numpy as np
+import pytest
+
+from roi_zones import LETTERBOX_COLOR, detect_zones, letterbox, unletterbox
+
+
+def frame(height=240, width=320):
+    return np.zeros((height, width, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("shape", [(100, 300), (300, 100), (640, 640), (50, 60)])
+def test_letterbox_round_trip(shape):
+    height, width = shape
+    image, scale, (pad_x, pad_y) = letterbox(frame(height, width), 320)
+    assert image.shape == (320, 320, 3)
+    # A borda é só de um lado do eixo mais curto e tem a cor de preenchimento do YOLO.
+    if pad_x:
+        assert (image[:, 0] == LETTERBOX_COLOR).all()
+    if pad_y:
+        assert (image[0] == LETTERBOX_COLOR).all()
+    box = [0.1 * width, 0.2 * height, 0.6 * width, 0.9 * height]
+    boxed = [box[0] * scale + pad_x, box[1] * scale + pad_y, box[2] * scale + pad_x, box[3] * scale + pad_y,
+             0.8, 3]
+    [restored] = unletterbox([boxed], scale, (pad_x, pad_y), width, height)
+    assert np.allclose(restored[:4], box, atol=1.0)
+    assert restored[4:] == [0.8, 3]
+
+
+def test_unletterbox_clips_to_crop():
+    _, scale, pad = letterbox(frame(100, 200), 200)
+    [restored] = unletterbox([[-20, -20, 500, 500, 0.5, 0]], scale, pad, 200, 100)
+    assert restored[:4] == [0, 0, 200, 100]
+
+
+def test_single_roi_goes_straight_to_the_model():
+    calls = []
+
+    def detect_batch(images):
+        calls.append([image.shape for image in images])
+        return [[[1, 2, 3, 4, 0.9, 0]] for _ in images]
+
+    result = detect_zones(detect_batch, [frame(), frame()], [[10, 110, 20, 220]], 640)
+    assert calls == [[(100, 200, 3), (100, 200, 3)]]
+    assert result == [[[[1, 2, 3, 4, 0.9, 0]]], [[[1, 2, 3, 4, 0.9, 0]]]]
+
+
+def test_multiple_rois_share_one_letterboxed_batch():
+    calls = []
+
+    def detect_batch(images):
+        calls.append([image.shape for image in images])
+        # Uma caixa cobrindo a imagem inteira de cada recorte.
+        return [[[0, 0, image.shape[1], image.shape[0], 0.9, index]] for index, image in enumerate(images)]
+
+    rois = [[0, 100, 0, 200], None, [50, 90, 100, 300]]
+    result = detect_zones(detect_batch, [frame(), frame()], rois, 160)
+    assert calls == [[(160, 160, 3)] * 6]
+    assert len(result) == 2 and all(len(per_frame) == 3 for per_frame in result)
+    # A caixa da imagem de letterbox inteira volta como o recorte inteiro, em coordenadas do recorte.
+    for per_frame in result:
+        for (y1, y2, x1, x2), [box] in zip([[0, 100, 0, 200], [0, 240, 0, 320], [50, 90, 100, 300]], per_frame):
+            assert np.allclose(box[:4], [0, 0, x2 - x1, y2 - y1])
+    assert [zone[0][5] for zone in result[1]] == [3, 4, 5]
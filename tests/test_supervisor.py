@@ -0,0 +1,96 @@
+""" Testes do supervisor com um worker falso que ecoa os comandos recebidos no stdin """
+import asyncio
+import sys
+
+import pytest
+
+import supervisor
+from app_settings import load_settings
+from supervisor import CameraSupervisor
+
+FAKE_WORKER = "import sys\nfor line in sys.stdin:\n    print('comando ' + line.strip(), flush=True)\n"
+
+
+@pytest.fixture
+def harness(monkeypatch):
+    monkeypatch.setattr(supervisor, "build_worker_command",
+                        lambda cam_name, *args, **kwargs: [sys.executable, '-c', FAKE_WORKER, cam_name])
+    settings = load_settings()
+    settings['stats']['path'] = ''
+    settings['watchdog']['restart_max_backoff'] = 0
+    output = []
+    sup = CameraSupervisor(settings, on_output=lambda cam_name, text: output.append((cam_name, text)))
+    return sup, output
+
+
+async def received(output, cam_name, count, timeout=5):
+    """ Espera o worker da câmera ecoar 'count' comandos de inscrição """
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        commands = [text for name, text in output if name == cam_name and '"subscribe"' in text]
+        if len(commands) >= count or asyncio.get_running_loop().time() > deadline:
+            return commands
+        await asyncio.sleep(0.05)
+
+
+def test_subscription_is_replayed_after_watchdog_restart(harness):
+    sup, output = harness
+
+    async def scenario():
+        await sup.start_camera("Cam", {"url": "", "mode": "object"})
+        await sup.send_command("Cam", "subscribe", topic="detections")
+        assert len(await received(output, "Cam", 1)) == 1
+
+        # Reinício pelo watchdog: o worker novo precisa receber a inscrição de novo.
+        process = sup.processes["Cam"]
+        sup._restarting.add("Cam")
+        await sup._restart_hung("Cam", process, "teste")
+        assert sup.processes["Cam"] is not process
+        assert len(await received(output, "Cam", 2)) == 2
+        await sup.stop_all()
+
+    asyncio.run(scenario())
+
+
+def test_subscription_before_start_and_unsubscribe(harness):
+    sup, output = harness
+
+    async def scenario():
+        # A Live View pode ser aberta com a câmera parada.
+        await sup.send_command("Cam", "subscribe", topic="detections")
+        await sup.start_camera("Cam", {"url": "", "mode": "object"})
+        assert len(await received(output, "Cam", 1)) == 1
+        await sup.send_command("Cam", "unsubscribe", topic="detections")
+        await sup.stop_camera("Cam")
+
+        await sup.start_camera("Cam", {"url": "", "mode": "object"})
+        await asyncio.sleep(0.5)
+        assert len(await received(output, "Cam", 2, timeout=0)) == 1
+        await sup.stop_all()
+
+    asyncio.run(scenario())
+
+
+def test_camera_named_like_the_standby_worker(harness, monkeypatch):
+    sup, output = harness
+    monkeypatch.setattr(supervisor, "build_standby_command",
+                        lambda command: [sys.executable, '-c', FAKE_WORKER, 'espera'])
+    sup.settings['worker_pool']['size'] = 1
+    finished = []
+    sup.on_finished = finished.append
+
+    async def scenario():
+        # O nome de exibição do worker em espera não pode confundir uma câmera real com o pool.
+        await sup.start_camera(supervisor.STANDBY_NAME, {"url": "", "mode": "object"})
+        process = sup.processes[supervisor.STANDBY_NAME]
+        assert sum(len(pool) for pool in sup.standby.values()) == 1
+        process.kill()
+        deadline = asyncio.get_running_loop().time() + 5
+        while not finished and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.05)
+        assert finished == [supervisor.STANDBY_NAME]
+        assert not sup.is_running(supervisor.STANDBY_NAME)
+        assert sum(len(pool) for pool in sup.standby.values()) == 1
+        await sup.stop_all()
+
+    asyncio.run(scenario())
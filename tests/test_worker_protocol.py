@@ -0,0 +1,88 @@
+""" Testes do decodificador do canal worker -> controlador (python -m pytest tests) """
+import json
+
+from worker_protocol import (BOX, DETECTION_HEADER, FRAME_HEADER, MAGIC, MAX_FRAME_SIZE, MSG_ALERT, MSG_DETECTION,
+                             MessageDecoder, encode_detections)
+
+
+def frame(msg_type, payload):
+    return MAGIC + FRAME_HEADER.pack(msg_type, len(payload)) + payload
+
+
+def alert(message):
+    return frame(MSG_ALERT, json.dumps({"type": "alert", "camera": "cam", "message": message}).encode('utf-8'))
+
+
+def feed_all(data, chunk=None):
+    decoder = MessageDecoder("cam")
+    chunk = chunk or len(data)
+    items = []
+    for i in range(0, len(data), chunk):
+        items.extend(decoder.feed(data[i:i + chunk]))
+    return items, decoder
+
+
+def test_messages_and_text_in_order():
+    detections = [[10, 20, 30, 40, 0.9, 0]]
+    data = b"iniciando\n" + alert("a") + frame(MSG_DETECTION, encode_detections(detections, (1, 2, 3, 4))) + b"fim\n"
+    for chunk in (None, 1, 3):
+        items, decoder = feed_all(data, chunk)
+        assert items[0] == "iniciando"
+        assert items[1]["message"] == "a"
+        assert items[2]["detections"] == [[10.0, 20.0, 30.0, 40.0, 0.8999999761581421, 0.0]]
+        assert items[2]["roi"] == [1, 2, 3, 4]
+        assert items[3] == "fim"
+        assert not decoder.buffer
+
+
+def test_magic_inside_text_line():
+    # "å" em UTF-8 é C3 A5: "åZ" contém MAGIC.
+    data = "câmera åZ perdida\n".encode('utf-8') + alert("depois")
+    for chunk in (None, 1):
+        items, decoder = feed_all(data, chunk)
+        assert items == ["câmera åZ perdida", {"type": "alert", "camera": "cam", "message": "depois"}]
+        assert not decoder.buffer
+
+
+def test_magic_with_unknown_type_resyncs():
+    items, _ = feed_all(MAGIC + b"\xff lixo\n" + alert("ok"))
+    assert items[-1]["message"] == "ok"
+    assert len(items) == 2
+
+
+def test_oversized_length_is_text():
+    bogus = MAGIC + FRAME_HEADER.pack(MSG_ALERT, MAX_FRAME_SIZE + 1) + b"{}\n"
+    items, decoder = feed_all(bogus + alert("ok"))
+    assert items[-1]["message"] == "ok"
+    assert not decoder.buffer
+
+
+def test_invalid_payloads_are_text():
+    not_json = MAGIC + FRAME_HEADER.pack(MSG_ALERT, 5) + b"{abcd"
+    not_object = MAGIC + FRAME_HEADER.pack(MSG_ALERT, 2) + b"[]"
+    bad_detection = MAGIC + FRAME_HEADER.pack(MSG_DETECTION, DETECTION_HEADER.size + BOX.size - 1)
+    for bogus in (not_json, not_object, bad_detection):
+        items, decoder = feed_all(bogus + b"\n" + alert("ok"))
+        assert items[-1]["message"] == "ok"
+        assert all(isinstance(item, str) for item in items[:-1])
+        assert not decoder.buffer
+
+
+def test_partial_text_before_frame():
+    items, _ = feed_all(b"sem quebra de linha" + alert("ok"))
+    assert items == ["sem quebra de linha", {"type": "alert", "camera": "cam", "message": "ok"}]
+
+
+def test_incomplete_frame_waits_for_more_data():
+    data = alert("ok")
+    decoder = MessageDecoder("cam")
+    assert decoder.feed(data[:-1]) == []
+    assert decoder.feed(data[-1:])[0]["message"] == "ok"
+
+
+def test_stray_bytes_do_not_grow_buffer():
+    decoder = MessageDecoder("cam")
+    for _ in range(1000):
+        decoder.feed(b"ruido \xa5\x5a\x01 do ffmpeg\n")
+    assert decoder.feed(alert("ok"))[-1]["message"] == "ok"
+    assert len(decoder.buffer) == 0
@@ -0,0 +1,79 @@
+""" Testes dos percentis de latência do worker e do histograma do controlador """
+import worker_stats
+from worker_stats import LatencyHistogram, WorkerStats
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+
+def test_snapshot_percentiles_from_known_samples():
+    stats = WorkerStats()
+    for ms in range(1, 101):
+        stats.record('inference', ms / 1000)
+    snapshot = stats.snapshot()
+    assert snapshot["stages"] == {"inference": {"p50": 50.5, "p95": 95.05, "p99": 99.01, "count": 100}}
+
+
+def test_snapshot_resets_the_window():
+    stats = WorkerStats()
+    stats.record('capture', 0.01)
+    stats.frame_done()
+    assert stats.snapshot()["frames"] == 1
+    snapshot = stats.snapshot()
+    assert snapshot["frames"] == 0 and snapshot["stages"] == {}
+
+
+def test_snapshot_reports_dropped_since_last_window():
+    stats = WorkerStats()
+    assert stats.snapshot(dropped_total=7)["dropped"] == 7
+    snapshot = stats.snapshot(dropped_total=10, skipped_total=3)
+    assert (snapshot["dropped"], snapshot["dropped_total"], snapshot["skipped_total"]) == (3, 10, 3)
+    assert "skipped_total" not in stats.snapshot(dropped_total=10)
+
+
+def test_snapshot_fps(monkeypatch):
+    clock = FakeClock(100.0)
+    monkeypatch.setattr(worker_stats, "time", clock)
+    stats = WorkerStats()
+    for _ in range(25):
+        stats.frame_done()
+    clock.now = 105.0
+    assert stats.snapshot()["fps"] == 5.0
+
+
+def test_histogram_percentiles_use_bucket_bounds():
+    histogram = LatencyHistogram()
+    for ms in [10] * 50 + [80] * 45 + [700] * 5:
+        histogram.add(ms)
+    assert (histogram.percentile(50), histogram.percentile(95), histogram.percentile(99)) == (25, 100, 1000)
+
+
+def test_histogram_overflow_reports_max():
+    histogram = LatencyHistogram()
+    histogram.add(10)
+    histogram.add(12000)
+    assert histogram.percentile(99) == 12000
+
+
+def test_histogram_merge_and_summary():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.add(20)
+    first.add(40)
+    second.add(300)
+    second.add(20000)
+    summary = first.merge(second).summary()
+    assert summary["count"] == 4
+    assert summary["mean_ms"] == 5090.0
+    assert summary["max_ms"] == 20000
+    assert (summary["p50_ms"], summary["p95_ms"]) == (50, 20000)
+    assert summary["buckets"]["<=25"] == 1 and summary["buckets"][">10000"] == 1
+
+
+def test_empty_histogram():
+    summary = LatencyHistogram().summary()
+    assert summary["count"] == 0 and summary["mean_ms"] is None and summary["p50_ms"] is None
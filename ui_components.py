@@ -1,8 +1,16 @@
+import math
+import threading
+import time
+from collections import deque
+
 import cv2
+from frame_bus import FrameBusReader
+from roi_zones import parse_object_ids
 from PySide6.QtWidgets import (QLabel, QDialog, QVBoxLayout, QHBoxLayout, QMessageBox,
                                QLineEdit, QPushButton, QCheckBox, QComboBox, QWidget,
-                               QFormLayout, QGroupBox, QStackedWidget)
-from PySide6.QtCore import QTimer, Qt, QPoint, QRect, Signal
+                               QFormLayout, QGroupBox, QStackedWidget, QSizePolicy, QGridLayout,
+                               QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QFileDialog)
+from PySide6.QtCore import QTimer, QThread, QEvent, Qt, QPoint, QRect, Signal, QAbstractTableModel, QModelIndex
 from PySide6.QtGui import QImage, QPixmap, QPainter, QPen, QColor
 
 # Classe YOLO_CLASSES movida para cá para ser acessível pela LiveView
@@ -21,14 +29,237 @@ YOLO_CLASSES = {0: 'pessoa', 1: 'bicicleta', 2: 'carro', 3: 'motocicleta', 4: 'a
                 77: 'ursinho de pelúcia', 78: 'secador de cabelo', 79: 'escova de dentes'}
 
 
+class EventLogModel(QAbstractTableModel):
+    """ Modelo do log de eventos sobre um buffer circular de capacidade fixa.
+
+    Os eventos recebidos ficam pendentes e entram na tabela em lote, a cada 'flush_interval' ms.
+    Eventos mais antigos que o buffer podem ser trazidos de volta por 'history_loader'
+    (callable(evento_mais_antigo, limite) -> lista de eventos mais antigos, do mais velho ao mais novo).
+    """
+    HEADERS = ["Data e Hora", "Câmera", "Mensagem de Alerta / Erro"]
+    KEYS = ["timestamp", "camera", "message"]
+    ERROR_COLOR = QColor(191, 97, 106, 80)
+    rows_appended = Signal()
+
+    def __init__(self, capacity=5000, flush_interval=250, history_loader=None, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.history_loader = history_loader
+        self.follow_tail = True  # Falso enquanto o usuário navega pelo histórico.
+        self._rows = deque()
+        self._pending = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(flush_interval)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+
+    def append_event(self, event):
+        self._pending.append(event)
+
+    def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+        self._rows.extend(batch)
+        self.endInsertRows()
+        if self.follow_tail:
+            self.trim()
+        self.rows_appended.emit()
+
+    def trim(self):
+        excess = len(self._rows) - self.capacity
+        if excess <= 0:
+            return
+        self.beginRemoveRows(QModelIndex(), 0, excess - 1)
+        for _ in range(excess):
+            self._rows.popleft()
+        self.endRemoveRows()
+
+    def load_older(self, limit=200):
+        """ Insere no topo até 'limit' eventos anteriores ao mais antigo exibido; retorna quantos """
+        if self.history_loader is None:
+            return 0
+        older = self.history_loader(self._rows[0] if self._rows else None, limit)
+        if not older:
+            return 0
+        self.beginInsertRows(QModelIndex(), 0, len(older) - 1)
+        self._rows.extendleft(reversed(older))
+        self.endInsertRows()
+        return len(older)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        event = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            default = "Erro desconhecido" if event.get("type") == "error" else "Evento recebido"
+            return event.get(self.KEYS[index.column()], default if index.column() == 2 else "")
+        if role == Qt.BackgroundRole and event.get("type") == "error":
+            return self.ERROR_COLOR
+        if role == Qt.ToolTipRole and event.get("clip"):
+            return f"Clipe do alerta: {event['clip']}"
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+def fit_frame(frame, size):
+    """ Redimensiona o quadro para caber em 'size' (largura, altura) mantendo a proporção.
+
+    Retorna (quadro, escala). Reduções grandes (ex.: 4K numa janela pequena) primeiro pulam
+    linhas/colunas por um passo inteiro, o que não custa nada, e só então usam INTER_AREA sobre
+    o restante; ampliações usam INTER_LINEAR. No tamanho exato o quadro volta sem cópia.
+    """
+    h, w = frame.shape[:2]
+    scale = min(size[0] / w, size[1] / h)
+    target = (max(1, int(w * scale)), max(1, int(h * scale)))
+    if scale <= 0 or target == (w, h):
+        return frame, 1.0
+    step = int(1 / scale) // 2  # mantém ao menos 2x o destino para a média do INTER_AREA
+    if step >= 2:
+        frame = frame[::step, ::step]
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    return cv2.resize(frame, target, interpolation=interpolation), scale
+
+
+def frame_to_pixmap(frame):
+    """ QPixmap de um quadro BGR contíguo, sem conversão de cor (Format_BGR888) """
+    h, w = frame.shape[:2]
+    return QPixmap.fromImage(QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888))
+
+
+_stopping_threads = set()  # Threads de vídeo ainda presas em cap.read() depois que a janela fechou
+
+
+class FrameRenderThread(QThread):
+    """ Lê, redimensiona e desenha as sobreposições dos quadros fora da thread da interface.
+
+    A fonte é o frame bus da câmera (url=None) ou uma captura própria. 'overlay', se dado, é
+    chamado nesta thread como overlay(quadro, escala, seq, capture_ts) já no tamanho de exibição.
+    Quadros prontos são coalescidos: frame_ready só é emitido quando a interface já consumiu o
+    anterior com take_frame(), então uma janela lenta nunca acumula quadros na fila de eventos.
+    """
+    frame_ready = Signal()
+    status = Signal(str)
+
+    def __init__(self, cam_name, url=None, max_fps=30, overlay=None):
+        super().__init__()
+        self.cam_name = cam_name
+        self.url = url
+        self.interval = 1.0 / max_fps if max_fps else 0.0
+        self.overlay = overlay
+        self.target_size = (640, 480)
+        self.paused = False  # pausado, a thread não lê nem converte quadros (janela oculta/minimizada)
+        self._lock = threading.Lock()
+        self._latest = None
+
+    def set_target_size(self, width, height):
+        self.target_size = (max(1, width), max(1, height))
+
+    def set_max_fps(self, max_fps):
+        self.interval = 1.0 / max_fps if max_fps else 0.0
+
+    def set_paused(self, paused):
+        self.paused = paused
+
+    def take_frame(self):
+        with self._lock:
+            frame, self._latest = self._latest, None
+        return frame
+
+    def stop(self):
+        self.requestInterruption()
+        if not self.wait(2000):
+            # cap.read() pode ficar bloqueado até o timeout da câmera; a thread termina sozinha.
+            _stopping_threads.add(self)
+            self.finished.connect(lambda: _stopping_threads.discard(self))
+
+    def _publish(self, frame, scale, seq=0, capture_ts=0.0):
+        if self.overlay is not None:
+            self.overlay(frame, scale, seq, capture_ts)
+        with self._lock:
+            pending = self._latest is not None
+            self._latest = frame
+        if not pending:
+            self.frame_ready.emit()
+
+    def _sleep_until(self, deadline):
+        while not self.isInterruptionRequested():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 0.05))
+
+    def _run_frame_bus(self):
+        frame_bus = None
+        try:
+            while not self.isInterruptionRequested():
+                started = time.monotonic()
+                if frame_bus is not None and frame_bus.closed:
+                    # O worker parou ou reiniciou; tenta anexar de novo ao segmento novo.
+                    frame_bus.close()
+                    frame_bus = None
+                if self.paused:
+                    self._sleep_until(started + 0.1)
+                    continue
+                if frame_bus is None:
+                    frame_bus = FrameBusReader.attach(self.cam_name)
+                item = frame_bus.read(copy=False) if frame_bus is not None else None
+                if item:
+                    seq, capture_ts, view = item
+                    # Redimensiona direto da memória compartilhada: só o quadro reduzido é copiado.
+                    frame, scale = fit_frame(view, self.target_size)
+                    if frame is view:
+                        frame = view.copy()
+                    if frame_bus.is_valid(seq):
+                        self._publish(frame, scale, seq, capture_ts)
+                self._sleep_until(started + (self.interval or 0.01))
+        finally:
+            if frame_bus is not None:
+                frame_bus.close()
+
+    def _run_capture(self):
+        url = int(self.url) if self.url.isdigit() else self.url
+        cap = cv2.VideoCapture(url, cv2.CAP_DSHOW) if isinstance(url, int) else cv2.VideoCapture(url)
+        try:
+            if not cap.isOpened():
+                self.status.emit(f"Falha ao conectar à câmera:\n{self.url}")
+                return
+            while not self.isInterruptionRequested():
+                started = time.monotonic()
+                ret, frame = cap.read()
+                if not ret:
+                    self.status.emit("Sinal de vídeo perdido.")
+                    return
+                frame, scale = fit_frame(frame, self.target_size)
+                self._publish(frame, scale)
+                self._sleep_until(started + self.interval)
+        finally:
+            cap.release()
+
+    def run(self):
+        if self.url is None:
+            self._run_frame_bus()
+        else:
+            self._run_capture()
+
+
 class LiveViewDialog(QDialog):
-    def __init__(self, cam_config, parent=None):
+    def __init__(self, cam_config, parent=None, use_frame_bus=False):
         super().__init__(parent)
         self.cam_config = cam_config
         self.cam_name = cam_config.get('name', 'Câmera')
-        cam_url_text = cam_config.get('url')
-
-        cam_url = int(cam_url_text) if cam_url_text.isdigit() else cam_url_text
 
         self.setWindowTitle(f"Ao Vivo: {self.cam_name}")
         self.setMinimumSize(640, 480)
@@ -36,49 +267,51 @@ class LiveViewDialog(QDialog):
         self.video_label = QLabel("Conectando...", self)
         self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setStyleSheet("background-color: black;")
+        # O pixmap já chega no tamanho do label; sem isso ele impediria a janela de encolher.
+        self.video_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.addWidget(self.video_label)
 
         self.latest_detections = None
         self.target_ids = []
+        self.zones = []
         if self.cam_config.get('mode') == 'object':
+            self.zones = self.cam_config.get('zones') or []
             try:
-                self.target_ids = [int(i.strip()) for i in self.cam_config.get('object_ids', '').split(',')]
+                object_ids = self.cam_config.get('object_ids', '')
+                self.target_ids = set(parse_object_ids(object_ids)).union(
+                    *(parse_object_ids(zone.get('object_ids', object_ids)) for zone in self.zones))
             except ValueError:
                 self.target_ids = []
 
-        if isinstance(cam_url, int):
-            self.cap = cv2.VideoCapture(cam_url, cv2.CAP_DSHOW)
-        else:
-            self.cap = cv2.VideoCapture(cam_url)
-
-        self.timer = QTimer(self)
-        self.timer.setInterval(30)
-        self.timer.timeout.connect(self.update_frame)
-
-        if not self.cap.isOpened():
-            self.video_label.setText(f"Falha ao conectar à câmera:\n{cam_url_text}")
-        else:
-            self.timer.start()
+        # Com a câmera em execução, os quadros vêm da memória compartilhada do worker,
+        # sem abrir uma segunda conexão com a câmera/NVR.
+        self.use_frame_bus = use_frame_bus
+        if use_frame_bus:
+            self.video_label.setText("Aguardando quadros do worker...")
+        overlay = self._draw_overlay if self.cam_config.get('mode') == 'object' else None
+        self.renderer = FrameRenderThread(self.cam_name, None if use_frame_bus else cam_config.get('url'),
+                                          overlay=overlay)
+        self.renderer.frame_ready.connect(self._show_frame)
+        self.renderer.status.connect(self.video_label.setText)
+        self.renderer.start()
 
     def update_detections(self, detection_data):
         self.latest_detections = detection_data
 
-    def _draw_detections_on_frame(self, frame):
-        if not self.latest_detections:
-            return frame
-
-        roi = self.latest_detections.get('roi')
+    def _draw_detections_on_frame(self, frame, detections, scale=1.0):
+        roi = detections.get('roi')
         if roi:
-            y1, y2, x1, x2 = roi
+            y1, y2, x1, x2 = (int(v * scale) for v in roi)
             cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
 
-        offset_x, offset_y = self.latest_detections.get('offset', (0, 0))
+        offset_x, offset_y = detections.get('offset', (0, 0))
 
-        for det in self.latest_detections.get('detections', []):
+        for det in detections.get('detections', []):
             x1, y1, x2, y2, conf, cls_id = det
-            x1, y1, x2, y2 = int(x1 + offset_x), int(y1 + offset_y), int(x2 + offset_x), int(y2 + offset_y)
+            x1, y1 = int((x1 + offset_x) * scale), int((y1 + offset_y) * scale)
+            x2, y2 = int((x2 + offset_x) * scale), int((y2 + offset_y) * scale)
 
             if int(cls_id) in self.target_ids:
                 label = f"{YOLO_CLASSES.get(int(cls_id), f'ID:{int(cls_id)}')}: {conf:.2f}"
@@ -88,36 +321,182 @@ class LiveViewDialog(QDialog):
 
         return frame
 
-    def update_frame(self):
-        if not self.cap.isOpened():
-            self.video_label.setText("Não foi possível conectar à câmera.")
-            self.timer.stop()
+    def _draw_staleness(self, frame, detections, frame_seq, frame_ts):
+        """ Quanto as detecções desenhadas estão atrasadas em relação ao quadro exibido """
+        if not detections.get('capture_ts') or not frame_ts:
+            return
+        staleness_ms = max(0.0, (frame_ts - detections['capture_ts']) * 1000)
+        frames_behind = max(0, frame_seq - detections.get('frame_seq', 0))
+        text = f"Deteccoes: {staleness_ms:.0f} ms / {frames_behind} quadro(s) atras"  # putText não desenha acentos
+        color = (0, 255, 0) if staleness_ms < 500 else (0, 165, 255) if staleness_ms < 2000 else (0, 0, 255)
+        cv2.putText(frame, text, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 3)
+        cv2.putText(frame, text, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 1)
+
+    def _draw_zones(self, frame, scale):
+        for zone in self.zones:
+            if not zone.get('roi'):
+                continue
+            y1, y2, x1, x2 = (int(v * scale) for v in zone['roi'])
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
+            if zone.get('name'):
+                cv2.putText(frame, zone['name'], (x1 + 4, y1 + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
+
+    def _draw_overlay(self, frame, scale, frame_seq, frame_ts):
+        """ Chamado na thread de vídeo, sobre o quadro já reduzido ao tamanho de exibição """
+        self._draw_zones(frame, scale)
+        detections = self.latest_detections  # referência local: a interface pode trocá-la a qualquer momento
+        if not detections:
             return
+        self._draw_detections_on_frame(frame, detections, scale)
+        if self.use_frame_bus:
+            self._draw_staleness(frame, detections, frame_seq, frame_ts)
 
-        ret, frame = self.cap.read()
-        if ret:
-            if self.cam_config.get('mode') == 'object':
-                frame = self._draw_detections_on_frame(frame)
-
-            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb_image.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(qt_image)
-            self.video_label.setPixmap(
-                pixmap.scaled(self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
-        else:
-            self.video_label.setText("Sinal de vídeo perdido.")
-            self.timer.stop()
+    def _show_frame(self):
+        frame = self.renderer.take_frame()
+        if frame is not None:
+            self.video_label.setPixmap(frame_to_pixmap(frame))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.renderer.set_target_size(self.video_label.width(), self.video_label.height())
 
     def closeEvent(self, event):
-        self.timer.stop()
-        if self.cap.isOpened(): self.cap.release()
+        self.renderer.stop()
         if self.parent():
             self.parent().on_live_view_closed(self.cam_name)
         event.accept()
 
 
+class VideoWallDialog(QDialog):
+    """ Mosaico com todas as câmeras em execução, lidas do frame bus dos workers (sem novas conexões).
+
+    Cada quadro é reduzido ao tamanho do seu quadrinho antes de ser convertido. O ritmo de cada
+    quadrinho cai com a área (quadrinhos pequenos não mostram movimento fino) e o total do mosaico
+    fica limitado a 'total_fps', então mais câmeras significam menos quadros por câmera e não mais
+    CPU. Quadrinhos fora da tela, ou o mosaico minimizado, param de ler quadros.
+    """
+    FULL_RATE_AREA = 640 * 360  # área (px) a partir da qual o quadrinho recebe 'max_fps'
+
+    def __init__(self, running_cameras, parent=None, max_fps=15, total_fps=60):
+        super().__init__(parent)
+        self.running_cameras = running_cameras  # callable -> nomes das câmeras em execução
+        self.max_fps = max_fps
+        self.total_fps = total_fps
+        self.tiles = {}  # câmera -> (widget, label de vídeo, FrameRenderThread)
+
+        self.setWindowTitle("Mosaico ao Vivo")
+        self.setMinimumSize(640, 480)
+        self.setWindowModality(Qt.NonModal)
+        self.setWindowFlag(Qt.WindowMinMaxButtonsHint)
+        self.grid = QGridLayout(self)
+        self.grid.setContentsMargins(2, 2, 2, 2)
+        self.grid.setSpacing(2)
+        self.empty_label = QLabel("Nenhuma câmera em execução.", self)
+        self.empty_label.setAlignment(Qt.AlignCenter)
+
+        # Câmeras iniciadas/paradas com o mosaico aberto e mudanças de visibilidade.
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(1000)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start()
+        self.refresh()
+
+    def _add_tile(self, cam_name):
+        tile = QWidget(self)
+        layout = QVBoxLayout(tile)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        title = QLabel(cam_name, tile)
+        title.setAlignment(Qt.AlignCenter)
+        video = QLabel("Aguardando quadros do worker...", tile)
+        video.setAlignment(Qt.AlignCenter)
+        video.setStyleSheet("background-color: black;")
+        video.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+        layout.addWidget(title)
+        layout.addWidget(video, 1)
+        renderer = FrameRenderThread(cam_name, max_fps=self.max_fps)
+        renderer.frame_ready.connect(lambda: self._show_frame(cam_name))
+        renderer.start()
+        self.tiles[cam_name] = (tile, video, renderer)
+        if self.parent():
+            self.parent().subscribe_frames(cam_name)
+
+    def _remove_tile(self, cam_name):
+        tile, _, renderer = self.tiles.pop(cam_name)
+        renderer.stop()
+        if self.parent():
+            self.parent().unsubscribe_frames(cam_name)
+        self.grid.removeWidget(tile)
+        tile.deleteLater()
+
+    def _show_frame(self, cam_name):
+        if cam_name not in self.tiles:
+            return
+        _, video, renderer = self.tiles[cam_name]
+        frame = renderer.take_frame()
+        if frame is not None:
+            video.setPixmap(frame_to_pixmap(frame))
+
+    def _layout_tiles(self):
+        for tile, _, _ in self.tiles.values():
+            self.grid.removeWidget(tile)
+        self.grid.removeWidget(self.empty_label)
+        self.empty_label.setVisible(not self.tiles)
+        if not self.tiles:
+            self.grid.addWidget(self.empty_label, 0, 0)
+            return
+        columns = math.ceil(math.sqrt(len(self.tiles)))
+        for i, cam_name in enumerate(sorted(self.tiles)):
+            self.grid.addWidget(self.tiles[cam_name][0], i // columns, i % columns)
+
+    def refresh(self):
+        running = set(self.running_cameras())
+        if running != set(self.tiles):
+            for cam_name in set(self.tiles) - running:
+                self._remove_tile(cam_name)
+            for cam_name in running - set(self.tiles):
+                self._add_tile(cam_name)
+            self._layout_tiles()
+        self.update_rates()
+
+    def update_rates(self):
+        """ Reparte 'total_fps' entre os quadrinhos visíveis e pausa os demais """
+        shown = self.isVisible() and not self.isMinimized()
+        visible = {cam_name for cam_name, (_, video, _) in self.tiles.items()
+                   if shown and not video.visibleRegion().isEmpty()}
+        share = self.total_fps / max(1, len(visible))
+        for cam_name, (_, video, renderer) in self.tiles.items():
+            renderer.set_target_size(video.width(), video.height())
+            renderer.set_paused(cam_name not in visible)
+            area_fps = self.max_fps * min(1.0, video.width() * video.height() / self.FULL_RATE_AREA)
+            renderer.set_max_fps(max(1.0, min(area_fps, share)))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        QTimer.singleShot(0, self.update_rates)  # depois que o layout redistribuir os quadrinhos
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self.update_rates()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        QTimer.singleShot(0, self.update_rates)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_rates()
+
+    def closeEvent(self, event):
+        self.refresh_timer.stop()
+        for cam_name in list(self.tiles):
+            self._remove_tile(cam_name)
+        if self.parent():
+            self.parent().on_video_wall_closed()
+        event.accept()
+
+
 class ClickableLabel(QLabel):
     roiSelected = Signal(QRect)
 
@@ -126,6 +505,7 @@ class ClickableLabel(QLabel):
         self.begin = QPoint()
         self.end = QPoint()
         self.drawing = False
+        self.zones = []  # [(nome, QRect)] já desenhadas, no modo de várias zonas
 
     def mousePressEvent(self, event):
         self.begin = event.position().toPoint()
@@ -146,23 +526,35 @@ class ClickableLabel(QLabel):
 
     def paintEvent(self, event):
         super().paintEvent(event)
+        painter = QPainter(self)
+        painter.setPen(QPen(QColor("#88C0D0"), 2, Qt.SolidLine))
+        for name, rect in self.zones:
+            painter.drawRect(rect)
+            painter.drawText(rect.topLeft() + QPoint(4, 16), name)
         if not self.begin.isNull() and not self.end.isNull():
-            painter = QPainter(self)
             painter.setPen(QPen(QColor("#A3BE8C"), 2, Qt.SolidLine))
             painter.drawRect(QRect(self.begin, self.end).normalized())
 
 
 class ROISelector(QDialog):
-    def __init__(self, video_url, existing_roi=None, parent=None):
+    """ Seleção da ROI sobre um quadro da câmera. Com 'zones' (lista de (nome, roi)), desenha várias
+    zonas em sequência: cada retângulo vira uma zona e "Concluir" devolve a lista. """
+    FRAME_BUS_TIMEOUT = 5.0  # segundos à espera de um quadro do worker antes de abrir a câmera
+
+    def __init__(self, video_url, existing_roi=None, parent=None, cam_name=None, zones=None):
         super().__init__(parent)
         self.setWindowTitle("Definir Área - Carregando imagem...")
 
         video_source = int(video_url) if video_url.isdigit() else video_url
+        self.video_source = video_source
 
-        if isinstance(video_source, int):
-            self.cap = cv2.VideoCapture(video_source, cv2.CAP_DSHOW)
-        else:
-            self.cap = cv2.VideoCapture(video_source)
+        # Se a câmera já está rodando, usa um quadro publicado pelo worker em vez de abrir outra
+        # conexão. O worker só publica com um leitor inscrito, então o segmento pode ainda não
+        # existir ou guardar um quadro antigo: vale o primeiro quadro capturado depois da abertura.
+        self.cam_name = cam_name
+        self.frame_bus = None
+        self.opened_at = time.monotonic()
+        self.cap = self._open_camera() if cam_name is None else None
 
         self.image_label = ClickableLabel(self)
         self.image_label.setAlignment(Qt.AlignCenter)
@@ -174,7 +566,23 @@ class ROISelector(QDialog):
         self.original_frame = None
         self.original_frame_size = None
         self.initial_roi_coords = existing_roi
-        if not self.cap.isOpened():
+        self.multi = zones is not None
+        self.zones = list(zones or [])
+        if self.multi:
+            buttons_layout = QHBoxLayout()
+            undo_button = QPushButton("Desfazer")
+            done_button = QPushButton("Concluir")
+            undo_button.clicked.connect(self.undo_zone)
+            done_button.clicked.connect(self.accept)
+            buttons_layout.addStretch()
+            buttons_layout.addWidget(undo_button)
+            buttons_layout.addWidget(done_button)
+            self.layout.addLayout(buttons_layout)
+        if self.cap is None:
+            self.timer = QTimer(self)
+            self.timer.timeout.connect(self.try_capture_frame)
+            self.timer.start(50)
+        elif not self.cap.isOpened():
             QMessageBox.critical(self, "Erro", f"Não foi possível conectar à câmera em {video_url}")
             QTimer.singleShot(0, self.reject)
         else:
@@ -182,39 +590,101 @@ class ROISelector(QDialog):
             self.timer.timeout.connect(self.try_capture_frame)
             self.timer.start(50)
 
-    def try_capture_frame(self):
-        if not self.cap.isOpened(): self.timer.stop(); return
+    def _open_camera(self):
+        if isinstance(self.video_source, int):
+            return cv2.VideoCapture(self.video_source, cv2.CAP_DSHOW)
+        return cv2.VideoCapture(self.video_source)
+
+    def _read_frame_bus(self):
+        if self.frame_bus is None:
+            self.frame_bus = FrameBusReader.attach(self.cam_name)
+            if self.frame_bus is None: return None
+        item = self.frame_bus.read()
+        if item is None or item[1] < self.opened_at: return None
+        self.frame_bus.close()
+        self.frame_bus = None
+        return item[2]
+
+    def _read_first_frame(self):
+        if self.cap is None:
+            if (self.frame_bus is not None and self.frame_bus.closed) or \
+                    time.monotonic() - self.opened_at > self.FRAME_BUS_TIMEOUT:
+                # O worker parou (ou não publicou a tempo); volta a abrir a câmera diretamente.
+                if self.frame_bus is not None: self.frame_bus.close()
+                self.frame_bus = None
+                self.cap = self._open_camera()
+            else:
+                frame = self._read_frame_bus()
+                return frame is not None, frame
+        if not self.cap.isOpened(): self.timer.stop(); return False, None
         ret, frame = self.cap.read()
+        if ret: self.cap.release()
+        return ret, frame
+
+    def try_capture_frame(self):
+        ret, frame = self._read_first_frame()
         if ret:
             self.timer.stop()
-            self.cap.release()
             self.original_frame = frame
             h, w, _ = self.original_frame.shape
             self.original_frame_size = (w, h)
             self.setWindowTitle("Definir Área - Arraste o mouse para desenhar")
             self.update_display()
-            if self.initial_roi_coords: self.draw_existing_roi()
+            self.draw_existing_roi()
 
-    def draw_existing_roi(self):
-        if self.original_frame_size is None: return
-        orig_y1, orig_y2, orig_x1, orig_x2 = self.initial_roi_coords
+    def _display_geometry(self):
+        """ (escala x, escala y, deslocamento x, deslocamento y) da imagem exibida no label """
+        if self.original_frame_size is None: return None
         original_w, original_h = self.original_frame_size
         displayed_pixmap = self.image_label.pixmap()
-        if not displayed_pixmap or displayed_pixmap.isNull(): return
-        displayed_w = displayed_pixmap.width()
-        displayed_h = displayed_pixmap.height()
-        x_scale = displayed_w / original_w
-        y_scale = displayed_h / original_h
-        x_offset = (self.image_label.width() - displayed_w) / 2
-        y_offset = (self.image_label.height() - displayed_h) / 2
-        display_x1 = int(orig_x1 * x_scale + x_offset)
-        display_y1 = int(orig_y1 * y_scale + y_offset)
-        display_x2 = int(orig_x2 * x_scale + x_offset)
-        display_y2 = int(orig_y2 * y_scale + y_offset)
-        self.image_label.begin = QPoint(display_x1, display_y1)
-        self.image_label.end = QPoint(display_x2, display_y2)
+        if not displayed_pixmap or displayed_pixmap.isNull(): return None
+        displayed_w, displayed_h = displayed_pixmap.width(), displayed_pixmap.height()
+        if displayed_w == 0 or displayed_h == 0: return None
+        return (displayed_w / original_w, displayed_h / original_h,
+                (self.image_label.width() - displayed_w) / 2, (self.image_label.height() - displayed_h) / 2)
+
+    def _to_display(self, roi):
+        geometry = self._display_geometry()
+        if geometry is None: return None
+        x_scale, y_scale, x_offset, y_offset = geometry
+        orig_y1, orig_y2, orig_x1, orig_x2 = roi
+        return QRect(QPoint(int(orig_x1 * x_scale + x_offset), int(orig_y1 * y_scale + y_offset)),
+                     QPoint(int(orig_x2 * x_scale + x_offset), int(orig_y2 * y_scale + y_offset)))
+
+    def _to_original(self, selection_rect):
+        geometry = self._display_geometry()
+        if geometry is None: return None
+        x_scale, y_scale, x_offset, y_offset = geometry
+        original_w, original_h = self.original_frame_size
+        orig_x1 = int((selection_rect.left() - x_offset) / x_scale)
+        orig_y1 = int((selection_rect.top() - y_offset) / y_scale)
+        orig_x2 = int((selection_rect.right() - x_offset) / x_scale)
+        orig_y2 = int((selection_rect.bottom() - y_offset) / y_scale)
+        return [max(0, orig_y1), min(original_h, orig_y2), max(0, orig_x1), min(original_w, orig_x2)]
+
+    def draw_existing_roi(self):
+        if self.multi:
+            self.draw_zones()
+            return
+        if not self.initial_roi_coords: return
+        rect = self._to_display(self.initial_roi_coords)
+        if rect is None: return
+        self.image_label.begin = rect.topLeft()
+        self.image_label.end = rect.bottomRight()
         self.image_label.update()
 
+    def draw_zones(self):
+        rects = [(name, self._to_display(roi)) for name, roi in self.zones if roi]
+        self.image_label.zones = [(name, rect) for name, rect in rects if rect is not None]
+        self.image_label.begin = QPoint()
+        self.image_label.end = QPoint()
+        self.image_label.update()
+
+    def undo_zone(self):
+        if self.zones:
+            self.zones.pop()
+            self.draw_zones()
+
     def update_display(self):
         if self.original_frame is None: return
         h, w, _ = self.original_frame.shape
@@ -226,45 +696,57 @@ class ROISelector(QDialog):
         self.image_label.setPixmap(scaled_pixmap)
 
     def on_roi_selected(self, selection_rect):
-        if self.original_frame_size is None: return
-        original_w, original_h = self.original_frame_size
-        displayed_pixmap = self.image_label.pixmap()
-        if not displayed_pixmap or displayed_pixmap.isNull(): return
-        displayed_w, displayed_h = displayed_pixmap.width(), displayed_pixmap.height()
-        if displayed_w == 0 or displayed_h == 0: return
-        x_scale = original_w / displayed_w
-        y_scale = original_h / displayed_h
-        x_offset = (self.image_label.width() - displayed_w) / 2
-        y_offset = (self.image_label.height() - displayed_h) / 2
-        orig_x1 = int((selection_rect.left() - x_offset) * x_scale)
-        orig_y1 = int((selection_rect.top() - y_offset) * y_scale)
-        orig_x2 = int((selection_rect.right() - x_offset) * x_scale)
-        orig_y2 = int((selection_rect.bottom() - y_offset) * y_scale)
-        self.roi_rect = [max(0, orig_y1), min(original_h, orig_y2), max(0, orig_x1), min(original_w, orig_x2)]
-        self.accept()
+        roi = self._to_original(selection_rect)
+        if roi is None: return
+        if not self.multi:
+            self.roi_rect = roi
+            self.accept()
+            return
+        if roi[1] - roi[0] < 8 or roi[3] - roi[2] < 8: return  # clique sem arrastar
+        names = {name for name, _ in self.zones}
+        number = len(self.zones) + 1
+        while f"Zona {number}" in names: number += 1
+        self.zones.append((f"Zona {number}", roi))
+        self.draw_zones()
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
         self.update_display()
-        if self.initial_roi_coords: self.draw_existing_roi()
+        self.draw_existing_roi()
 
     def closeEvent(self, event):
-        if self.cap.isOpened(): self.cap.release()
+        if self.cap is not None and self.cap.isOpened(): self.cap.release()
+        if self.frame_bus is not None: self.frame_bus.close()
         super().closeEvent(event)
 
     @staticmethod
-    def get_roi(video_url, existing_roi=None, parent=None):
-        dialog = ROISelector(video_url, existing_roi, parent)
+    def get_roi(video_url, existing_roi=None, parent=None, cam_name=None):
+        dialog = ROISelector(video_url, existing_roi, parent, cam_name)
         if dialog.exec() == QDialog.Accepted: return dialog.roi_rect
         return None
 
+    @staticmethod
+    def get_zones(video_url, zones, parent=None, cam_name=None):
+        """ Lista de (nome, roi) desenhada pelo usuário, ou None se o diálogo foi cancelado """
+        dialog = ROISelector(video_url, None, parent, cam_name, zones)
+        if dialog.exec() == QDialog.Accepted: return dialog.zones
+        return None
+
 
 class CameraConfigDialog(QDialog):
+    BACKENDS = ['torch', 'onnx', 'openvino']  # Mesma ordem do backend_combo
+    OCR_ENGINES = ['auto', 'digits', 'easyocr']  # Mesma ordem do ocr_engine_combo
+    ZONE_HEADERS = ["Zona", "IDs", "Quantidade", "Número Exato", "Área"]
+
     def __init__(self, cam_name, cam_data, row, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Configurar Câmera")
         self.setMinimumWidth(500)
         self.row = row
+        self.original_name = cam_name
+        self.original_url = cam_data.get('url') if cam_data else None
+        # Campos sem controle no diálogo (ex.: loop_fps, ocr_cache_size) são mantidos ao salvar.
+        self.original_config = dict(cam_data or {})
         self.layout = QVBoxLayout(self)
         self.roi_coords = None
 
@@ -297,12 +779,25 @@ class CameraConfigDialog(QDialog):
         self.set_roi_button = QPushButton("Definir Área de Leitura (ROI)")
         self.roi_label = QLabel("Área não definida")
         self.gpu_checkbox_ocr = QCheckBox("Usar GPU (EasyOCR)")
+        self.ocr_engine_combo = QComboBox()
+        self.ocr_engine_combo.addItems(["Dígitos, com EasyOCR nas leituras duvidosas", "Somente dígitos",
+                                        "Somente EasyOCR"])
+        self.digit_templates_edit = QLineEdit()
+        self.digit_templates_edit.setPlaceholderText("Padrão: decodificação de sete segmentos")
+        self.digit_templates_button = QPushButton("Procurar...")
+        self.ocr_engine_combo.currentIndexChanged.connect(
+            lambda index: self.digit_templates_edit.setEnabled(self.OCR_ENGINES[index] != 'easyocr'))
+        templates_layout = QHBoxLayout()
+        templates_layout.addWidget(self.digit_templates_edit)
+        templates_layout.addWidget(self.digit_templates_button)
         temp_layout.addRow("Limite de Temperatura (°C):", self.limite_edit)
         temp_layout.addRow("URL do PC Receptor:", self.receptor_edit)
         temp_layout.addRow("Porta do Receptor:", self.receptor_port_edit)
         temp_layout.addRow(self.set_roi_button)
         temp_layout.addRow(self.roi_label)
         temp_layout.addRow(self.gpu_checkbox_ocr)
+        temp_layout.addRow("Leitor do Display:", self.ocr_engine_combo)
+        temp_layout.addRow("Templates dos Dígitos:", templates_layout)
         self.stacked_widget.addWidget(temp_groupbox)
 
         yolo_groupbox = QGroupBox("Parâmetros de Detecção de Objetos (YOLO)")
@@ -323,6 +818,43 @@ class CameraConfigDialog(QDialog):
         self.gpu_checkbox_yolo = QCheckBox("Tentar usar GPU (se disponível)")
         self.gpu_checkbox_yolo.setChecked(True)
 
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(["PyTorch", "ONNX Runtime", "OpenVINO"])
+        self.int8_checkbox = QCheckBox("Quantização INT8 (ONNX/OpenVINO)")
+        self.backend_combo.currentIndexChanged.connect(lambda index: self.int8_checkbox.setEnabled(index > 0))
+        self.int8_checkbox.setEnabled(False)
+
+        self.motion_gate_checkbox = QCheckBox("Analisar apenas quando houver movimento")
+        self.heartbeat_edit = QLineEdit("5")
+        self.heartbeat_edit.setPlaceholderText("Análise periódica mesmo sem movimento")
+        self.motion_gate_checkbox.toggled.connect(self.heartbeat_edit.setEnabled)
+        self.heartbeat_edit.setEnabled(False)
+
+        self.tracker_checkbox = QCheckBox("Rastrear objetos (contagem estável)")
+        self.keyframe_interval_edit = QLineEdit("1")
+        self.keyframe_interval_edit.setPlaceholderText("Quadros entre análises completas")
+        self.dwell_time_edit = QLineEdit("0")
+        self.dwell_time_edit.setPlaceholderText("0 para desativar")
+        self.tracker_checkbox.toggled.connect(self.keyframe_interval_edit.setEnabled)
+        self.tracker_checkbox.toggled.connect(self.dwell_time_edit.setEnabled)
+        self.keyframe_interval_edit.setEnabled(False)
+        self.dwell_time_edit.setEnabled(False)
+
+        # Zonas nomeadas, cada uma com seus IDs/quantidade e seus próprios alertas. Campos vazios
+        # herdam os valores da câmera; com zonas definidas, a ROI única acima é ignorada.
+        self.zones_table = QTableWidget(0, len(self.ZONE_HEADERS))
+        self.zones_table.setHorizontalHeaderLabels(self.ZONE_HEADERS)
+        self.zones_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.zones_table.horizontalHeader().setStretchLastSection(True)
+        self.zones_table.verticalHeader().setVisible(False)
+        self.zones_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.zones_table.setMaximumHeight(140)
+        self.set_zones_button = QPushButton("Desenhar Zonas")
+        self.remove_zone_button = QPushButton("Remover Zona")
+        zones_buttons_layout = QHBoxLayout()
+        zones_buttons_layout.addWidget(self.set_zones_button)
+        zones_buttons_layout.addWidget(self.remove_zone_button)
+
         yolo_layout.addRow("IDs dos Objetos a Detectar:", self.object_ids_edit)
         yolo_layout.addRow("Quantidade de Objetos:", self.quantity_edit)
         yolo_layout.addRow("Número Exato:", self.exact_number_checkbox)
@@ -330,7 +862,17 @@ class CameraConfigDialog(QDialog):
         yolo_layout.addRow(self.use_roi_checkbox_yolo)
         yolo_layout.addRow(self.set_roi_button_yolo)
         yolo_layout.addRow(self.roi_label_yolo)
+        yolo_layout.addRow(QLabel("Zonas (substituem a ROI; campos vazios usam os valores acima):"))
+        yolo_layout.addRow(self.zones_table)
+        yolo_layout.addRow(zones_buttons_layout)
         yolo_layout.addRow(self.gpu_checkbox_yolo)
+        yolo_layout.addRow("Backend de Inferência:", self.backend_combo)
+        yolo_layout.addRow(self.int8_checkbox)
+        yolo_layout.addRow(self.motion_gate_checkbox)
+        yolo_layout.addRow("Intervalo sem Movimento (s):", self.heartbeat_edit)
+        yolo_layout.addRow(self.tracker_checkbox)
+        yolo_layout.addRow("Analisar a cada N Quadros:", self.keyframe_interval_edit)
+        yolo_layout.addRow("Alerta de Permanência (s):", self.dwell_time_edit)
         self.stacked_widget.addWidget(yolo_groupbox)
 
         self.layout.addStretch()
@@ -343,6 +885,9 @@ class CameraConfigDialog(QDialog):
         self.mode_combo.currentIndexChanged.connect(self.stacked_widget.setCurrentIndex)
         self.set_roi_button.clicked.connect(self.set_roi)
         self.set_roi_button_yolo.clicked.connect(self.set_roi)
+        self.digit_templates_button.clicked.connect(self.browse_digit_templates)
+        self.set_zones_button.clicked.connect(self.set_zones)
+        self.remove_zone_button.clicked.connect(self.remove_zone)
         self.save_button.clicked.connect(self.accept)
 
         if cam_name and cam_data:
@@ -372,6 +917,15 @@ class CameraConfigDialog(QDialog):
             self.exact_number_checkbox.setChecked(data.get('exact_number', False))
             self.sensitivity_edit.setText(str(data.get('sensitivity', 0)))
             self.gpu_checkbox_yolo.setChecked(data.get('use_gpu', True))
+            self.backend_combo.setCurrentIndex(self.BACKENDS.index(data.get('backend', 'torch')))
+            self.int8_checkbox.setChecked(data.get('int8', False))
+            self.motion_gate_checkbox.setChecked(data.get('motion_gate', False))
+            self.heartbeat_edit.setText(str(data.get('heartbeat', 5)))
+            self.tracker_checkbox.setChecked(data.get('tracker', False))
+            self.keyframe_interval_edit.setText(str(data.get('keyframe_interval', 1)))
+            self.dwell_time_edit.setText(str(data.get('dwell_time', 0)))
+            for zone in data.get('zones') or []:
+                self.add_zone_row(zone)
 
             use_roi = data.get('use_roi', False)
             self.use_roi_checkbox_yolo.setChecked(use_roi)
@@ -388,12 +942,14 @@ class CameraConfigDialog(QDialog):
             self.receptor_port_edit.setText(str(data.get('receptor_port', '5000')))
             self.roi_coords = data.get('roi')
             self.gpu_checkbox_ocr.setChecked(data.get('gpu', False))
+            self.ocr_engine_combo.setCurrentIndex(self.OCR_ENGINES.index(data.get('ocr_engine') or 'auto'))
+            self.digit_templates_edit.setText(data.get('digit_templates') or '')
             if self.roi_coords:
                 self.roi_label.setText(f"Área definida: {self.roi_coords}")
                 self.roi_label.setStyleSheet("color: #A3BE8C;")
 
     def get_config(self):
-        config = {'name': self.name_edit.text(), 'url': self.url_edit.text()}
+        config = {**self.original_config, 'name': self.name_edit.text(), 'url': self.url_edit.text()}
 
         if not all([config['name'], config['url'], self.rearm_time_edit.text()]):
             QMessageBox.critical(self, "Erro", "Nome, URL e Tempo de Rearme são obrigatórios.")
@@ -414,6 +970,8 @@ class CameraConfigDialog(QDialog):
                 config['receptor'] = self.receptor_edit.text()
                 config['gpu'] = self.gpu_checkbox_ocr.isChecked()
                 config['roi'] = self.roi_coords
+                config['ocr_engine'] = self.OCR_ENGINES[self.ocr_engine_combo.currentIndex()]
+                config['digit_templates'] = self.digit_templates_edit.text().strip()
                 if not all([config['receptor'], self.roi_coords]):
                     raise ValueError("Campos obrigatórios não preenchidos.")
             except (ValueError, TypeError):
@@ -431,6 +989,14 @@ class CameraConfigDialog(QDialog):
                 config['exact_number'] = self.exact_number_checkbox.isChecked()
                 config['sensitivity'] = int(self.sensitivity_edit.text())
                 config['use_gpu'] = self.gpu_checkbox_yolo.isChecked()
+                config['backend'] = self.BACKENDS[self.backend_combo.currentIndex()]
+                config['int8'] = self.int8_checkbox.isChecked() and config['backend'] != 'torch'
+                config['motion_gate'] = self.motion_gate_checkbox.isChecked()
+                config['heartbeat'] = float(self.heartbeat_edit.text().replace(',', '.'))
+                config['tracker'] = self.tracker_checkbox.isChecked()
+                config['keyframe_interval'] = max(1, int(self.keyframe_interval_edit.text()))
+                config['dwell_time'] = float(self.dwell_time_edit.text().replace(',', '.'))
+                config['zones'] = self.zones_config()
 
                 config['use_roi'] = self.use_roi_checkbox_yolo.isChecked()
                 if config['use_roi']:
@@ -448,13 +1014,102 @@ class CameraConfigDialog(QDialog):
                 return None
         return config
 
+    def browse_digit_templates(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Templates dos Dígitos", self.digit_templates_edit.text(),
+                                              "Templates (*.npz)")
+        if path:
+            self.digit_templates_edit.setText(path)
+
+    def add_zone_row(self, zone):
+        row = self.zones_table.rowCount()
+        self.zones_table.insertRow(row)
+        self.zones_table.setItem(row, 0, QTableWidgetItem(zone.get('name', f"Zona {row + 1}")))
+        self.zones_table.setItem(row, 1, QTableWidgetItem(str(zone.get('object_ids', ''))))
+        self.zones_table.setItem(row, 2, QTableWidgetItem(str(zone.get('quantity', ''))))
+        exact_item = QTableWidgetItem()
+        exact_item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+        exact_item.setCheckState(Qt.Checked if zone.get('exact_number') else Qt.Unchecked)
+        self.zones_table.setItem(row, 3, exact_item)
+        area_item = QTableWidgetItem(str(zone.get('roi')) if zone.get('roi') else "Tela inteira")
+        area_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+        area_item.setData(Qt.UserRole, zone.get('roi'))
+        self.zones_table.setItem(row, 4, area_item)
+
+    def zones_config(self):
+        """ Zonas da tabela no formato de config['zones']; ValueError se algum campo for inválido """
+        zones = []
+        for row in range(self.zones_table.rowCount()):
+            name = self.zones_table.item(row, 0).text().strip()
+            if not name:
+                raise ValueError(f"A zona da linha {row + 1} precisa de um nome.")
+            zone = {'name': name, 'roi': self.zones_table.item(row, 4).data(Qt.UserRole)}
+            object_ids = self.zones_table.item(row, 1).text().strip()
+            if object_ids:
+                parse_object_ids(object_ids)
+                zone['object_ids'] = object_ids
+            quantity = self.zones_table.item(row, 2).text().strip()
+            if quantity:
+                zone['quantity'] = int(quantity)
+            zone['exact_number'] = self.zones_table.item(row, 3).checkState() == Qt.Checked
+            zones.append(zone)
+        if len({zone['name'] for zone in zones}) != len(zones):
+            raise ValueError("Os nomes das zonas devem ser diferentes.")
+        return zones
+
+    def remove_zone(self):
+        for row in sorted({index.row() for index in self.zones_table.selectedIndexes()}, reverse=True):
+            self.zones_table.removeRow(row)
+
+    def _running_cam(self, video_url_text):
+        # Reaproveita os quadros do worker apenas se a câmera está rodando com a mesma URL.
+        main_window = self.parent()
+        if (self.original_name and video_url_text == self.original_url and main_window is not None
+                and main_window.is_camera_running(self.original_name)):
+            return self.original_name
+        return None
+
+    def _select_on_camera(self, video_url_text, select):
+        """ Roda select(cam_name); com a câmera rodando, inscreve o seletor nos quadros do worker """
+        running_cam = self._running_cam(video_url_text)
+        if running_cam is None:
+            return select(None)
+        main_window = self.parent()
+        main_window.subscribe_frames(running_cam)
+        try:
+            return select(running_cam)
+        finally:
+            main_window.unsubscribe_frames(running_cam)
+
+    def set_zones(self):
+        video_url_text = self.url_edit.text()
+        if not video_url_text:
+            QMessageBox.warning(self, "Atenção", "Por favor, insira a URL do vídeo primeiro.")
+            return
+        try:
+            current = self.zones_config()
+        except ValueError as e:
+            QMessageBox.warning(self, "Atenção", f"Corrija a tabela de zonas primeiro.\nDetalhe: {e}")
+            return
+
+        zones = self._select_on_camera(video_url_text, lambda cam_name: ROISelector.get_zones(
+            video_url_text, [(zone['name'], zone['roi']) for zone in current], self, cam_name))
+        if zones is None:
+            return
+        # As zonas já existentes continuam na frente da lista (o seletor só acrescenta ou desfaz
+        # as últimas), então mantêm os IDs e quantidades preenchidos na tabela.
+        self.zones_table.setRowCount(0)
+        for i, (name, roi) in enumerate(zones):
+            zone = current[i] if i < len(current) and current[i]['name'] == name else {'name': name}
+            self.add_zone_row({**zone, 'roi': roi})
+
     def set_roi(self):
         video_url_text = self.url_edit.text()
         if not video_url_text:
             QMessageBox.warning(self, "Atenção", "Por favor, insira a URL do vídeo primeiro.")
             return
 
-        roi = ROISelector.get_roi(video_url_text, self.roi_coords, self)
+        roi = self._select_on_camera(
+            video_url_text, lambda cam_name: ROISelector.get_roi(video_url_text, self.roi_coords, self, cam_name))
         if roi:
             self.roi_coords = roi
             label_text = f"Área definida: {self.roi_coords}"
@@ -0,0 +1,258 @@
+import json
+import struct
+import sys
+import threading
+import time
+from datetime import datetime
+
+# Protocolo binário entre worker e controlador, no mesmo stdout usado para logs de texto.
+# Cada mensagem é um quadro: MAGIC (2 bytes) + tipo (1 byte) + tamanho (uint32 LE) + payload.
+# Qualquer outra saída (print, avisos de bibliotecas) continua chegando como linhas de texto.
+# MAGIC também aparece em texto comum ("åZ" em UTF-8 é C3 A5 5A), então um quadro só é aceito
+# com tipo conhecido, tamanho plausível e payload decodificável; senão os bytes seguem como texto.
+MAGIC = b'\xa5\x5a'
+FRAME_HEADER = struct.Struct('<BI')
+HEADER_SIZE = len(MAGIC) + FRAME_HEADER.size
+MAX_TEXT_CHUNK = 64 * 1024
+MAX_FRAME_SIZE = 1024 * 1024
+
+MSG_ALERT = 1
+MSG_ERROR = 2
+MSG_DETECTION = 3
+MSG_HEARTBEAT = 4
+MSG_STATS = 5
+
+JSON_TYPES = {MSG_ALERT: "alert", MSG_ERROR: "error", MSG_HEARTBEAT: "heartbeat", MSG_STATS: "stats"}
+TYPE_CODES = {name: code for code, name in JSON_TYPES.items()}
+FRAME_TYPES = {MSG_DETECTION, *JSON_TYPES}
+
+# Detecções: roi (has_roi + y1, y2, x1, x2), offset (x, y), seq e instante de captura
+# (time.monotonic() no worker) do quadro analisado e quantidade, seguidos de 6 float32 por
+# caixa (x1, y1, x2, y2, conf, cls) — o formato de boxes.data do YOLO.
+DETECTION_HEADER = struct.Struct('<B4i2iQdI')
+BOX = struct.Struct('<6f')
+
+_write_lock = threading.Lock()
+
+
+def timestamp():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def write_frame(msg_type, payload):
+    frame = MAGIC + FRAME_HEADER.pack(msg_type, len(payload)) + payload
+    with _write_lock:
+        sys.stdout.flush()  # Não intercala texto pendente no meio do quadro.
+        sys.stdout.buffer.write(frame)
+        sys.stdout.buffer.flush()
+
+
+def send_message(data):
+    """ Envia uma mensagem JSON (alerta, erro...) pelo canal do worker """
+    write_frame(TYPE_CODES[data["type"]], json.dumps(data).encode('utf-8'))
+
+
+def encode_detections(detections, roi=None, offset=(0, 0), frame_seq=0, capture_ts=0.0):
+    roi_values = tuple(int(v) for v in roi) if roi else (0, 0, 0, 0)
+    parts = [DETECTION_HEADER.pack(1 if roi else 0, *roi_values, int(offset[0]), int(offset[1]),
+                                   int(frame_seq), float(capture_ts), len(detections))]
+    parts.extend(BOX.pack(*det[:6]) for det in detections)
+    return b''.join(parts)
+
+
+def decode_detections(payload, cam_name):
+    has_roi, y1, y2, x1, x2, offset_x, offset_y, frame_seq, capture_ts, count = \
+        DETECTION_HEADER.unpack_from(payload)
+    boxes = [list(BOX.unpack_from(payload, DETECTION_HEADER.size + i * BOX.size)) for i in range(count)]
+    return {"type": "detection", "camera": cam_name, "detections": boxes,
+            "roi": [y1, y2, x1, x2] if has_roi else None, "offset": (offset_x, offset_y),
+            "frame_seq": frame_seq, "capture_ts": capture_ts}
+
+
+class MessageDecoder:
+    """ Decodificador incremental: recebe bytes do stdout do worker e devolve mensagens (dict)
+    e linhas de texto (str), na ordem em que chegaram """
+
+    def __init__(self, cam_name):
+        self.cam_name = cam_name
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        self.buffer.extend(data)
+        items = []
+        buf = self.buffer
+        while buf:
+            if buf.startswith(MAGIC):
+                header = check_header(buf, 0)
+                if header is None:
+                    break
+                if header:
+                    msg_type, length = FRAME_HEADER.unpack_from(buf, len(MAGIC))
+                    end = HEADER_SIZE + length
+                    if len(buf) < end:
+                        break
+                    message = self._decode(msg_type, bytes(buf[HEADER_SIZE:end]))
+                    if message is not None:
+                        del buf[:end]
+                        items.append(message)
+                        continue
+                # Não é um quadro: o MAGIC segue como texto até a próxima linha ou quadro.
+
+            newline = buf.find(b'\n')
+            magic = find_frame(buf, 1)
+            candidates = [i for i in (newline + 1 if newline != -1 else -1, magic) if i != -1]
+            if candidates:
+                cut = min(candidates)
+                if cut == magic and check_header(buf, magic) is None and len(buf) < MAX_TEXT_CHUNK:
+                    break  # Só o cabeçalho completo diz se o MAGIC inicia um quadro ou é texto.
+            elif len(buf) >= MAX_TEXT_CHUNK:
+                # Segura um possível início de quadro ainda incompleto.
+                cut = len(buf) - 1 if buf.endswith(MAGIC[:1]) else len(buf)
+            else:
+                break  # Linha de texto ainda incompleta.
+            text = bytes(buf[:cut]).decode('utf-8', errors='replace').rstrip('\r\n')
+            del buf[:cut]
+            if text:
+                items.append(text)
+        return items
+
+    def _decode(self, msg_type, payload):
+        if msg_type == MSG_DETECTION:
+            return decode_detections(payload, self.cam_name)
+        try:
+            message = json.loads(payload.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return None
+        return message if isinstance(message, dict) else None
+
+
+def check_header(buf, pos):
+    """ True se buf[pos:] começa com um cabeçalho de quadro válido, False se não pode ser um
+    quadro e None se ainda faltam bytes para decidir """
+    if len(buf) > pos + len(MAGIC) and buf[pos + len(MAGIC)] not in FRAME_TYPES:
+        return False
+    if len(buf) < pos + HEADER_SIZE:
+        return None
+    msg_type, length = FRAME_HEADER.unpack_from(buf, pos + len(MAGIC))
+    if length > MAX_FRAME_SIZE:
+        return False
+    if msg_type == MSG_DETECTION:
+        return length >= DETECTION_HEADER.size and (length - DETECTION_HEADER.size) % BOX.size == 0
+    # Mensagens JSON são sempre objetos.
+    return length > 0 and (len(buf) == pos + HEADER_SIZE or buf[pos + HEADER_SIZE] == ord('{'))
+
+
+def find_frame(buf, start):
+    """ Posição do próximo MAGIC que pode iniciar um quadro, ou -1 """
+    pos = buf.find(MAGIC, start)
+    while pos != -1 and check_header(buf, pos) is False:
+        pos = buf.find(MAGIC, pos + 1)
+    return pos
+
+
+def read_messages(stream, cam_name):
+    """ Itera sobre as mensagens e linhas de texto de um stdout binário até o fim do processo """
+    decoder = MessageDecoder(cam_name)
+    read = getattr(stream, 'read1', stream.read)
+    while True:
+        data = read(65536)
+        if not data:
+            break
+        yield from decoder.feed(data)
+    if decoder.buffer:
+        yield bytes(decoder.buffer).decode('utf-8', errors='replace').rstrip('\r\n')
+
+
+class DetectionChannel:
+    """ Envia detecções apenas quando há uma Live View inscrita, quando mudaram e no máximo
+    'max_rate' vezes por segundo. Uma mudança segurada pelo limite sai na próxima chamada.
+    Detecções iguais são reenviadas a cada 'keepalive' segundos, para a Live View saber de
+    qual quadro é o resultado mais recente. """
+
+    def __init__(self, max_rate=10.0, subscribed=False, keepalive=1.0):
+        self.min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.keepalive = keepalive
+        self.subscribed = subscribed
+        self._last_payload = None
+        self._last_sent = 0.0
+
+    def subscribe(self):
+        self._last_payload = None  # O novo assinante precisa do estado atual.
+        self.subscribed = True
+
+    def unsubscribe(self):
+        self.subscribed = False
+
+    def send(self, detections, roi=None, offset=(0, 0), frame_seq=0, capture_ts=0.0):
+        if not self.subscribed:
+            return
+        # A comparação ignora seq/instante do quadro: só o conteúdo decide se houve mudança.
+        content = encode_detections(detections, roi, offset)
+        now = time.monotonic()
+        if content == self._last_payload and now - self._last_sent < self.keepalive:
+            return
+        if now - self._last_sent < self.min_interval:
+            return
+        write_frame(MSG_DETECTION, encode_detections(detections, roi, offset, frame_seq, capture_ts))
+        self._last_payload = content
+        self._last_sent = now
+
+
+class Heartbeat:
+    """ Envia periodicamente {"type": msg_type, ...} com o estado retornado por status().
+
+    Roda em uma thread própria: continua batendo mesmo com a captura travada, e o campo
+    'stalled' diz ao supervisor há quanto tempo o decodificador não responde. Com
+    msg_type="stats" a mesma thread envia as estatísticas de desempenho do worker.
+    """
+
+    def __init__(self, cam_name, status, interval=2.0, msg_type="heartbeat"):
+        self.cam_name = cam_name
+        self.status = status
+        self.interval = interval
+        self.msg_type = msg_type
+        self._stop_signal = threading.Event()
+        self._thread = threading.Thread(target=self._beat_loop, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _beat_loop(self):
+        while not self._stop_signal.wait(self.interval):
+            send_message({"type": self.msg_type, "camera": self.cam_name, **self.status()})
+
+    def stop(self):
+        self._stop_signal.set()
+
+
+class ControlChannel:
+    """ Lê comandos JSON (um por linha) enviados pelo controlador no stdin do worker """
+
+    def __init__(self, handlers, on_eof=None):
+        self.handlers = handlers
+        self.on_eof = on_eof  # Chamado quando o controlador fecha o stdin.
+        self._thread = threading.Thread(target=self._read_loop, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _read_loop(self):
+        stdin = getattr(sys.stdin, 'buffer', None)
+        if stdin is None:
+            return
+        for line in iter(stdin.readline, b''):
+            try:
+                command = json.loads(line.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                continue
+            handler = self.handlers.get(command.get("command")) if isinstance(command, dict) else None
+            if handler is not None:
+                handler(command)
+        if self.on_eof is not None:
+            self.on_eof()
+
+
+def encode_command(command, **fields):
+    return (json.dumps({"command": command, **fields}) + '\n').encode('utf-8')
@@ -0,0 +1,163 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+try:
+    import psutil  # Dependência do ultralytics; sem ele o RSS não é informado.
+
+    _PROCESS = psutil.Process()
+except ImportError:
+    _PROCESS = None
+
+# Etapas do laço de um worker, na ordem em que acontecem com cada quadro.
+STAGES = ('capture', 'preprocess', 'inference', 'alert', 'emit')
+PERCENTILES = (50, 95, 99)
+
+
+def rss_mb():
+    return _PROCESS.memory_info().rss / (1024 * 1024) if _PROCESS is not None else None
+
+
+class WorkerStats:
+    """ Acumula a duração de cada etapa por quadro e resume a janela desde o último snapshot().
+
+    record() é chamado pelo laço do worker (e pela thread de captura); snapshot() pela thread
+    que envia a mensagem 'stats'. Cada etapa guarda no máximo 'max_samples' amostras por janela.
+    """
+
+    def __init__(self, stages=STAGES, max_samples=10000):
+        self.stages = stages
+        self._samples = {stage: deque(maxlen=max_samples) for stage in stages}
+        self._lock = threading.Lock()
+        self._frames = 0
+        self._window_start = time.monotonic()
+        self._last_dropped = 0
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self._samples[stage].append(seconds)
+
+    def frame_done(self):
+        with self._lock:
+            self._frames += 1
+
+    def snapshot(self, dropped_total=0, skipped_total=None):
+        """ Conteúdo da mensagem 'stats': quadros/s, percentis (ms) por etapa, descartes e RSS """
+        now = time.monotonic()
+        with self._lock:
+            samples = {stage: list(values) for stage, values in self._samples.items()}
+            for values in self._samples.values():
+                values.clear()
+            frames, self._frames = self._frames, 0
+            elapsed, self._window_start = now - self._window_start, now
+
+        stages = {}
+        for stage, values in samples.items():
+            if not values:
+                continue
+            p50, p95, p99 = np.percentile(np.asarray(values) * 1000, PERCENTILES)
+            stages[stage] = {"p50": round(float(p50), 2), "p95": round(float(p95), 2),
+                             "p99": round(float(p99), 2), "count": len(values)}
+
+        dropped = dropped_total - self._last_dropped
+        self._last_dropped = dropped_total
+        rss = rss_mb()
+        stats = {"fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0, "frames": frames,
+                 "dropped": dropped, "dropped_total": dropped_total, "stages": stages,
+                 "rss_mb": round(rss, 1) if rss is not None else None}
+        if skipped_total is not None:
+            stats["skipped_total"] = skipped_total
+        return stats
+
+
+# Limites superiores (ms) dos baldes do histograma de latência; o último balde é "acima de 10 s".
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """ Histograma cumulativo de latências (ms), usado pelo controlador para latência quadro→alerta.
+
+    Os percentis são estimados pelo limite superior do balde, o suficiente para verificar um SLA
+    do tipo "alerta em até N segundos" sem guardar cada amostra.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, latency_ms):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if latency_ms <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def merge(self, other):
+        """ Soma outro histograma com os mesmos baldes a este (ex.: várias câmeras) """
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        return self
+
+    def percentile(self, p):
+        if not self.count:
+            return None
+        target = self.count * p / 100
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def summary(self):
+        labels = [f"<={bound}" for bound in self.buckets] + [f">{self.buckets[-1]}"]
+        return {"count": self.count,
+                "mean_ms": round(self.total_ms / self.count, 1) if self.count else None,
+                "max_ms": round(self.max_ms, 1),
+                **{f"p{p}_ms": self.percentile(p) for p in PERCENTILES},
+                "buckets": dict(zip(labels, self.counts))}
+
+
+# Marcos da inicialização de um worker, na ordem em que acontecem.
+STARTUP_STEPS = (('imports', 'importações'), ('model', 'modelo'), ('capture', 'câmera'), ('ready', 'primeira análise'))
+
+
+class StartupTimer:
+    """ Instantes (s desde o início do worker) em que cada etapa da inicialização terminou """
+
+    def __init__(self, start):
+        self.start = start
+        self.marks = {}
+
+    def restart(self):
+        """ Recomeça a contagem (worker em espera que acabou de receber sua câmera) """
+        self.start = time.monotonic()
+        self.marks = {}
+
+    def mark(self, step):
+        if step not in self.marks:
+            self.marks[step] = round(time.monotonic() - self.start, 3)
+
+    def summary(self):
+        return dict(self.marks)
+
+
+def format_startup(marks):
+    """ Duração de cada etapa da inicialização, ex.: "importações 0.4 s, modelo 1.9 s, ..." """
+    parts, previous = [], 0.0
+    for step, label in STARTUP_STEPS:
+        if step in marks:
+            parts.append(f"{label} {marks[step] - previous:.1f} s")
+            previous = marks[step]
+    return ", ".join(parts)